@@ -1,16 +1,17 @@
 import logging
-from typing import List, Any, Optional
+from typing import TYPE_CHECKING, List, Any, Optional
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.tools import BaseTool
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.postgres import PostgresSaver
-from psycopg_pool import ConnectionPool
 
 from app.llm.manager import LLMManager
 from app.agent.tools import ToolWrapper
 from app.agent.config import AgentConfig
 from app.config.settings import settings
 
+if TYPE_CHECKING:
+    from langgraph.checkpoint.postgres import PostgresSaver
+
 logger = logging.getLogger(__name__)
 
 # Global pool for sync connections (if needed) or simple connection string usage
@@ -22,7 +23,7 @@ def build_graph_agent(
     llm_manager: LLMManager,
     tools: List[ToolWrapper],
     config: AgentConfig,
-    checkpointer: Optional[PostgresSaver] = None
+    checkpointer: Optional["PostgresSaver"] = None
 ):
     """
     Builds and returns a LangGraph ReAct agent.
@@ -0,0 +1,48 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+
+class CheckpointStats:
+    """Checkpoint round trips and time spent in Postgres during one agent turn."""
+
+    def __init__(self):
+        self.writes = 0
+        self.reads = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, write: bool, seconds: float) -> None:
+        # Async durability saves from a background thread while the turn runs
+        with self._lock:
+            if write:
+                self.writes += 1
+            else:
+                self.reads += 1
+            self.seconds += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"writes": self.writes, "reads": self.reads, "postgres_ms": round(self.seconds * 1000, 2)}
+
+
+_current_stats: ContextVar[Optional[CheckpointStats]] = ContextVar("checkpoint_stats", default=None)
+
+
+@contextmanager
+def track_checkpoint_io() -> Iterator[CheckpointStats]:
+    """
+    Collect checkpoint I/O for the enclosed turn. The stats object is shared
+    with threads started from this context (asyncio.to_thread, LangGraph's
+    background executor), so it sees their writes too.
+    """
+    stats = CheckpointStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def current_checkpoint_stats() -> Optional[CheckpointStats]:
+    return _current_stats.get()
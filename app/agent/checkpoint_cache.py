@@ -0,0 +1,230 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    copy_checkpoint,
+    get_checkpoint_id,
+    get_serializable_checkpoint_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+# Latest checkpoint of a thread and how many pending writes it has. Cheap
+# (index only, no blobs), and enough to tell whether another replica has
+# advanced the thread since we cached it.
+LATEST_VERSION_SQL = """
+SELECT c.checkpoint_id,
+       (SELECT count(*) FROM checkpoint_writes w
+         WHERE w.thread_id = c.thread_id
+           AND w.checkpoint_ns = c.checkpoint_ns
+           AND w.checkpoint_id = c.checkpoint_id) AS writes
+FROM checkpoints c
+WHERE c.thread_id = %s AND c.checkpoint_ns = %s
+ORDER BY c.checkpoint_id DESC
+LIMIT 1
+"""
+
+ThreadKey = Tuple[str, str]
+
+
+def estimate_size(value: Any, depth: int = 0) -> int:
+    """Approximate footprint of checkpoint data: string/bytes lengths plus a fixed overhead per object."""
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if depth > 8:
+        return 16
+    if isinstance(value, dict):
+        return 16 + sum(estimate_size(k, depth + 1) + estimate_size(v, depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return 16 + sum(estimate_size(v, depth + 1) for v in value)
+    if hasattr(value, "__dict__"):
+        # Messages and other pydantic/dataclass values
+        return 16 + estimate_size(vars(value), depth + 1)
+    return 16
+
+
+def copy_tuple(checkpoint_tuple: CheckpointTuple) -> CheckpointTuple:
+    # LangGraph mutates channel_versions and versions_seen of the checkpoint it loads
+    return checkpoint_tuple._replace(
+        checkpoint=copy_checkpoint(checkpoint_tuple.checkpoint),
+        pending_writes=list(checkpoint_tuple.pending_writes or []),
+    )
+
+
+class CachedCheckpointSaver(BaseCheckpointSaver):
+    """
+    Read-through, write-through cache of each active thread's latest
+    checkpoint in front of a PostgresSaver. Writes always go to Postgres;
+    `get_tuple` for the latest checkpoint is served from memory.
+
+    With `verify=True` a hit is only used after a one-row version query
+    confirms no other replica wrote a newer checkpoint (or more pending
+    writes) for the thread, which replaces loading and deserializing the
+    whole history. `verify=False` skips that query and is only safe when
+    each thread is served by a single process.
+
+    LangGraph mutates the checkpoint it is handed while running a turn, so
+    the cache stores its own copy and returns a fresh copy on every hit.
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver, max_bytes: int = 64 * 1024 * 1024, verify: bool = True):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.max_bytes = max_bytes
+        self.verify = verify
+        self._entries: "OrderedDict[ThreadKey, Tuple[CheckpointTuple, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # setup(), flush() and other saver specific helpers
+        if name == "saver":
+            raise AttributeError(name)
+        return getattr(self.saver, name)
+
+    @property
+    def config_specs(self):
+        return self.saver.config_specs
+
+    @staticmethod
+    def _key(config: RunnableConfig) -> ThreadKey:
+        configurable = config["configurable"]
+        return str(configurable["thread_id"]), configurable.get("checkpoint_ns", "")
+
+    # --- cache bookkeeping ---
+
+    def _store(self, key: ThreadKey, checkpoint_tuple: CheckpointTuple) -> None:
+        size = estimate_size(checkpoint_tuple.checkpoint)
+        if size > self.max_bytes:
+            self._invalidate(key)
+            return
+        checkpoint_tuple = copy_tuple(checkpoint_tuple)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._bytes -= previous[1]
+            self._entries[key] = (checkpoint_tuple, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def _invalidate(self, key: ThreadKey) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._bytes -= entry[1]
+
+    def _lookup(self, key: ThreadKey) -> Optional[CheckpointTuple]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                return entry[0]
+        return None
+
+    def _is_current(self, key: ThreadKey, cached: CheckpointTuple) -> bool:
+        if not self.verify:
+            return True
+        with self.saver._cursor() as cur:
+            cur.execute(LATEST_VERSION_SQL, key)
+            row = cur.fetchone()
+        return (
+            row is not None
+            and row["checkpoint_id"] == cached.config["configurable"]["checkpoint_id"]
+            and row["writes"] == len(cached.pending_writes or [])
+        )
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "threads": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+            }
+
+    # --- BaseCheckpointSaver ---
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        key = self._key(config)
+        flush = getattr(self.saver, "flush", None)
+        if flush:
+            # Buffered writes must be in Postgres before we compare versions
+            flush(key[0])
+
+        cached = self._lookup(key)
+        requested_id = get_checkpoint_id(config)
+        if cached and requested_id in (None, cached.config["configurable"]["checkpoint_id"]):
+            if self._is_current(key, cached):
+                self.hits += 1
+                return copy_tuple(cached)
+            self.stale += 1
+            self._invalidate(key)
+
+        self.misses += 1
+        checkpoint_tuple = self.saver.get_tuple(config)
+        if checkpoint_tuple and requested_id is None:
+            self._store(key, checkpoint_tuple)
+        return checkpoint_tuple
+
+    def list(self, config, *, filter=None, before=None, limit=None) -> Iterator[CheckpointTuple]:
+        return self.saver.list(config, filter=filter, before=before, limit=limit)
+
+    def put(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        next_config = self.saver.put(config, checkpoint, metadata, new_versions)
+        key = self._key(config)
+        parent_id = get_checkpoint_id(config)
+        parent_config = (
+            {"configurable": {"thread_id": key[0], "checkpoint_ns": key[1], "checkpoint_id": parent_id}}
+            if parent_id
+            else None
+        )
+        # Same shape as a tuple read back from Postgres
+        self._store(
+            key,
+            CheckpointTuple(
+                config=next_config,
+                checkpoint=checkpoint,
+                metadata=get_serializable_checkpoint_metadata(config, metadata),
+                parent_config=parent_config,
+                pending_writes=[],
+            ),
+        )
+        return next_config
+
+    def put_writes(self, config, writes, task_id: str, task_path: str = "") -> None:
+        self.saver.put_writes(config, writes, task_id, task_path)
+        # The cached tuple's pending writes are now out of date
+        self._invalidate(self._key(config))
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.saver.delete_thread(thread_id)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == str(thread_id)]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def prune(self, thread_ids, *, strategy: str = "keep_latest") -> None:
+        self.saver.prune(thread_ids, strategy=strategy)
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_delta_channel_history(self, *, config, channels):
+        return self.saver.get_delta_channel_history(config=config, channels=channels)
+
+    def get_next_version(self, current, channel):
+        return self.saver.get_next_version(current, channel)
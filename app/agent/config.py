@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 DEFAULT_SYSTEM_PROMPT = """You are a helpful and professional Customer Service Agent.
@@ -20,3 +22,8 @@ class AgentConfig(BaseModel):
     name: str = "customer_service_agent"
     mode: str = "chat"
     system_prompt: str = DEFAULT_SYSTEM_PROMPT
+    # When checkpoints reach Postgres: "sync" after every step, "async" after
+    # every step without blocking the next one, "exit" once when the turn ends
+    checkpoint_durability: Literal["sync", "async", "exit"] = "async"
+    # Minimum FAQ index score for answering without calling the LLM (1.0: exact matches only)
+    faq_match_threshold: float = 1.0
@@ -1,5 +1,6 @@
 import logging
 from typing import Dict, Any, Optional
+from app.agent.checkpoint import track_checkpoint_io
 from app.channels.core.models import InternalMessage, InternalResponse
 
 logger = logging.getLogger(__name__)
@@ -7,10 +8,18 @@ logger = logging.getLogger(__name__)
 async def run_agent(
     graph,
     message: InternalMessage,
-    session_context: Optional[Dict[str, Any]] = None
+    session_context: Optional[Dict[str, Any]] = None,
+    durability: Optional[str] = None,
+    faq_index=None,
+    faq_threshold: float = 1.0
 ) -> InternalResponse:
     """
     Run the agent graph with the given message.
+    `durability` ("sync", "async", "exit") controls when checkpoints are
+    persisted; None keeps the graph's default.
+    If `faq_index` has a match scoring at least `faq_threshold`, its answer
+    is returned without invoking the graph (no LLM call); a threshold of
+    1.0 accepts exact question matches only.
     """
     try:
         # LangGraph inputs
@@ -24,6 +33,10 @@ async def run_agent(
         thread_id = session_context.get("thread_id", user_id) if session_context else user_id
         
         config = {"configurable": {"thread_id": thread_id}}
+
+        match = faq_index.lookup(message.text) if faq_index is not None else None
+        if match and (match.exact if faq_threshold >= 1.0 else match.score >= faq_threshold):
+            return await _answer_from_faq(graph, config, message, match)
         
         # Invoke graph 
         # For remote/sync checkpointer, invoke is synchronous usually unless using async checkpointer
@@ -38,7 +51,14 @@ async def run_agent(
         # However, for async fastapi, blocking the loop is bad.
         # Let's wrap in to_thread since `graph.invoke` with sync checkpointer is blocking.
         import asyncio
-        result = await asyncio.to_thread(graph.invoke, inputs, config)
+        with track_checkpoint_io() as checkpoint_io:
+            try:
+                result = await asyncio.to_thread(graph.invoke, inputs, config, durability=durability)
+            finally:
+                # Writes held back for a checkpoint that never came (errors, interrupts)
+                flush = getattr(getattr(graph, "checkpointer", None), "flush", None)
+                if flush:
+                    await asyncio.to_thread(flush, thread_id)
         
         # Result state contains 'messages'
         messages = result.get("messages", [])
@@ -49,7 +69,8 @@ async def run_agent(
             text=str(output_text),
             metadata={
                 "agent_name": "CustomerServiceAgent (LangGraph)", 
-                "thread_id": thread_id
+                "thread_id": thread_id,
+                "checkpoint": {"durability": durability or "async", **checkpoint_io.as_dict()}
             }
         )
     except Exception as e:
@@ -58,3 +79,27 @@ async def run_agent(
             text="I apologize, but I encountered an internal error. Please try again later.",
             metadata={"error": str(e)}
         )
+
+
+async def _answer_from_faq(graph, config: Dict[str, Any], message: InternalMessage, match) -> InternalResponse:
+    import asyncio
+    thread_id = config["configurable"]["thread_id"]
+    try:
+        # Keep the exchange in the thread so later turns see it. As the
+        # "agent" node with no tool calls, the graph stays at END.
+        await asyncio.to_thread(
+            graph.update_state,
+            config,
+            {"messages": [("user", message.text), ("assistant", match.entry.answer)]},
+            as_node="agent",
+        )
+    except Exception as e:
+        logger.warning(f"Could not record FAQ answer in thread {thread_id}: {e}")
+    return InternalResponse(
+        text=match.entry.answer,
+        metadata={
+            "agent_name": "CustomerServiceAgent (FAQ)",
+            "thread_id": thread_id,
+            "faq_match": {"question": match.entry.question, "score": round(match.score, 3), "exact": match.exact},
+        }
+    )
@@ -0,0 +1,63 @@
+import threading
+from typing import Any, Optional, Tuple
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, see the "perf" extra
+    zstandard = None
+
+# Appended to the inner type tag ("msgpack+zstd"), so rows written before
+# compression existed keep their plain tag and decode unchanged
+ZSTD_SUFFIX = "+zstd"
+
+
+class CompactSerializer(SerializerProtocol):
+    """
+    Checkpoint serializer: LangGraph's msgpack encoding (JsonPlusSerializer),
+    zstd-compressed when a value encodes to `threshold` bytes or more.
+    Small values stay uncompressed, where zstd would cost more than it saves.
+    """
+
+    def __init__(
+        self,
+        inner: Optional[SerializerProtocol] = None,
+        threshold: int = 4096,
+        level: int = 3,
+    ):
+        self.inner = inner or JsonPlusSerializer()
+        self.threshold = threshold
+        self.level = level
+        # zstd contexts are reusable but not thread safe
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return zstandard is not None and self.threshold > 0
+
+    def _compressor(self):
+        if not hasattr(self._local, "compressor"):
+            self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return self._local.compressor
+
+    def _decompressor(self):
+        if not hasattr(self._local, "decompressor"):
+            self._local.decompressor = zstandard.ZstdDecompressor()
+        return self._local.decompressor
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        if self.enabled and type_ != "null" and len(data) >= self.threshold:
+            return type_ + ZSTD_SUFFIX, self._compressor().compress(data)
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(ZSTD_SUFFIX):
+            if zstandard is None:
+                raise RuntimeError("Checkpoint is zstd-compressed but the 'zstandard' package is not installed")
+            type_ = type_[: -len(ZSTD_SUFFIX)]
+            payload = self._decompressor().decompress(payload)
+        return self.inner.loads_typed((type_, payload))
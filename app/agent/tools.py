@@ -1,9 +1,14 @@
+import asyncio
+import functools
+import inspect
 import logging
 from typing import Optional, Type, List, Callable, Any
 from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool, StructuredTool
 
+from app.config.settings import settings
 from app.services.lightrag import LightRAGClient
+from app.services.resilience import ServiceUnavailable
 from app.memory.controller import MemoryController
 
 logger = logging.getLogger(__name__)
@@ -15,13 +20,26 @@ class ToolWrapper(BaseModel):
     args_schema: Optional[Type[BaseModel]] = None
 
     def wrap_tool(self) -> BaseTool:
+        func, coroutine = self.func, None
+        if inspect.iscoroutinefunction(self.func):
+            # run_agent drives the graph with a synchronous invoke (in a worker
+            # thread), which calls `func`; ainvoke awaits the coroutine instead
+            func, coroutine = _run_blocking(self.func), self.func
         return StructuredTool.from_function(
-            func=self.func,
+            func=func,
+            coroutine=coroutine,
             name=self.name,
             description=self.description,
             args_schema=self.args_schema
         )
 
+def _run_blocking(fn: Callable) -> Callable:
+    """Sync wrapper for an async tool, for callers without an event loop."""
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        return asyncio.run(fn(*args, **kwargs))
+    return run
+
 # --- Tool Arguments Schemas ---
 
 class SearchInput(BaseModel):
@@ -36,12 +54,41 @@ class SavePreferenceInput(BaseModel):
 
 # --- Tool Implementations ---
 
-def create_search_tool(client: LightRAGClient):
+# Degraded result while LightRAG is failing fast; tells the LLM not to guess
+KNOWLEDGE_BASE_UNAVAILABLE = (
+    "The knowledge base is temporarily unavailable. Do not guess: tell the user you "
+    "cannot look this up right now and offer to help with something else or try again later."
+)
+
+def create_search_tool(
+    client: LightRAGClient,
+    retrieval_mode: str = "answer",
+    query_mode: str = "auto",
+    top_k: Optional[int] = None,
+    chunk_top_k: Optional[int] = None,
+    max_tokens: Optional[int] = None
+):
+    """
+    retrieval_mode "answer": LightRAG writes an answer with its own LLM.
+    retrieval_mode "context": LightRAG only returns the retrieved context,
+    and the agent's LLM answers from it (one generation pass instead of two).
+    query_mode "auto" lets the client pick and escalate the LightRAG mode per question.
+    """
     async def search_knowledge(query: str) -> str:
         """Search the knowledge base (FAQ, documentation, etc.) for answers."""
         try:
-            # We can use 'hybrid' or 'global' mode
-            return await client.query(query, mode="hybrid")
+            result = await client.search(
+                query,
+                mode=query_mode,
+                retrieval=retrieval_mode,
+                top_k=top_k,
+                chunk_top_k=chunk_top_k,
+                max_tokens=max_tokens
+            )
+            return result or "No relevant information found in the knowledge base."
+        except ServiceUnavailable as e:
+            logger.warning(f"Knowledge base unavailable: {e}")
+            return KNOWLEDGE_BASE_UNAVAILABLE
         except Exception as e:
             logger.error(f"Error searching Knowledge Base: {e}")
             return "Error accessing knowledge base."
@@ -62,14 +109,31 @@ def create_save_pref_tool(controller: MemoryController):
 
 # --- Registry ---
 
-def get_tools(rag_client: LightRAGClient, memory_ctrl: MemoryController) -> List[ToolWrapper]:
-    return [
+def get_tools(rag_client: LightRAGClient, memory_ctrl: Optional[MemoryController]) -> List[ToolWrapper]:
+    """Agent tools; the profile tools are left out while memory is unavailable (`memory_ctrl` None)."""
+    tools = [
         ToolWrapper(
             name="search_knowledge_base",
-            description="Search the comprehensive knowledge base (FAQ, docs, policies).",
-            func=create_search_tool(rag_client),
+            description=(
+                "Search the comprehensive knowledge base (FAQ, docs, policies)."
+                if settings.LIGHTRAG_RETRIEVAL_MODE == "answer"
+                else "Search the comprehensive knowledge base (FAQ, docs, policies). "
+                "Returns the relevant entities, relationships and source excerpts; answer from them."
+            ),
+            func=create_search_tool(
+                rag_client,
+                retrieval_mode=settings.LIGHTRAG_RETRIEVAL_MODE,
+                query_mode=settings.LIGHTRAG_QUERY_MODE,
+                top_k=settings.LIGHTRAG_TOP_K,
+                chunk_top_k=settings.LIGHTRAG_CHUNK_TOP_K,
+                max_tokens=settings.LIGHTRAG_CONTEXT_MAX_TOKENS
+            ),
             args_schema=SearchInput
-        ),
+        )
+    ]
+    if memory_ctrl is None:
+        return tools
+    return tools + [
         ToolWrapper(
             name="read_profile",
             description="Read the user's profile context (history, preferences).",
@@ -1,11 +1,18 @@
+import asyncio
+import os
+import uuid
+from collections import Counter
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, File, UploadFile
 from pydantic import BaseModel
 from langchain_core.documents import Document
 
 from app.api import deps
-from app.api import deps
+from app.api.responses import FastJSONResponse
 from app.services.lightrag import LightRAGClient
+from app.services.faq_index import FAQIndex
+from app.services.ingest import IngestManifest, SyncDocument, UploadJournal, sync_documents
+from app.config.settings import settings
 
 
 router = APIRouter()
@@ -14,6 +21,25 @@ class IngestRequest(BaseModel):
     text: str
     description: Optional[str] = None
     
+class IngestFilesRequest(BaseModel):
+    # Relative to INGEST_DIR; empty = every file under it
+    paths: List[str] = []
+    # Skip files the upload journal records as already ingested
+    resume: bool = True
+
+class SyncItem(BaseModel):
+    source_id: str
+    text: str
+    description: Optional[str] = None
+
+class SyncRequest(BaseModel):
+    documents: List[SyncItem]
+    # Batches of one sync share a run_id (returned by the first call)
+    run_id: Optional[str] = None
+    # Last batch: report sources the run never saw
+    finish: bool = False
+    delete_missing: bool = False
+
 class SearchRequest(BaseModel):
     query: str
     mode: str = "hybrid"
@@ -21,12 +47,99 @@ class SearchRequest(BaseModel):
 @router.post("/lightrag/ingest")
 async def ingest_text(
     request: IngestRequest,
-    client: LightRAGClient = Depends(deps.get_lightrag_client)
+    client: LightRAGClient = Depends(deps.get_lightrag_client),
+    faq_index: Optional[FAQIndex] = Depends(deps.get_faq_index)
 ):
-    """Admin endpoint to ingest text into LightRAG."""
+    """Admin endpoint to ingest text into LightRAG (and its Q/A pairs into the FAQ index)."""
     try:
         res = await client.insert_text(request.text, description=request.description)
-        return res
+        if faq_index is not None:
+            res = {**res, "faq_entries_added": await asyncio.to_thread(faq_index.add_document, request.text)}
+        return FastJSONResponse(res)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/lightrag/upload")
+async def upload_documents(
+    files: List[UploadFile] = File(...),
+    client: LightRAGClient = Depends(deps.get_lightrag_client)
+):
+    """
+    Admin endpoint to upload files to LightRAG. Uploads are spooled to disk
+    by the server and streamed on in chunks, several files at a time.
+    """
+    semaphore = asyncio.Semaphore(settings.LIGHTRAG_UPLOAD_CONCURRENCY)
+
+    async def upload(file: UploadFile) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await client.insert_file(file.file, filename=file.filename, content_type=file.content_type)
+                return {"file": file.filename, **result}
+            except Exception as e:
+                return {"file": file.filename, "status": "failure", "error": str(e)}
+
+    return FastJSONResponse({"results": await asyncio.gather(*(upload(f) for f in files))})
+
+def _ingest_paths(paths: List[str]) -> List[str]:
+    root = os.path.realpath(settings.INGEST_DIR)
+    if not paths:
+        return sorted(
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(root)
+            for name in names
+        )
+    resolved = []
+    for path in paths:
+        full = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, full]) != root or not os.path.isfile(full):
+            raise HTTPException(status_code=400, detail=f"Not a file under INGEST_DIR: {path}")
+        resolved.append(full)
+    return resolved
+
+@router.post("/lightrag/ingest/files")
+async def ingest_files(
+    request: IngestFilesRequest,
+    client: LightRAGClient = Depends(deps.get_lightrag_client),
+    journal: UploadJournal = Depends(deps.get_upload_journal)
+):
+    """Admin endpoint to upload files from INGEST_DIR to LightRAG, resuming interrupted runs."""
+    paths = await asyncio.to_thread(_ingest_paths, request.paths)
+    results = await client.insert_files(
+        paths,
+        concurrency=settings.LIGHTRAG_UPLOAD_CONCURRENCY,
+        journal=journal,
+        resume=request.resume,
+    )
+    counts = Counter(result.get("status") or "unknown" for result in results)
+    return FastJSONResponse({"counts": counts, "results": results})
+
+@router.post("/lightrag/sync")
+async def sync_knowledge_base(
+    request: SyncRequest,
+    client: LightRAGClient = Depends(deps.get_lightrag_client),
+    manifest: IngestManifest = Depends(deps.get_ingest_manifest),
+    faq_index: Optional[FAQIndex] = Depends(deps.get_faq_index)
+):
+    """
+    Admin endpoint to sync a document set into LightRAG, skipping documents
+    whose content is unchanged since the last sync.
+    """
+    try:
+        result = await sync_documents(
+            client,
+            manifest,
+            [SyncDocument(d.source_id, d.text, d.description) for d in request.documents],
+            run_id=request.run_id or uuid.uuid4().hex,
+            finish=request.finish,
+            delete_missing=request.delete_missing,
+            concurrency=settings.LIGHTRAG_UPLOAD_CONCURRENCY,
+            on_inserted=(
+                (lambda document: faq_index.add_document(document.text, source_id=document.source_id))
+                if faq_index is not None else None
+            ),
+            on_removed=faq_index.remove_sources if faq_index is not None else None,
+        )
+        return FastJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -38,6 +151,6 @@ async def search_documents(
     """Admin endpoint to search LightRAG."""
     try:
         result = await client.query(request.query, mode=request.mode)
-        return {"response": result}
+        return FastJSONResponse({"response": result})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from app.channels.core.models import ChannelType
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; maps to a 503 with Retry-After."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("channel", "future")
+
+    def __init__(self, channel: ChannelType, future: asyncio.Future):
+        self.channel = channel
+        self.future = future
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded priority wait queue in front of the agent.
+
+    - `max_concurrency` requests run at once across all channels.
+    - Up to `max_queue` requests wait, at most `max_wait` seconds each.
+    - `priorities` orders waiters per channel (lower value is served first).
+    - `quotas` caps concurrent requests for a single channel.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait: float,
+        retry_after: int = 1,
+        priorities: Optional[Dict[ChannelType, int]] = None,
+        quotas: Optional[Dict[ChannelType, int]] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.priorities = priorities or {}
+        self.quotas = quotas or {}
+
+        self.in_flight = 0
+        self.in_flight_by_channel: Dict[ChannelType, int] = {}
+        self.rejected = 0
+        self._queue: List = []
+        self._queued = 0
+        self._counter = itertools.count()
+
+    def _has_capacity(self, channel: ChannelType) -> bool:
+        if self.in_flight >= self.max_concurrency:
+            return False
+        quota = self.quotas.get(channel)
+        return quota is None or self.in_flight_by_channel.get(channel, 0) < quota
+
+    def _start(self, channel: ChannelType) -> None:
+        self.in_flight += 1
+        self.in_flight_by_channel[channel] = self.in_flight_by_channel.get(channel, 0) + 1
+
+    def _reject(self, message: str) -> AdmissionRejected:
+        self.rejected += 1
+        logger.warning(f"Admission rejected: {message}")
+        return AdmissionRejected(message, self.retry_after)
+
+    async def acquire(self, channel: ChannelType) -> None:
+        if self._queued == 0 and self._has_capacity(channel):
+            self._start(channel)
+            return
+
+        if self._queued >= self.max_queue:
+            raise self._reject(f"Wait queue is full ({self.max_queue} queued).")
+
+        waiter = _Waiter(channel, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, (self.priorities.get(channel, 0), next(self._counter), waiter))
+        self._queued += 1
+        # Waiters ahead of us may be blocked by their channel quota only
+        self._wake_waiters()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted at the same instant the deadline fired; keep the slot.
+                return
+            waiter.future.cancel()
+            raise self._reject(f"Waited longer than {self.max_wait}s for a free slot.")
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(channel)
+            else:
+                waiter.future.cancel()
+            raise
+        finally:
+            if not waiter.future.done() or waiter.future.cancelled():
+                self._queued -= 1
+
+    def release(self, channel: ChannelType) -> None:
+        self.in_flight -= 1
+        self.in_flight_by_channel[channel] -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        skipped = []
+        while self._queue and self.in_flight < self.max_concurrency:
+            entry = heapq.heappop(self._queue)
+            waiter = entry[2]
+            if waiter.future.done():
+                continue
+            if not self._has_capacity(waiter.channel):
+                # Channel is at its quota; let lower priority channels through.
+                skipped.append(entry)
+                continue
+            self._start(waiter.channel)
+            self._queued -= 1
+            waiter.future.set_result(None)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+
+    @asynccontextmanager
+    async def slot(self, channel: ChannelType):
+        await self.acquire(channel)
+        try:
+            yield
+        finally:
+            self.release(channel)
+
+    def status(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self._queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "in_flight_by_channel": {
+                channel.value: count for channel, count in self.in_flight_by_channel.items() if count
+            },
+        }
@@ -1,19 +1,39 @@
+import asyncio
+import logging
+import os
+import threading
+import time
 from functools import lru_cache
-from typing import List
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import HTTPException
 
 from app.config.settings import settings, Settings
-from app.llm.base import BaseLLMProvider
-from app.llm.openai_provider import OpenAIProvider
-from app.llm.groq_provider import GroqProvider
-from app.llm.ollama_provider import OllamaProvider
+from app.config.workers import per_worker, worker_count
 from app.llm.manager import LLMManager
+from app.llm.registry import load_providers
 from app.services.lightrag import lightrag_client, LightRAGClient
-from app.memory.controller import MemoryController
-from app.agent.tools import get_tools
+from app.services.faq_index import FAQIndex
+from app.services.ingest import IngestManifest, UploadJournal
 from app.agent.config import AgentConfig
-from langgraph.checkpoint.postgres import PostgresSaver
-from psycopg_pool import ConnectionPool
-from app.agent.builder import build_graph_agent
+from app.api.admission import AdmissionController, AdmissionRejected
+from app.channels.core.models import ChannelType, InternalMessage, InternalResponse
+from app.channels.core.outbound import BaseOutboundClient, ChannelOutboundRouter, StubOutboundClient
+from app.channels.core.delivery import SharedHTTPClient
+from app.channels.telegram.client import TelegramOutboundClient
+from app.channels.whatsapp.client import WhatsAppOutboundClient
+from app.channels.core.dispatcher import WebhookDispatcher
+from app.channels.core.dedup import BaseDedupStore, InMemoryDedupStore, PostgresDedupStore
+from app.agent.runner import run_agent
+
+# langgraph, psycopg_pool, mem0 and the provider SDKs are imported on first
+# use so that importing the app (cold start) stays cheap
+if TYPE_CHECKING:
+    from langgraph.checkpoint.postgres import PostgresSaver
+    from psycopg_pool import ConnectionPool
+    from app.memory.controller import MemoryController
+
+logger = logging.getLogger(__name__)
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -22,18 +42,48 @@ def get_settings() -> Settings:
 # --- Singletons for heavy objects ---
 
 _pg_pool = None
+_checkpointer = None
+
+_graph = None
+_graph_built_at = 0.0
+_graph_lock = threading.Lock()
 
-def get_postgres_pool() -> ConnectionPool:
+def get_postgres_pool() -> "ConnectionPool":
     global _pg_pool
     if _pg_pool is None:
+        from psycopg_pool import ConnectionPool
+
         _pg_pool = ConnectionPool(
             conninfo=settings.POSTGRES_URI, 
-            max_size=20,
+            max_size=per_worker(settings.POSTGRES_MAX_CONNECTIONS),
             kwargs={"autocommit": True}
         )
     return _pg_pool
 
-def get_checkpointer() -> PostgresSaver:
+def get_checkpoint_serializer():
+    """None keeps LangGraph's default serializer."""
+    if settings.CHECKPOINT_SERIALIZER == "compact":
+        from app.agent.serializer import CompactSerializer
+
+        serializer = CompactSerializer(
+            threshold=settings.CHECKPOINT_COMPRESSION_THRESHOLD,
+            level=settings.CHECKPOINT_COMPRESSION_LEVEL,
+        )
+        if not serializer.enabled and settings.CHECKPOINT_COMPRESSION_THRESHOLD > 0:
+            logger.warning(
+                "CHECKPOINT_SERIALIZER=compact but zstandard is not installed; checkpoints are "
+                "stored uncompressed. Install the 'perf' extra (pip install '.[perf]')."
+            )
+        return serializer
+    return None
+
+def get_checkpointer() -> "PostgresSaver":
+    from app.agent.checkpoint_cache import CachedCheckpointSaver
+    from app.agent.pipelined_saver import PipelinedPostgresSaver
+
+    global _checkpointer
+    if _checkpointer is not None:
+        return _checkpointer
     pool = get_postgres_pool()
     # PostgresSaver needs a connection, but typically we want it to manage lifecycle or use a pool.
     # The standard usage: with pool.connection() as conn: checkpointer = PostgresSaver(conn)
@@ -56,42 +106,240 @@ def get_checkpointer() -> PostgresSaver:
     # Quick fix: Return a checkpointer connected to the pool/conn.
     # warning: Checkpointer might need setup() called.
     
-    return PostgresSaver(pool)
+    checkpointer = PipelinedPostgresSaver(
+        pool,
+        serde=get_checkpoint_serializer(),
+        batch_writes=settings.CHECKPOINT_BATCH_WRITES,
+    )
+    # Ensure checkpointer tables exist (once per process)
+    checkpointer.setup()
+    if settings.CHECKPOINT_CACHE_MAX_BYTES > 0:
+        # Shared by every graph build so hot threads stay cached across rebuilds
+        checkpointer = CachedCheckpointSaver(
+            checkpointer,
+            max_bytes=settings.CHECKPOINT_CACHE_MAX_BYTES,
+            verify=settings.CHECKPOINT_CACHE_VERIFY,
+        )
+    _checkpointer = checkpointer
+    return checkpointer
+
+def checkpoint_cache_status() -> Optional[dict]:
+    status = getattr(_checkpointer, "status", None)
+    return status() if status else None
+
+def close_postgres_pool() -> None:
+    global _pg_pool, _checkpointer
+    if _pg_pool is not None:
+        _pg_pool.close()
+        _pg_pool = None
+        _checkpointer = None
 
 @lru_cache()
 def get_llm_manager() -> LLMManager:
-    providers: List[BaseLLMProvider] = [
-        OpenAIProvider(priority=1),
-        GroqProvider(priority=2),
-        OllamaProvider(priority=3)
-    ]
-    return LLMManager(providers)
+    # Only providers that are configured get their SDKs imported
+    return LLMManager(load_providers())
+
+@lru_cache()
+def get_agent_config() -> AgentConfig:
+    return AgentConfig(
+        checkpoint_durability=settings.CHECKPOINT_DURABILITY,
+        faq_match_threshold=settings.FAQ_MATCH_THRESHOLD,
+    )
 
 @lru_cache()
 def get_lightrag_client() -> LightRAGClient:
     return lightrag_client
 
 @lru_cache()
-def get_memory_controller() -> MemoryController:
+def get_upload_journal() -> UploadJournal:
+    return UploadJournal(settings.LIGHTRAG_UPLOAD_JOURNAL)
+
+@lru_cache()
+def get_ingest_manifest() -> IngestManifest:
+    return IngestManifest(settings.INGEST_MANIFEST_PATH)
+
+@lru_cache()
+def get_faq_index() -> Optional[FAQIndex]:
+    if not settings.FAQ_INDEX_ENABLED:
+        return None
+    return FAQIndex(settings.FAQ_INDEX_PATH)
+
+@lru_cache()
+def get_memory_controller() -> "MemoryController":
+    from app.memory.controller import MemoryController
+
     # MemoryController needs LLM for summarization, so we pass the manager
     return MemoryController(llm_manager=get_llm_manager())
 
-def get_agent_graph():
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    return AdmissionController(
+        max_concurrency=per_worker(settings.ADMISSION_MAX_CONCURRENCY),
+        max_queue=per_worker(settings.ADMISSION_MAX_QUEUE),
+        max_wait=settings.ADMISSION_MAX_WAIT,
+        retry_after=settings.ADMISSION_RETRY_AFTER,
+        priorities={ChannelType(k): v for k, v in settings.ADMISSION_CHANNEL_PRIORITY.items()},
+        quotas={ChannelType(k): v for k, v in settings.ADMISSION_CHANNEL_QUOTA.items()},
+    )
+
+async def admission_slot(channel_name: ChannelType):
+    """
+    Holds an admission slot for the whole request.
+    Declared before the graph dependency so overload is rejected before any agent work starts.
+    """
+    controller = get_admission_controller()
+    try:
+        await controller.acquire(channel_name)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    try:
+        yield
+    finally:
+        controller.release(channel_name)
+
+def build_agent_graph():
     """
     Builds the agent graph. 
     Note: We don't cache the graph WITH the checkpointer if checkingpointer relies on open cursors.
     But PostgresSaver(pool) should be thread safe and reusable.
     """
-    llm_mgr = get_llm_manager()
+    from app.agent.tools import get_tools
+    from app.agent.builder import build_graph_agent
+
     llm_mgr = get_llm_manager()
     rag_client = get_lightrag_client()
-    memory_ctrl = get_memory_controller()
+    try:
+        memory_ctrl = get_memory_controller()
+    except Exception as e:
+        # Memory is optional: serve without profile tools until the next rebuild
+        logger.warning(f"Memory unavailable, building the agent without profile tools: {e}")
+        memory_ctrl = None
     
     tools = get_tools(rag_client, memory_ctrl)
-    config = AgentConfig()
+    config = get_agent_config()
     
     checkpointer = get_checkpointer()
-    # Ensure checkpointer tables exist
-    checkpointer.setup()
     
     return build_graph_agent(llm_mgr, tools, config, checkpointer=checkpointer)
+
+def get_agent_graph():
+    """
+    Compiled graph, rebuilt every AGENT_GRAPH_TTL seconds so that auto mode
+    still re-selects a healthy LLM provider. The first build blocks; later
+    rebuilds run in one thread while other requests keep the current graph.
+    """
+    global _graph, _graph_built_at
+    if settings.AGENT_GRAPH_TTL <= 0:
+        return build_agent_graph()
+    if _graph is not None and time.monotonic() - _graph_built_at < settings.AGENT_GRAPH_TTL:
+        return _graph
+    if not _graph_lock.acquire(blocking=_graph is None):
+        return _graph
+    try:
+        if _graph is None or time.monotonic() - _graph_built_at >= settings.AGENT_GRAPH_TTL:
+            _graph = build_agent_graph()
+            _graph_built_at = time.monotonic()
+        return _graph
+    finally:
+        _graph_lock.release()
+
+@lru_cache()
+def get_dedup_store() -> Optional[BaseDedupStore]:
+    if settings.DEDUP_BACKEND == "postgres":
+        store = PostgresDedupStore(
+            get_postgres_pool(),
+            ttl_seconds=settings.DEDUP_TTL_SECONDS,
+            lease_seconds=settings.DEDUP_PROCESSING_LEASE_SECONDS,
+        )
+        store.setup()
+        return store
+    if settings.DEDUP_BACKEND == "memory":
+        return InMemoryDedupStore(
+            ttl_seconds=settings.DEDUP_TTL_SECONDS,
+            max_entries=settings.DEDUP_MAX_ENTRIES,
+        )
+    return None
+
+@lru_cache()
+def get_outbound_client() -> BaseOutboundClient:
+    """
+    Live clients for channels with credentials configured; the rest fall back
+    to the local stub, which only logs replies.
+    """
+    http = SharedHTTPClient(max_connections=per_worker(settings.OUTBOUND_MAX_CONNECTIONS))
+    clients = {}
+    if settings.TELEGRAM_BOT_TOKEN:
+        clients[ChannelType.TELEGRAM] = TelegramOutboundClient(
+            bot_token=settings.TELEGRAM_BOT_TOKEN,
+            http=http,
+            api_url=settings.TELEGRAM_API_URL,
+            global_rate=settings.TELEGRAM_GLOBAL_RATE / worker_count(),
+            per_chat_rate=settings.TELEGRAM_PER_CHAT_RATE,
+            max_retries=settings.OUTBOUND_MAX_RETRIES,
+        )
+    if settings.WHATSAPP_ACCESS_TOKEN and settings.WHATSAPP_PHONE_NUMBER_ID:
+        clients[ChannelType.WHATSAPP] = WhatsAppOutboundClient(
+            access_token=settings.WHATSAPP_ACCESS_TOKEN,
+            phone_number_id=settings.WHATSAPP_PHONE_NUMBER_ID,
+            http=http,
+            api_url=settings.WHATSAPP_API_URL,
+            global_rate=settings.WHATSAPP_GLOBAL_RATE / worker_count(),
+            per_chat_rate=settings.WHATSAPP_PER_CHAT_RATE,
+            max_retries=settings.OUTBOUND_MAX_RETRIES,
+        )
+    return ChannelOutboundRouter(clients, fallback=StubOutboundClient(), on_close=http.aclose)
+
+async def _run_webhook_turn(message: InternalMessage) -> InternalResponse:
+    # Graph construction is blocking (health checks, checkpointer setup)
+    graph = await asyncio.to_thread(get_agent_graph)
+    config = get_agent_config()
+    return await run_agent(
+        graph,
+        message,
+        durability=config.checkpoint_durability,
+        faq_index=get_faq_index(),
+        faq_threshold=config.faq_match_threshold,
+    )
+
+@lru_cache()
+def get_webhook_dispatcher() -> WebhookDispatcher:
+    return WebhookDispatcher(
+        run_turn=_run_webhook_turn,
+        outbound=get_outbound_client(),
+        workers=per_worker(settings.WEBHOOK_WORKERS),
+        max_queue=per_worker(settings.WEBHOOK_QUEUE_SIZE),
+        dedup=get_dedup_store(),
+    )
+
+def reset_singletons() -> None:
+    """
+    Drop per-process singletons in a forked child. Pools, event-loop bound
+    clients and worker tasks inherited from the parent must not be shared,
+    so each worker rebuilds its own on first use.
+    """
+    global _pg_pool, _checkpointer, _graph, _graph_lock
+    _pg_pool = None
+    _checkpointer = None
+    _graph = None
+    _graph_lock = threading.Lock()
+    for factory in (
+        get_llm_manager,
+        get_memory_controller,
+        get_faq_index,
+        get_ingest_manifest,
+        get_admission_controller,
+        get_dedup_store,
+        get_outbound_client,
+        get_webhook_dispatcher,
+    ):
+        factory.cache_clear()
+    lightrag_client.reset()
+
+# uvicorn spawns fresh workers, but servers that fork a preloaded app
+# (gunicorn --preload) would otherwise share the parent's pools
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_singletons)
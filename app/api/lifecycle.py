@@ -0,0 +1,134 @@
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import FastAPI
+
+from app.agent.runner import run_agent
+from app.api import deps
+from app.config.settings import settings
+from app.channels.core.models import ChannelType, InternalMessage
+
+logger = logging.getLogger(__name__)
+
+
+def _in_thread(fn: Callable[[], Any]) -> Callable[[], Awaitable[Any]]:
+    # Pool, table setup, mem0 and graph compilation are blocking
+    return lambda: asyncio.to_thread(fn)
+
+
+class Lifecycle:
+    """
+    Warm-up and shutdown of the heavy singletons in `deps`, so the first
+    requests after a deploy don't pay for pool connections, table setup,
+    mem0/Qdrant init, LLM clients and graph compilation.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.finished = False
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    async def _step(self, name: str, fn: Callable[[], Any], required: bool = True) -> bool:
+        """Run one warm-up step; returns False only if a required step failed."""
+        started = time.perf_counter()
+        try:
+            result = fn()
+            if inspect.isawaitable(result):
+                await result
+            self.steps[name] = {"ok": True, "seconds": round(time.perf_counter() - started, 3)}
+            return True
+        except Exception as e:
+            logger.error(f"Warm-up step '{name}' failed: {e}")
+            self.steps[name] = {
+                "ok": False,
+                "required": required,
+                "seconds": round(time.perf_counter() - started, 3),
+                "error": str(e),
+            }
+            return not required
+
+    async def warm_up(self) -> None:
+        started = time.perf_counter()
+        ok = await self._step("postgres", _in_thread(lambda: deps.get_postgres_pool().wait()))
+        ok &= await self._step("checkpointer", _in_thread(deps.get_checkpointer))
+        ok &= await self._step("memory", _in_thread(deps.get_memory_controller), required=False)
+        ok &= await self._step("llm", _in_thread(deps.get_llm_manager))
+        ok &= await self._step("lightrag", self._check_lightrag, required=False)
+        ok &= await self._step("faq_index", _in_thread(deps.get_faq_index), required=False)
+        ok &= await self._step("graph", _in_thread(deps.get_agent_graph))
+        ok &= await self._step("dedup", _in_thread(deps.get_dedup_store))
+        ok &= await self._step("webhooks", lambda: deps.get_webhook_dispatcher().start())
+        if settings.WARMUP_DRY_RUN:
+            ok &= await self._step("dry_run", self._dry_run, required=False)
+
+        self.ready = ok
+        self.finished = True
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s (ready={ok})")
+
+    async def _check_lightrag(self) -> None:
+        # Also opens the pooled HTTP client on the serving loop
+        if not await deps.get_lightrag_client().check_health():
+            raise RuntimeError("LightRAG health check failed")
+
+    async def _dry_run(self) -> None:
+        graph = await asyncio.to_thread(deps.get_agent_graph)
+        message = InternalMessage(
+            user_id="__warmup__",
+            channel=ChannelType.WEB,
+            text=settings.WARMUP_DRY_RUN_TEXT,
+        )
+        # A fresh thread per run, deleted afterwards, so warm-ups don't pile
+        # up history that every later warm-up would load and send to the LLM
+        thread_id = f"__warmup__:{uuid.uuid4().hex}"
+        try:
+            response = await run_agent(
+                graph,
+                message,
+                session_context={"thread_id": thread_id},
+                durability=deps.get_agent_config().checkpoint_durability,
+            )
+        finally:
+            checkpointer = getattr(graph, "checkpointer", None)
+            if checkpointer is not None:
+                await self._close("warm-up thread", asyncio.to_thread(checkpointer.delete_thread, thread_id))
+        if "error" in response.metadata:
+            raise RuntimeError(response.metadata["error"])
+
+    async def shut_down(self) -> None:
+        self.ready = False
+        # Only close what was actually created
+        if deps.get_webhook_dispatcher.cache_info().currsize:
+            await self._close("webhooks", deps.get_webhook_dispatcher().stop(settings.SHUTDOWN_DRAIN_TIMEOUT))
+        if deps.get_outbound_client.cache_info().currsize:
+            await self._close("outbound", deps.get_outbound_client().close())
+        await self._close("lightrag", deps.get_lightrag_client().aclose())
+        if deps.get_ingest_manifest.cache_info().currsize:
+            await self._close("ingest_manifest", asyncio.to_thread(deps.get_ingest_manifest().close))
+        await self._close("postgres", asyncio.to_thread(deps.close_postgres_pool))
+
+    async def _close(self, name: str, closing: Awaitable) -> None:
+        try:
+            await closing
+        except Exception as e:
+            logger.warning(f"Error closing {name}: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "finished": self.finished, "steps": self.steps}
+
+
+lifecycle = Lifecycle()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.WARMUP_ENABLED:
+        await lifecycle.warm_up()
+    else:
+        lifecycle.ready = lifecycle.finished = True
+    yield
+    await lifecycle.shut_down()
@@ -1,12 +1,16 @@
 import logging
-from typing import Dict, Any
-from fastapi import FastAPI, Depends, HTTPException, Path
+from typing import Dict, Any, Optional, Tuple
+from fastapi import FastAPI, Depends, HTTPException, Path, Request
 
 
 from app.config.settings import settings
+from app.config.workers import worker_status
 from app.api import deps
 from app.api import admin
-from app.channels.core.models import ChannelType
+from app.api.lifecycle import lifecycle, lifespan
+from app.api.responses import FastJSONResponse
+from app.channels.core.models import ChannelType, InternalMessage
+from app.channels.core.dedup import dedup_key
 from app.channels.web.adapter import WebAdapter
 from app.channels.whatsapp.adapter import WhatsAppAdapter
 from app.channels.telegram.adapter import TelegramAdapter
@@ -18,7 +22,9 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.AGENT_NAME,
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 app.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -33,24 +39,77 @@ adapters = {
 @app.get("/health")
 def health_check(
     llm_manager=Depends(deps.get_llm_manager),
+    admission=Depends(deps.get_admission_controller),
+    dispatcher=Depends(deps.get_webhook_dispatcher),
     # qdrant=Depends(deps.get_qdrant_controller) # Check connection if needed
 ):
     """Health check endpoint."""
     llm_status = llm_manager.check_all_providers()
-    return {
+    faq_index = deps.get_faq_index()
+    return FastJSONResponse({
         "status": "ok",
         "llm_providers": llm_status,
+        "llm_rate_limits": llm_manager.rate_limit_status(),
+        "admission": admission.status(),
+        "webhooks": dispatcher.metrics(),
+        "checkpoint_cache": deps.checkpoint_cache_status(),
+        "knowledge_base": deps.get_lightrag_client().status(),
+        "faq_entries": len(faq_index) if faq_index is not None else None,
+        "worker": worker_status(),
         "environment": settings.ENVIRONMENT
+    })
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: 200 once warm-up has initialized every required dependency."""
+    status = lifecycle.status()
+    return FastJSONResponse(status, status_code=200 if lifecycle.ready else 503)
+
+# Channels whose providers deliver via webhooks and accept replies through their API
+WEBHOOK_CHANNELS = {ChannelType.WHATSAPP, ChannelType.TELEGRAM}
+
+# Bodies are read from the raw request, so document them explicitly
+JSON_OBJECT_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"type": "object"}}},
     }
+}
+
+async def _decode_request(adapter, request: Request) -> Tuple[Optional[InternalMessage], Optional[str]]:
+    """
+    Returns the InternalMessage (None if the webhook carries no user message)
+    and the channel-native message id.
+    With FAST_DECODE the raw bytes go straight into the adapter's typed schema
+    and the webhook is kept as an unparsed RawPayload instead of a dict copy.
+    """
+    if settings.FAST_DECODE:
+        message = adapter.from_bytes(await request.body())
+        return message, message.metadata.get("delivery_id") if message else None
+
+    payload = await request.json()
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    return adapter.from_request(payload), adapter.message_id(payload)
+
+def _claim_key(channel_name: ChannelType, message_id: Optional[str], dedup) -> Optional[str]:
+    if dedup is None or not message_id:
+        return None
+    return dedup_key(channel_name, message_id)
 
-@app.post("/v1/chat/{channel_name}")
+@app.post("/v1/chat/{channel_name}", openapi_extra=JSON_OBJECT_BODY)
 async def chat_endpoint(
     channel_name: ChannelType,
-    payload: Dict[str, Any],
-    graph = Depends(deps.get_agent_graph)
+    request: Request,
+    _slot = Depends(deps.admission_slot),
+    graph = Depends(deps.get_agent_graph),
+    dedup = Depends(deps.get_dedup_store)
 ):
     """
     Unified chat endpoint for all channels.
+    Requests beyond the admission limits get a 503 with Retry-After.
+    Re-delivered messages (same channel message id) return the stored response
+    without running the agent again.
     """
     if channel_name not in adapters:
          raise HTTPException(status_code=400, detail=f"Unsupported channel: {channel_name}")
@@ -59,18 +118,89 @@ async def chat_endpoint(
     
     # 1. Adapt Request
     try:
-        internal_msg = adapter.from_request(payload)
+        internal_msg, message_id = await _decode_request(adapter, request)
     except Exception as e:
         logger.error(f"Error parsing request for {channel_name}: {e}")
         raise HTTPException(status_code=400, detail="Invalid request format")
+    if internal_msg is None:
+        return FastJSONResponse({"status": "ignored"})
 
-    # 2. Run Agent
+    # 2. Drop re-deliveries
+    key = _claim_key(channel_name, message_id, dedup)
+    if key:
+        claim = await dedup.claim(key)
+        if claim.is_duplicate:
+            logger.info(f"Duplicate delivery {key}, skipping agent")
+            return FastJSONResponse(claim.response or {"status": "duplicate"})
+
+    # 3. Run Agent
     # Note: run_agent is async wrapper
     try:
-        internal_response = await run_agent(graph, internal_msg)
+        agent_config = deps.get_agent_config()
+        internal_response = await run_agent(
+            graph,
+            internal_msg,
+            durability=agent_config.checkpoint_durability,
+            faq_index=deps.get_faq_index(),
+            faq_threshold=agent_config.faq_match_threshold,
+        )
     except Exception as e:
         logger.error(f"Agent execution error: {e}")
+        if key:
+            await dedup.release(key)
         raise HTTPException(status_code=500, detail="Internal agent error")
     
-    # 3. Adapt Response
-    return adapter.to_response(internal_response)
+    # 4. Adapt Response
+    response = adapter.to_response(internal_response)
+    if key:
+        if "error" in internal_response.metadata:
+            # Allow the provider's retry to run the turn again
+            await dedup.release(key)
+        else:
+            await dedup.complete(key, response)
+    # Adapters already return plain JSON types; skip jsonable_encoder
+    return FastJSONResponse(response)
+
+@app.post("/v1/webhook/{channel_name}", openapi_extra=JSON_OBJECT_BODY)
+async def webhook_endpoint(
+    channel_name: ChannelType,
+    request: Request,
+    dispatcher = Depends(deps.get_webhook_dispatcher),
+    dedup = Depends(deps.get_dedup_store)
+):
+    """
+    Acknowledge-then-process webhook for WhatsApp and Telegram.
+    Validates and enqueues the message, returning 200 immediately; the reply is
+    sent through the outbound channel client once the agent turn completes.
+    """
+    if channel_name not in WEBHOOK_CHANNELS:
+        raise HTTPException(status_code=400, detail=f"Webhook mode not supported for channel: {channel_name}")
+
+    adapter = adapters[channel_name]
+    try:
+        internal_msg, message_id = await _decode_request(adapter, request)
+    except Exception as e:
+        logger.error(f"Error parsing webhook for {channel_name}: {e}")
+        raise HTTPException(status_code=400, detail="Invalid request format")
+    if internal_msg is None:
+        # Status callbacks, edits and button presses: acknowledge without a turn
+        return FastJSONResponse({"status": "ignored"})
+
+    key = _claim_key(channel_name, message_id, dedup)
+    if key:
+        claim = await dedup.claim(key)
+        if claim.is_duplicate:
+            logger.info(f"Duplicate delivery {key}, already queued or answered")
+            return FastJSONResponse({"status": "duplicate"})
+
+    if not dispatcher.submit(internal_msg, dedup_key=key):
+        if key:
+            await dedup.release(key)
+        # Let the provider retry later instead of piling up work
+        raise HTTPException(
+            status_code=503,
+            detail="Webhook queue is full",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)}
+        )
+
+    return FastJSONResponse({"status": "accepted"})
@@ -0,0 +1,39 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional dependency, see the "perf" extra
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types the encoder does not handle natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when installed (stdlib json otherwise).
+
+    Returning an instance directly from an endpoint also bypasses FastAPI's
+    jsonable_encoder pass, which walks the whole payload before rendering.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,14 +1,41 @@
+import json
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 from app.channels.core.models import InternalMessage, InternalResponse
 
 class BaseChannelAdapter(ABC):
     @abstractmethod
-    def from_request(self, raw_request: Any) -> InternalMessage:
-        """Convert a channel-specific request to an InternalMessage."""
+    def from_request(self, raw_request: Any) -> Optional[InternalMessage]:
+        """
+        Convert a channel-specific request to an InternalMessage.
+        Returns None for webhooks that carry no user message (delivery
+        statuses, edits, button callbacks), which are acknowledged and dropped.
+        """
         pass
 
     @abstractmethod
     def to_response(self, internal_response: InternalResponse) -> Any:
         """Convert an InternalResponse to a channel-specific response."""
         pass
+
+    def from_bytes(self, body: bytes) -> Optional[InternalMessage]:
+        """
+        Decode a raw request body into an InternalMessage.
+        The channel-native message id, if any, goes into metadata["delivery_id"].
+        Adapters with typed schemas override this to skip the intermediate dict.
+        """
+        raw_request = json.loads(body)
+        message = self.from_request(raw_request)
+        if message is None:
+            return None
+        delivery_id = self.message_id(raw_request)
+        if delivery_id:
+            message.metadata["delivery_id"] = delivery_id
+        return message
+
+    def message_id(self, raw_request: Any) -> Optional[str]:
+        """
+        Channel-native id of the inbound message, used to drop re-delivered webhooks.
+        Returns None when the channel provides no stable id.
+        """
+        return None
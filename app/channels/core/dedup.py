@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import BaseModel
+
+from app.channels.core.models import ChannelType
+
+logger = logging.getLogger(__name__)
+
+
+class DedupResult(BaseModel):
+    is_duplicate: bool
+    # Stored response of the first delivery, None while it is still being processed
+    response: Optional[Dict[str, Any]] = None
+
+
+def dedup_key(channel: ChannelType, message_id: str) -> str:
+    return f"{channel.value}:{message_id}"
+
+
+class BaseDedupStore(ABC):
+    """
+    Remembers channel-native message ids so re-delivered webhooks skip the agent.
+
+    Usage: `claim` before running the turn, then `complete` with the response,
+    or `release` when the turn failed so the provider's retry is processed.
+    """
+
+    @abstractmethod
+    async def claim(self, key: str) -> DedupResult:
+        """Atomically mark `key` as seen. Returns is_duplicate=True if it already was."""
+        pass
+
+    @abstractmethod
+    async def complete(self, key: str, response: Dict[str, Any]) -> None:
+        """Store the response for a claimed key."""
+        pass
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Forget a claimed key that has no response yet."""
+        pass
+
+
+class InMemoryDedupStore(BaseDedupStore):
+    """Per-process store with TTL expiry and a bounded number of entries."""
+
+    def __init__(self, ttl_seconds: int = 86400, max_entries: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        # key -> (expires_at, response); insertion order == expiry order
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _purge(self, now: float, limit: int) -> None:
+        """Drop expired entries, then the oldest ones until at most `limit` remain."""
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= limit:
+                break
+            self._entries.popitem(last=False)
+
+    async def claim(self, key: str) -> DedupResult:
+        now = self.clock()
+        self._purge(now, self.max_entries)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return DedupResult(is_duplicate=True, response=entry[1])
+        self._entries.pop(key, None)
+        # Make room first so the store never holds more than max_entries
+        self._purge(now, self.max_entries - 1)
+        self._entries[key] = (now + self.ttl, None)
+        return DedupResult(is_duplicate=False)
+
+    async def complete(self, key: str, response: Dict[str, Any]) -> None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries[key] = (entry[0], response)
+
+    async def release(self, key: str) -> None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is None:
+            del self._entries[key]
+
+
+class PostgresDedupStore(BaseDedupStore):
+    """
+    Store shared by all replicas. The claim is a single INSERT ... ON CONFLICT,
+    so two replicas receiving the same delivery cannot both win.
+
+    A claim that has no response after `lease_seconds` is treated as
+    abandoned (the replica crashed or restarted mid-turn) and the next
+    delivery takes it over; completed claims are kept for the full TTL.
+    """
+
+    def __init__(self, pool, ttl_seconds: int = 86400, lease_seconds: int = 300, table: str = "webhook_dedup"):
+        self.pool = pool
+        self.ttl = ttl_seconds
+        self.lease = lease_seconds
+        self.table = table
+        self._claims = 0
+
+    def setup(self) -> None:
+        with self.pool.connection() as conn:
+            conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    response JSONB,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )"""
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_created_at_idx ON {self.table} (created_at)")
+
+    def _claim(self, key: str) -> DedupResult:
+        with self.pool.connection() as conn:
+            # A row older than the TTL, or an unanswered one past its lease, is taken over
+            claimed = conn.execute(
+                f"""INSERT INTO {self.table} (key) VALUES (%s)
+                    ON CONFLICT (key) DO UPDATE SET created_at = now(), response = NULL
+                    WHERE {self.table}.created_at < now() - make_interval(secs => %s)
+                       OR ({self.table}.response IS NULL
+                           AND {self.table}.created_at < now() - make_interval(secs => %s))
+                    RETURNING key""",
+                (key, self.ttl, self.lease),
+            ).fetchone()
+            if claimed:
+                self._claims += 1
+                if self._claims % 1000 == 0:
+                    conn.execute(
+                        f"DELETE FROM {self.table} WHERE created_at < now() - make_interval(secs => %s)",
+                        (self.ttl,),
+                    )
+                return DedupResult(is_duplicate=False)
+
+            row = conn.execute(f"SELECT response FROM {self.table} WHERE key = %s", (key,)).fetchone()
+            return DedupResult(is_duplicate=True, response=row[0] if row else None)
+
+    def _complete(self, key: str, response: Dict[str, Any]) -> None:
+        from psycopg.types.json import Jsonb
+
+        with self.pool.connection() as conn:
+            conn.execute(f"UPDATE {self.table} SET response = %s WHERE key = %s", (Jsonb(response), key))
+
+    def _release(self, key: str) -> None:
+        with self.pool.connection() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = %s AND response IS NULL", (key,))
+
+    # The shared pool is synchronous, so keep the event loop free
+    async def claim(self, key: str) -> DedupResult:
+        return await asyncio.to_thread(self._claim, key)
+
+    async def complete(self, key: str, response: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._complete, key, response)
+
+    async def release(self, key: str) -> None:
+        await asyncio.to_thread(self._release, key)
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryError(Exception):
+    """Raised when a channel API rejects a message or retries are exhausted."""
+    pass
+
+
+class SharedHTTPClient:
+    """
+    One pooled httpx.AsyncClient shared by all outbound channel clients.
+    Created lazily so it binds to the serving event loop.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        timeout: float = 15.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.timeout = timeout
+        # Tests pass an ASGI transport pointing at a local fake API
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def get(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, transport=self.transport)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class SendRateLimiter:
+    """
+    Spaces sends so that at most `per_chat_rate` messages/s go to a single chat
+    and at most `global_rate` messages/s leave overall. Each call books a slot
+    and sleeps until it, so no lock is held while waiting. The chat slot is
+    waited for first, so a busy chat never holds global slots hostage.
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        per_chat_rate: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        max_tracked_chats: int = 10000,
+    ):
+        self.global_interval = 1.0 / global_rate
+        self.chat_interval = 1.0 / per_chat_rate
+        self.clock = clock
+        self.sleep = sleep
+        self.max_tracked_chats = max_tracked_chats
+        self._next_global = 0.0
+        self._next_chat: Dict[str, float] = {}
+
+    def reserve_chat(self, chat_id: str) -> float:
+        """Book the next slot for `chat_id` and return how long to wait for it."""
+        now = self.clock()
+        start = max(now, self._next_chat.get(chat_id, 0.0))
+        self._next_chat[chat_id] = start + self.chat_interval
+        if len(self._next_chat) > self.max_tracked_chats:
+            self._next_chat = {k: v for k, v in self._next_chat.items() if v > now}
+        return start - now
+
+    def reserve_global(self, chat_id: str) -> float:
+        """Book the next global slot; pushes the chat's next slot if the send is delayed."""
+        now = self.clock()
+        start = max(now, self._next_global)
+        self._next_global = start + self.global_interval
+        self._next_chat[chat_id] = max(self._next_chat.get(chat_id, 0.0), start + self.chat_interval)
+        return start - now
+
+    async def wait(self, chat_id: str) -> None:
+        delay = self.reserve_chat(chat_id)
+        if delay > 0:
+            await self.sleep(delay)
+        delay = self.reserve_global(chat_id)
+        if delay > 0:
+            await self.sleep(delay)
+
+
+def split_message(text: str, max_length: int) -> List[str]:
+    """
+    Split text into chunks of at most `max_length` characters, preferring
+    paragraph, line and word boundaries.
+    """
+    chunks = []
+    remaining = text
+    while len(remaining) > max_length:
+        window = remaining[:max_length]
+        cut = max_length
+        for separator in ("\n\n", "\n", " "):
+            position = window.rfind(separator)
+            if position > max_length // 2:
+                cut = position
+                break
+        chunks.append(remaining[:cut].rstrip())
+        remaining = remaining[cut:].lstrip()
+    if remaining or not chunks:
+        chunks.append(remaining)
+    return chunks
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    header = response.headers.get("retry-after")
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+    # Telegram puts it in the body: {"parameters": {"retry_after": 3}}
+    try:
+        return float(response.json()["parameters"]["retry_after"])
+    except Exception:
+        return None
+
+
+async def post_with_retry(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    json: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None,
+    max_retries: int = 4,
+    base_delay: float = 0.5,
+    sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+) -> httpx.Response:
+    """POST with exponential backoff and jitter on 429, 5xx and transport errors."""
+    for attempt in range(max_retries + 1):
+        backoff = base_delay * (2 ** attempt) * (0.5 + random.random())
+        try:
+            response = await client.post(url, json=json, headers=headers)
+        except httpx.TransportError as e:
+            if attempt == max_retries:
+                raise DeliveryError(f"Transport error sending message: {e}") from e
+            logger.warning(f"Transport error sending message (attempt {attempt + 1}): {e}")
+            await sleep(backoff)
+            continue
+
+        if response.status_code == 429 or response.status_code >= 500:
+            if attempt == max_retries:
+                raise DeliveryError(f"Giving up after {attempt + 1} attempts: HTTP {response.status_code}")
+            delay = _retry_after(response) if response.status_code == 429 else None
+            logger.warning(f"HTTP {response.status_code} sending message, retrying (attempt {attempt + 1})")
+            await sleep(delay if delay is not None else backoff)
+            continue
+
+        if response.status_code >= 400:
+            raise DeliveryError(f"HTTP {response.status_code} from channel API: {response.text}")
+        return response
+
+    raise DeliveryError("Retries exhausted")
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.channels.core.models import InternalMessage, InternalResponse
+from app.channels.core.outbound import BaseOutboundClient
+from app.channels.core.dedup import BaseDedupStore
+from app.services.resilience import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookDispatcher:
+    """
+    Bounded worker pool for acknowledge-then-process webhooks.
+
+    The webhook handler only validates and enqueues; workers run the agent turn
+    and deliver the reply through the outbound client.
+    """
+
+    def __init__(
+        self,
+        run_turn: Callable[[InternalMessage], Awaitable[InternalResponse]],
+        outbound: BaseOutboundClient,
+        workers: int = 4,
+        max_queue: int = 100,
+        dedup: Optional[BaseDedupStore] = None,
+    ):
+        self.run_turn = run_turn
+        self.outbound = outbound
+        self.dedup = dedup
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.queue_lag = LatencyStats()
+        self.turn_latency = LatencyStats()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Start workers on the running event loop (idempotent)."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Webhook dispatcher started with {self.workers} workers")
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Let queued turns finish for up to `drain_timeout` seconds, then cancel workers."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Webhook dispatcher stopped with {self._queue.qsize()} turns still queued")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Turns that never started: let their redeliveries through
+        while not self._queue.empty():
+            _, _, dedup_key = self._queue.get_nowait()
+            if self.dedup and dedup_key:
+                await self._release(dedup_key)
+
+    def submit(self, message: InternalMessage, dedup_key: Optional[str] = None) -> bool:
+        """
+        Enqueue a turn. Returns False when the queue is full.
+        `dedup_key` is completed with the response (or released on failure) once the turn ends.
+        """
+        self.start()
+        try:
+            self._queue.put_nowait((time.monotonic(), message, dedup_key))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Webhook queue full ({self.max_queue}); rejecting {message.channel.value} message")
+            return False
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            enqueued_at, message, dedup_key = await self._queue.get()
+            started_at = time.monotonic()
+            self.queue_lag.observe(started_at - enqueued_at)
+            completed = False
+            try:
+                response = await self.run_turn(message)
+                await self.outbound.send(message, response)
+                self.processed += 1
+                if self.dedup and dedup_key:
+                    await self.dedup.complete(dedup_key, response.model_dump())
+                completed = True
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Webhook worker {index} failed for {message.channel.value}:{message.user_id}: {e}")
+            finally:
+                # Also runs when stop() cancels the worker mid-turn, so the
+                # provider's redelivery is processed instead of dropped
+                if not completed and self.dedup and dedup_key:
+                    await asyncio.shield(self._release(dedup_key))
+                self.turn_latency.observe(time.monotonic() - started_at)
+                self._queue.task_done()
+
+    async def _release(self, dedup_key: str) -> None:
+        try:
+            await self.dedup.release(dedup_key)
+        except Exception as e:
+            logger.error(f"Failed to release dedup key {dedup_key}: {e}")
+
+    def metrics(self) -> Dict:
+        return {
+            "workers": self.workers if self.running else 0,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "queue_lag": self.queue_lag.as_dict(),
+            "turn_latency": self.turn_latency.as_dict(),
+        }
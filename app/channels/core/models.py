@@ -1,3 +1,4 @@
+import json
 from enum import Enum
 from typing import List, Optional, Any
 from pydantic import BaseModel
@@ -7,6 +8,29 @@ class ChannelType(str, Enum):
     WHATSAPP = "whatsapp"
     TELEGRAM = "telegram"
 
+class RawPayload:
+    """
+    Reference to the undecoded request body.
+    Fast-path adapters keep this in metadata instead of a deep copy of the webhook;
+    it is only parsed if something actually asks for it.
+    """
+    __slots__ = ("body", "_decoded")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._decoded = None
+
+    def json(self) -> Any:
+        if self._decoded is None:
+            self._decoded = json.loads(self.body)
+        return self._decoded
+
+    def __len__(self) -> int:
+        return len(self.body)
+
+    def __repr__(self) -> str:
+        return f"RawPayload({len(self.body)} bytes)"
+
 class Attachment(BaseModel):
     type: str  # "image", "file", etc.
     url: str
@@ -0,0 +1,59 @@
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from app.channels.core.models import ChannelType, InternalMessage, InternalResponse
+
+logger = logging.getLogger(__name__)
+
+
+class BaseOutboundClient(ABC):
+    """Delivers agent replies to a channel outside of the inbound HTTP request."""
+
+    @abstractmethod
+    async def send(self, message: InternalMessage, response: InternalResponse) -> None:
+        """Send `response` back to the sender of `message`."""
+        pass
+
+    async def close(self) -> None:
+        """Release any pooled connections."""
+        pass
+
+
+class StubOutboundClient(BaseOutboundClient):
+    """
+    Local stand-in that records deliveries instead of calling channel APIs.
+    Used in tests and in environments without channel credentials.
+    """
+
+    def __init__(self, max_records: int = 1000):
+        self.sent: Deque[Tuple[InternalMessage, InternalResponse]] = deque(maxlen=max_records)
+
+    async def send(self, message: InternalMessage, response: InternalResponse) -> None:
+        logger.info(f"[stub outbound] {message.channel.value}:{message.user_id} <- {response.text[:80]!r}")
+        self.sent.append((message, response))
+
+
+class ChannelOutboundRouter(BaseOutboundClient):
+    """Routes each reply to the client registered for the message's channel."""
+
+    def __init__(
+        self,
+        clients: Dict[ChannelType, BaseOutboundClient],
+        fallback: Optional[BaseOutboundClient] = None,
+        on_close=None,
+    ):
+        self.clients = clients
+        self.fallback = fallback or StubOutboundClient()
+        self._on_close = on_close
+
+    async def send(self, message: InternalMessage, response: InternalResponse) -> None:
+        client = self.clients.get(message.channel, self.fallback)
+        await client.send(message, response)
+
+    async def close(self) -> None:
+        for client in self.clients.values():
+            await client.close()
+        if self._on_close:
+            await self._on_close()
@@ -1,14 +1,18 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from app.channels.core.base_adapter import BaseChannelAdapter
-from app.channels.core.models import InternalMessage, InternalResponse, ChannelType
+from app.channels.core.models import InternalMessage, InternalResponse, ChannelType, RawPayload
+from app.channels.telegram.schemas import TelegramUpdate
 
 class TelegramAdapter(BaseChannelAdapter):
-    def from_request(self, raw_request: Dict[str, Any]) -> InternalMessage:
+    def from_request(self, raw_request: Dict[str, Any]) -> Optional[InternalMessage]:
         # Placeholder for Telegram webhook payload
-        message = raw_request.get("message", {})
-        user_id = str(message.get("from", {}).get("id", "unknown_tg"))
+        message = raw_request.get("message") or {}
         text = message.get("text", "")
-        
+        # edited_message, callback_query and the like carry no new text message
+        if not text:
+            return None
+        user_id = str(message.get("from", {}).get("id", "unknown_tg"))
+
         return InternalMessage(
             user_id=user_id,
             channel=ChannelType.TELEGRAM,
@@ -16,6 +20,30 @@ class TelegramAdapter(BaseChannelAdapter):
             metadata=raw_request
         )
 
+    def from_bytes(self, body: bytes) -> Optional[InternalMessage]:
+        update = TelegramUpdate.model_validate_json(body)
+        message = update.message
+        if message is None or not message.text:
+            return None
+        user = message.from_user
+        metadata = {"raw": RawPayload(body)}
+        if message.chat:
+            metadata["chat_id"] = message.chat.id
+        if update.update_id is not None:
+            metadata["delivery_id"] = str(update.update_id)
+
+        return InternalMessage(
+            user_id=str(user.id) if user else "unknown_tg",
+            channel=ChannelType.TELEGRAM,
+            text=message.text,
+            metadata=metadata
+        )
+
+    def message_id(self, raw_request: Dict[str, Any]) -> Optional[str]:
+        # Telegram re-sends the same update_id until the webhook answers 200
+        update_id = raw_request.get("update_id")
+        return str(update_id) if update_id is not None else None
+
     def to_response(self, internal_response: InternalResponse) -> Dict[str, Any]:
         # Return format for Telegram (usually we'd call an API directly, 
         # but here we return a dict description or webhook response)
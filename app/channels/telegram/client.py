@@ -0,0 +1,59 @@
+import logging
+from typing import Optional
+
+from app.channels.core.delivery import DeliveryError, SendRateLimiter, SharedHTTPClient, post_with_retry, split_message
+from app.channels.core.models import InternalMessage, InternalResponse
+from app.channels.core.outbound import BaseOutboundClient
+
+logger = logging.getLogger(__name__)
+
+# Bot API hard limit for a single text message
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+
+class TelegramOutboundClient(BaseOutboundClient):
+    """Sends replies with the Bot API `sendMessage` method."""
+
+    def __init__(
+        self,
+        bot_token: str,
+        http: SharedHTTPClient,
+        api_url: str = "https://api.telegram.org",
+        global_rate: float = 30.0,
+        per_chat_rate: float = 1.0,
+        max_retries: int = 4,
+        # Off by default: replies are split at arbitrary offsets, and markup
+        # cut across two chunks is rejected by the Bot API
+        parse_mode: Optional[str] = None,
+    ):
+        self.url = f"{api_url.rstrip('/')}/bot{bot_token}/sendMessage"
+        self.http = http
+        self.rate_limiter = SendRateLimiter(global_rate, per_chat_rate)
+        self.max_retries = max_retries
+        self.parse_mode = parse_mode
+
+    @staticmethod
+    def chat_id(message: InternalMessage) -> str:
+        # Group chats reply to the chat, private chats have chat id == user id
+        if "chat_id" in message.metadata:
+            return str(message.metadata["chat_id"])
+        chat = message.metadata.get("message", {}).get("chat", {})
+        return str(chat.get("id", message.user_id))
+
+    async def send(self, message: InternalMessage, response: InternalResponse) -> None:
+        chat_id = self.chat_id(message)
+        client = self.http.get()
+        for chunk in split_message(response.text, TELEGRAM_MAX_MESSAGE_LENGTH):
+            payload = {"chat_id": chat_id, "text": chunk}
+            if self.parse_mode:
+                payload["parse_mode"] = self.parse_mode
+            await self.rate_limiter.wait(chat_id)
+            try:
+                await post_with_retry(client, self.url, json=payload, max_retries=self.max_retries)
+            except DeliveryError as e:
+                if "parse_mode" not in payload or "can't parse entities" not in str(e):
+                    raise
+                logger.warning(f"Telegram rejected {self.parse_mode} markup for chat {chat_id}, resending as plain text")
+                del payload["parse_mode"]
+                await post_with_retry(client, self.url, json=payload, max_retries=self.max_retries)
+        logger.info(f"Delivered Telegram reply to chat {chat_id}")
@@ -0,0 +1,23 @@
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+# Only the fields the agent needs. Everything else in the update (photos,
+# contacts, entities, reply chains...) is skipped by the decoder.
+
+class TelegramUser(BaseModel):
+    id: int
+
+class TelegramChat(BaseModel):
+    id: int
+
+class TelegramMessage(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    message_id: Optional[int] = None
+    from_user: Optional[TelegramUser] = Field(default=None, alias="from")
+    chat: Optional[TelegramChat] = None
+    text: str = ""
+
+class TelegramUpdate(BaseModel):
+    update_id: Optional[int] = None
+    message: Optional[TelegramMessage] = None
@@ -1,6 +1,7 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from app.channels.core.base_adapter import BaseChannelAdapter
 from app.channels.core.models import InternalMessage, InternalResponse, ChannelType
+from app.channels.web.schemas import WebPayload
 
 class WebAdapter(BaseChannelAdapter):
     def from_request(self, raw_request: Dict[str, Any]) -> InternalMessage:
@@ -12,6 +13,24 @@ class WebAdapter(BaseChannelAdapter):
             metadata=raw_request.get("metadata", {})
         )
 
+    def from_bytes(self, body: bytes) -> InternalMessage:
+        payload = WebPayload.model_validate_json(body)
+        metadata = payload.metadata
+        if payload.message_id:
+            metadata["delivery_id"] = payload.message_id
+
+        return InternalMessage(
+            user_id=payload.user_id,
+            channel=ChannelType.WEB,
+            text=payload.text,
+            metadata=metadata
+        )
+
+    def message_id(self, raw_request: Dict[str, Any]) -> Optional[str]:
+        # Optional client-generated id for safe retries
+        message_id = raw_request.get("message_id")
+        return str(message_id) if message_id else None
+
     def to_response(self, internal_response: InternalResponse) -> Dict[str, Any]:
         return {
             "text": internal_response.text,
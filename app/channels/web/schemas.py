@@ -0,0 +1,8 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class WebPayload(BaseModel):
+    user_id: str = "anonymous"
+    text: str = ""
+    metadata: dict = {}
+    message_id: Optional[str] = None
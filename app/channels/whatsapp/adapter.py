@@ -1,22 +1,51 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from app.channels.core.base_adapter import BaseChannelAdapter
-from app.channels.core.models import InternalMessage, InternalResponse, ChannelType
+from app.channels.core.models import InternalMessage, InternalResponse, ChannelType, RawPayload
+from app.channels.whatsapp.schemas import WhatsAppPayload
+
+def _meta_message(raw_request: Dict[str, Any]) -> Dict[str, Any]:
+    # Meta Cloud API: entry[].changes[].value.messages[]
+    try:
+        return raw_request["entry"][0]["changes"][0]["value"]["messages"][0]
+    except (KeyError, IndexError, TypeError):
+        return {}
 
 class WhatsAppAdapter(BaseChannelAdapter):
-    def from_request(self, raw_request: Dict[str, Any]) -> InternalMessage:
-        # Placeholder for WhatsApp payload structure parsing
-        # Simplification: Assume some standard webhook format
-        # e.g. a Twilio or Meta Graph API payload
-        user_id = raw_request.get("From", "unknown_wa_user")
-        text = raw_request.get("Body", "")
-        
+    """
+    Meta Cloud API webhooks. The sender id, the dedup key and the reply
+    recipient used by WhatsAppOutboundClient all come from the same message.
+    """
+
+    def from_request(self, raw_request: Dict[str, Any]) -> Optional[InternalMessage]:
+        message = _meta_message(raw_request)
+        text = (message.get("text") or {}).get("body", "")
+        # Status callbacks (sent, delivered, read) have no messages[]
+        if not message.get("id") or not text:
+            return None
+
         return InternalMessage(
-            user_id=user_id,
+            user_id=str(message.get("from", "unknown_wa_user")),
             channel=ChannelType.WHATSAPP,
             text=text,
             metadata=raw_request
         )
 
+    def from_bytes(self, body: bytes) -> Optional[InternalMessage]:
+        message = WhatsAppPayload.model_validate_json(body).first_message()
+        if message is None or not message.id or not message.text or not message.text.body:
+            return None
+
+        return InternalMessage(
+            user_id=message.from_user or "unknown_wa_user",
+            channel=ChannelType.WHATSAPP,
+            text=message.text.body,
+            metadata={"raw": RawPayload(body), "delivery_id": message.id}
+        )
+
+    def message_id(self, raw_request: Dict[str, Any]) -> Optional[str]:
+        message_id = _meta_message(raw_request).get("id")
+        return str(message_id) if message_id else None
+
     def to_response(self, internal_response: InternalResponse) -> Dict[str, Any]:
         # Placeholder for WhatsApp response format (e.g. Twilio TwiML)
         return {
@@ -0,0 +1,49 @@
+import logging
+
+from app.channels.core.delivery import SendRateLimiter, SharedHTTPClient, post_with_retry, split_message
+from app.channels.core.models import InternalMessage, InternalResponse
+from app.channels.core.outbound import BaseOutboundClient
+
+logger = logging.getLogger(__name__)
+
+# Cloud API limit for a text message body
+WHATSAPP_MAX_MESSAGE_LENGTH = 4096
+
+
+class WhatsAppOutboundClient(BaseOutboundClient):
+    """Sends replies through the WhatsApp Cloud API `/{phone_number_id}/messages` endpoint."""
+
+    def __init__(
+        self,
+        access_token: str,
+        phone_number_id: str,
+        http: SharedHTTPClient,
+        api_url: str = "https://graph.facebook.com/v19.0",
+        global_rate: float = 80.0,
+        per_chat_rate: float = 1.0,
+        max_retries: int = 4,
+    ):
+        self.url = f"{api_url.rstrip('/')}/{phone_number_id}/messages"
+        self.headers = {"Authorization": f"Bearer {access_token}"}
+        self.http = http
+        self.rate_limiter = SendRateLimiter(global_rate, per_chat_rate)
+        self.max_retries = max_retries
+
+    @staticmethod
+    def recipient(message: InternalMessage) -> str:
+        # The inbound message's "from" wa_id, digits only
+        return message.user_id.lstrip("+")
+
+    async def send(self, message: InternalMessage, response: InternalResponse) -> None:
+        to = self.recipient(message)
+        client = self.http.get()
+        for chunk in split_message(response.text, WHATSAPP_MAX_MESSAGE_LENGTH):
+            payload = {
+                "messaging_product": "whatsapp",
+                "to": to,
+                "type": "text",
+                "text": {"body": chunk},
+            }
+            await self.rate_limiter.wait(to)
+            await post_with_retry(client, self.url, json=payload, headers=self.headers, max_retries=self.max_retries)
+        logger.info(f"Delivered WhatsApp reply to {to}")
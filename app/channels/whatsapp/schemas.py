@@ -0,0 +1,35 @@
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+# Meta Cloud API webhook: entry[].changes[].value.messages[]. Only the fields
+# the agent needs; the rest of the webhook is skipped by the decoder.
+
+class MetaText(BaseModel):
+    body: str = ""
+
+class MetaMessage(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: Optional[str] = None
+    # The sender's WhatsApp id (phone number without "+"), also the reply recipient
+    from_user: Optional[str] = Field(default=None, alias="from")
+    text: Optional[MetaText] = None
+
+class MetaValue(BaseModel):
+    messages: List[MetaMessage] = []
+
+class MetaChange(BaseModel):
+    value: Optional[MetaValue] = None
+
+class MetaEntry(BaseModel):
+    changes: List[MetaChange] = []
+
+class WhatsAppPayload(BaseModel):
+    entry: List[MetaEntry] = []
+
+    def first_message(self) -> Optional[MetaMessage]:
+        for entry in self.entry:
+            for change in entry.changes:
+                if change.value and change.value.messages:
+                    return change.value.messages[0]
+        return None
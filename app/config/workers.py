@@ -0,0 +1,52 @@
+import os
+from typing import Dict
+
+from app.config.settings import settings
+
+# Set by app.server before spawning workers, inherited through the environment
+WORKERS_ENV = "APP_WORKERS"
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process may actually use. Honours the cgroup v2 CPU quota so a
+    container limited to 2 CPUs on a 32-core host gets 2, not 32.
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            count = min(count, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, count)
+
+
+def worker_count() -> int:
+    """Number of server processes sharing this host's resource budgets."""
+    value = os.environ.get(WORKERS_ENV)
+    if value:
+        return max(1, int(value))
+    return settings.WORKERS or 1
+
+
+def per_worker(total: int, minimum: int = 1) -> int:
+    """This worker's share of a budget that is configured for the whole deployment."""
+    return max(minimum, total // worker_count())
+
+
+def worker_status() -> Dict:
+    return {
+        "pid": os.getpid(),
+        "workers": worker_count(),
+        "budgets": {
+            "postgres_connections": per_worker(settings.POSTGRES_MAX_CONNECTIONS),
+            "lightrag_connections": per_worker(settings.LIGHTRAG_MAX_CONNECTIONS),
+            "agent_concurrency": per_worker(settings.ADMISSION_MAX_CONCURRENCY),
+            "webhook_workers": per_worker(settings.WEBHOOK_WORKERS),
+        },
+    }
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Any, Optional
-from langchain_core.language_models.chat_models import BaseChatModel
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
 
 class BaseLLMProvider(ABC):
     def __init__(self, name: str, priority: int):
@@ -8,7 +10,7 @@ class BaseLLMProvider(ABC):
         self.priority = priority
 
     @abstractmethod
-    def get_llm(self, **kwargs) -> BaseChatModel:
+    def get_llm(self, **kwargs) -> "BaseChatModel":
         """Return a LangChain ChatModel instance."""
         pass
 
@@ -1,8 +1,12 @@
 import logging
-from typing import List, Optional, Dict, Literal
+from typing import TYPE_CHECKING, List, Optional, Dict, Literal
 from app.llm.base import BaseLLMProvider
 from app.config.settings import settings
 
+# The rate limiter subclasses langchain's BaseChatModel; keep it off the import path
+if TYPE_CHECKING:
+    from app.llm.rate_limiter import ProviderRateLimiter
+
 logger = logging.getLogger(__name__)
 
 class LLMError(Exception):
@@ -10,10 +14,20 @@ class LLMError(Exception):
     pass
 
 class LLMManager:
-    def __init__(self, providers: List[BaseLLMProvider]):
+    def __init__(
+        self,
+        providers: List[BaseLLMProvider],
+        rate_limiters: Optional[Dict[str, "ProviderRateLimiter"]] = None
+    ):
+        from app.llm.rate_limiter import build_rate_limiter
+
         self.providers = sorted(providers, key=lambda p: p.priority)
         self.mode = settings.LLM_MODE
         self.static_provider_name = settings.LLM_STATIC_PROVIDER
+        self.rate_limiters = rate_limiters or {}
+        for provider in self.providers:
+            if provider.name not in self.rate_limiters:
+                self.rate_limiters[provider.name] = build_rate_limiter(provider.name)
 
     def get_llm(self, **kwargs):
         """
@@ -29,18 +43,64 @@ class LLMManager:
         if not provider:
              raise LLMError(f"Static provider '{self.static_provider_name}' not found.")
         logger.info(f"Using static LLM provider: {provider.name}")
-        return provider.get_llm(**kwargs)
+        return self._with_rate_limits([provider], **kwargs)
 
     def _get_auto_provider(self, **kwargs):
         # Iterate through providers by priority
-        for provider in self.providers:
+        for index, provider in enumerate(self.providers):
             if provider.check_health():
                 logger.info(f"Selected healthy LLM provider: {provider.name}")
-                return provider.get_llm(**kwargs)
+                # Lower priority providers are kept as spillover targets when quotas run out
+                return self._with_rate_limits(self.providers[index:], **kwargs)
         
         # If no provider is healthy
         raise LLMError("No healthy LLM providers available.")
 
+    def _with_rate_limits(self, providers: List[BaseLLMProvider], **kwargs):
+        """
+        Return the primary provider's LLM, wrapped in a RateLimitedChatModel
+        when any of the candidate providers has quotas configured.
+        """
+        primary = providers[0]
+        if not any(self.rate_limiters[p.name].enabled for p in providers):
+            return primary.get_llm(**kwargs)
+
+        from app.llm.rate_limiter import RateLimitedChatModel
+
+        routes = [(primary.name, primary.get_llm(**kwargs), self.rate_limiters[primary.name])]
+        if settings.LLM_RATE_LIMIT_SPILLOVER:
+            routes += self._spillover_routes(providers[1:], **kwargs)
+        return RateLimitedChatModel(
+            routes=routes,
+            max_wait=settings.LLM_RATE_LIMIT_MAX_WAIT,
+            spillover=settings.LLM_RATE_LIMIT_SPILLOVER,
+        )
+
+    def _spillover_routes(self, providers: List[BaseLLMProvider], **kwargs) -> List[tuple]:
+        """
+        Routes for lower priority providers that are healthy and can be built.
+        A provider without credentials, or one that is down, is left out so
+        callers wait for the primary's quota instead of failing on it.
+        """
+        routes = []
+        for provider in providers:
+            if not provider.check_health():
+                logger.info(f"Not using {provider.name} for spillover: health check failed")
+                continue
+            try:
+                routes.append((provider.name, provider.get_llm(**kwargs), self.rate_limiters[provider.name]))
+            except Exception as e:
+                logger.warning(f"Not using {provider.name} for spillover: {e}")
+        return routes
+
+    def rate_limit_status(self) -> Dict[str, Dict]:
+        """Current quota headroom and queue depth per provider with limits configured."""
+        return {
+            name: limiter.status()
+            for name, limiter in self.rate_limiters.items()
+            if limiter.enabled
+        }
+
     def check_all_providers(self) -> Dict[str, bool]:
         """Check health of all providers."""
         status = {}
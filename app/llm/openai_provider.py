@@ -13,6 +13,8 @@ class OpenAIProvider(BaseLLMProvider):
         self.model_name = settings.OPENAI_MODEL or "gpt-3.5-turbo"
 
     def get_llm(self, **kwargs):
+        # Expose x-ratelimit-* headers so the manager's rate limiter can track quota
+        kwargs.setdefault("include_response_headers", True)
         return ChatOpenAI(
             api_key=self.api_key,
             model=self.model_name,
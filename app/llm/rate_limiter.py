@@ -0,0 +1,347 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import ConfigDict
+
+from app.config.settings import settings
+from app.config.workers import per_worker
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a provider's wait queue is full or its deadline expires."""
+    pass
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `per_minute / 60` units per second.
+    Not thread-safe on its own; ProviderRateLimiter guards it with a lock.
+    """
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def can_take(self, amount: float) -> bool:
+        # A single request larger than the bucket can never fit, so it only waits for a full bucket.
+        return self.available() >= min(amount, self.capacity)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def clamp(self, remaining: float) -> None:
+        """Trust the provider when it reports less headroom than we think we have."""
+        self._refill()
+        self.tokens = min(self.tokens, float(remaining))
+
+    def time_until(self, amount: float) -> float:
+        missing = min(amount, self.capacity) - self.available()
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse OpenAI/Groq style reset values ("1m30s", "6ms", "2.5s") or plain seconds ("12").
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    factors = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(num) * factors[unit] for num, unit in parts)
+
+
+class ProviderRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits for a single LLM provider.
+
+    Callers wait in a bounded FIFO queue; when the queue is full `acquire` raises
+    RateLimitExceeded immediately so the caller can spill over or fail fast.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_queue_size: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.clock = clock
+        self.requests = TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+        self.max_queue_size = max_queue_size
+        self.blocked_until = 0.0
+        self._cond = threading.Condition()
+        self._waiters: deque = deque()
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests is not None or self.tokens is not None
+
+    def _try_take(self, tokens: int) -> bool:
+        if self.clock() < self.blocked_until:
+            return False
+        if self.requests and not self.requests.can_take(1):
+            return False
+        if self.tokens and not self.tokens.can_take(tokens):
+            return False
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens:
+            self.tokens.take(tokens)
+        return True
+
+    def _wait_time(self, tokens: int) -> float:
+        wait = max(0.0, self.blocked_until - self.clock())
+        if self.requests:
+            wait = max(wait, self.requests.time_until(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.time_until(tokens))
+        return wait
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Reserve one request and `tokens` tokens.
+        Returns False when the deadline passes; timeout=0 never waits.
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        with self._cond:
+            if not self._waiters and self._try_take(tokens):
+                return True
+            if timeout is not None and timeout <= 0:
+                return False
+            if len(self._waiters) >= self.max_queue_size:
+                raise RateLimitExceeded(
+                    f"Rate limit queue for provider '{self.name}' is full ({self.max_queue_size} waiting)."
+                )
+
+            ticket = object()
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    is_head = self._waiters[0] is ticket
+                    if is_head and self._try_take(tokens):
+                        return True
+                    remaining = None if deadline is None else deadline - self.clock()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    wait = self._wait_time(tokens) if is_head else remaining
+                    if remaining is not None:
+                        wait = remaining if wait is None else min(wait, remaining)
+                    # Guard against busy looping on tiny refill intervals
+                    self._cond.wait(None if wait is None else max(wait, 0.005))
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Correct the token bucket once the provider reports real usage."""
+        if not self.tokens or actual_tokens is None:
+            return
+        with self._cond:
+            diff = estimated_tokens - actual_tokens
+            if diff > 0:
+                self.tokens.give_back(diff)
+            elif diff < 0:
+                self.tokens.take(-diff)
+            self._cond.notify_all()
+
+    def update_from_headers(self, headers: Optional[Mapping[str, Any]]) -> None:
+        """
+        Sync local buckets with the provider's view of our quota
+        (x-ratelimit-remaining-*, x-ratelimit-reset-*, retry-after).
+        """
+        if not headers:
+            return
+        lowered = {str(k).lower(): v for k, v in headers.items()}
+        now = self.clock()
+        with self._cond:
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                remaining = lowered.get(f"x-ratelimit-remaining-{kind}")
+                if remaining is None:
+                    continue
+                try:
+                    remaining = float(remaining)
+                except (TypeError, ValueError):
+                    continue
+                if bucket:
+                    bucket.clamp(remaining)
+                if remaining <= 0:
+                    reset = parse_reset_duration(lowered.get(f"x-ratelimit-reset-{kind}"))
+                    if reset:
+                        self.blocked_until = max(self.blocked_until, now + reset)
+
+            retry_after = parse_reset_duration(lowered.get("retry-after"))
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            self._cond.notify_all()
+
+    def penalize(self, seconds: float) -> None:
+        """Block the provider after a 429 without usable headers."""
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "requests_available": round(self.requests.available(), 2) if self.requests else None,
+                "tokens_available": round(self.tokens.available(), 2) if self.tokens else None,
+                "queued": len(self._waiters),
+                "blocked_for": round(max(0.0, self.blocked_until - self.clock()), 3),
+            }
+
+
+def build_rate_limiter(provider_name: str) -> ProviderRateLimiter:
+    """
+    Create a limiter from `<PROVIDER>_RPM` / `<PROVIDER>_TPM` settings.
+    Provider quotas are per account, so each server worker gets its share.
+    """
+    prefix = provider_name.upper()
+    rpm = getattr(settings, f"{prefix}_RPM", None)
+    tpm = getattr(settings, f"{prefix}_TPM", None)
+    return ProviderRateLimiter(
+        name=provider_name,
+        requests_per_minute=per_worker(rpm) if rpm else None,
+        tokens_per_minute=per_worker(tpm) if tpm else None,
+        max_queue_size=settings.LLM_RATE_LIMIT_QUEUE_SIZE,
+    )
+
+
+def estimate_tokens(messages: List[BaseMessage], max_output_tokens: Optional[int] = None) -> int:
+    """Rough pre-flight estimate (~4 chars per token) used to reserve TPM budget."""
+    chars = 0
+    for message in messages:
+        content = message.content
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    return chars // 4 + (max_output_tokens or 0) + 1
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+
+class RateLimitedChatModel(BaseChatModel):
+    """
+    Chat model that enforces per-provider limits before delegating to the wrapped model.
+
+    `routes` are (provider_name, model, limiter) tuples in priority order. The first
+    route is preferred; with spillover enabled a call that cannot be admitted right
+    away moves to the next route that has headroom before waiting on the primary.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    routes: List[Tuple[str, Any, ProviderRateLimiter]]
+    max_wait: float = 15.0
+    spillover: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "rate-limited"
+
+    def bind_tools(self, tools, **kwargs):
+        bound = [(name, model.bind_tools(tools, **kwargs), limiter) for name, model, limiter in self.routes]
+        return self.model_copy(update={"routes": bound})
+
+    def _admit(self, tokens: int) -> List[Tuple[str, Any, ProviderRateLimiter]]:
+        """Return the routes to try, starting with one that already holds a reservation."""
+        if self.spillover:
+            for index, route in enumerate(self.routes):
+                try:
+                    if route[2].acquire(tokens, timeout=0):
+                        return self.routes[index:]
+                except RateLimitExceeded:
+                    continue
+
+        name, _, limiter = self.routes[0]
+        if limiter.acquire(tokens, timeout=self.max_wait):
+            return self.routes
+        raise RateLimitExceeded(f"Timed out after {self.max_wait}s waiting for provider '{name}' quota.")
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = estimate_tokens(messages, kwargs.get("max_tokens"))
+        routes = self._admit(tokens)
+        last_error: Optional[Exception] = None
+
+        for attempt, (name, model, limiter) in enumerate(routes):
+            # The admitted route already holds a reservation; spillover routes take their own.
+            if attempt > 0 and not limiter.acquire(tokens, timeout=0):
+                continue
+            try:
+                message = model.invoke(messages, stop=stop, **kwargs)
+            except Exception as e:
+                last_error = e
+                if _is_rate_limit_error(e):
+                    headers = getattr(getattr(e, "response", None), "headers", None)
+                    limiter.update_from_headers(headers)
+                    if not headers:
+                        limiter.penalize(1.0)
+                    logger.warning(f"Provider '{name}' rate limited us, trying next provider.")
+                    continue
+                if attempt + 1 < len(routes):
+                    logger.warning(f"Provider '{name}' failed ({e}), trying next provider.")
+                    continue
+                raise
+
+            limiter.update_from_headers(message.response_metadata.get("headers"))
+            usage = getattr(message, "usage_metadata", None) or {}
+            limiter.reconcile(tokens, usage.get("total_tokens"))
+            if not isinstance(message, AIMessage):
+                message = AIMessage(content=message.content)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        if last_error:
+            raise last_error
+        raise RateLimitExceeded("All LLM providers are over quota.")
@@ -0,0 +1,44 @@
+import importlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.llm.base import BaseLLMProvider
+
+logger = logging.getLogger(__name__)
+
+# name -> (module, class, default priority). Provider modules import their
+# SDKs at module level, so they are only imported once actually selected.
+PROVIDER_REGISTRY: Dict[str, Tuple[str, str, int]] = {
+    "openai": ("app.llm.openai_provider", "OpenAIProvider", 1),
+    "groq": ("app.llm.groq_provider", "GroqProvider", 2),
+    "ollama": ("app.llm.ollama_provider", "OllamaProvider", 3),
+}
+
+
+def configured_provider_names() -> List[str]:
+    """
+    Providers to load: LLM_PROVIDERS if set, the static provider in static
+    mode, otherwise every provider with credentials (Ollama needs none).
+    """
+    if settings.LLM_PROVIDERS:
+        return [name for name in settings.LLM_PROVIDERS if name in PROVIDER_REGISTRY]
+    if settings.LLM_MODE == "static" and settings.LLM_STATIC_PROVIDER in PROVIDER_REGISTRY:
+        return [settings.LLM_STATIC_PROVIDER]
+    names = []
+    if settings.OPENAI_API_KEY:
+        names.append("openai")
+    if settings.GROQ_API_KEY:
+        names.append("groq")
+    names.append("ollama")
+    return names
+
+
+def load_providers(names: Optional[List[str]] = None) -> List[BaseLLMProvider]:
+    providers = []
+    for name in names if names is not None else configured_provider_names():
+        module_name, class_name, priority = PROVIDER_REGISTRY[name]
+        provider_cls = getattr(importlib.import_module(module_name), class_name)
+        providers.append(provider_cls(priority=priority))
+    logger.info(f"Loaded LLM providers: {[p.name for p in providers]}")
+    return providers
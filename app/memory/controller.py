@@ -1,6 +1,5 @@
 import logging
 from typing import List, Optional, Union, Dict
-from mem0 import Memory
 from app.config.settings import settings
 from app.memory.models import MemoryItem
 
@@ -8,6 +7,9 @@ logger = logging.getLogger(__name__)
 
 class MemoryController:
     def __init__(self, llm_manager=None):
+        # mem0 pulls in its vector store and LLM clients; import it only when used
+        from mem0 import Memory
+
         # We don't necessarily need llm_manager directly if mem0 handles it, 
         # but we might keep the signature for compatibility or custom config.
         # Mem0 config:
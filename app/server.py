@@ -0,0 +1,46 @@
+"""
+Production entry point: runs the API in N worker processes.
+
+    python -m app.server --workers 4
+
+Connection and concurrency budgets in Settings (POSTGRES_MAX_CONNECTIONS,
+LIGHTRAG_MAX_CONNECTIONS, ADMISSION_MAX_CONCURRENCY, LLM rate limits, ...)
+are totals for the deployment; each worker takes 1/N of them.
+"""
+import argparse
+import logging
+import os
+
+import uvicorn
+
+from app.config.settings import settings
+from app.config.workers import WORKERS_ENV, available_cpus
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Run {settings.AGENT_NAME} API workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="Defaults to WORKERS or the number of usable CPUs")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    workers = args.workers or settings.WORKERS or available_cpus()
+    # Workers are spawned fresh and read their share of the budgets from here
+    os.environ[WORKERS_ENV] = str(workers)
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info(f"Starting {workers} worker(s) on {args.host}:{args.port}")
+    uvicorn.run(
+        "app.api.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+import fcntl
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Lines like "Q: ...", "Question: ...", "A: ...", "Answer: ..."
+_QA_LINE = re.compile(r"^\s*(?:\*\*)?(q|question|a|answer)\s*[:.)-]\s*(?:\*\*)?\s*(.*)$", re.IGNORECASE)
+# Markdown headings that are questions: "## How do I return an item?"
+_QUESTION_HEADING = re.compile(r"^\s*#{1,6}\s+(.+\?)\s*$")
+
+# Question words and negations are kept as terms: "when" vs "where", or
+# "can" vs "cannot", change what is being asked
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from i in is it me my of on or our the to "
+    "will with you your".split()
+)
+_QUESTION_WORDS = frozenset("how what when where which who whom whose why".split())
+_NEGATIONS = frozenset("no not never cannot without nt".split())
+
+
+def normalize(text: str) -> str:
+    """Case, accent, punctuation and whitespace insensitive form used for exact matches."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    # "don't" normalizes to "don t"; keep the negation as "nt"
+    tokens = ["nt" if t == "t" else t for t in normalize(text).split()]
+    return [t for t in tokens if t not in _STOPWORDS] or tokens
+
+
+def same_intent(query_terms, question_terms) -> bool:
+    """
+    Near matches must agree on negation and, when the query has any, on its
+    question words; otherwise "Who reset my password?" would match "How do
+    I reset my password?" on the shared terms alone.
+    """
+    query_terms, question_terms = set(query_terms), set(question_terms)
+    if query_terms & _NEGATIONS != question_terms & _NEGATIONS:
+        return False
+    asked = query_terms & _QUESTION_WORDS
+    return not asked or asked == question_terms & _QUESTION_WORDS
+
+
+def parse_faq_pairs(text: str) -> List[Tuple[str, str]]:
+    """Extract (question, answer) pairs from Q:/A: blocks or question headings."""
+    pairs = []
+    question: Optional[str] = None
+    answer_lines: List[str] = []
+
+    def finish():
+        if question and answer_lines:
+            pairs.append((question, "\n".join(answer_lines).strip()))
+
+    for line in text.splitlines():
+        qa = _QA_LINE.match(line)
+        heading = _QUESTION_HEADING.match(line)
+        if (qa and qa.group(1).lower() in ("q", "question")) or heading:
+            finish()
+            question = (qa.group(2) if qa else heading.group(1)).strip()
+            answer_lines = []
+        elif qa:
+            answer_lines = [qa.group(2).strip()]
+        elif question and (line.strip() or answer_lines):
+            answer_lines.append(line.strip())
+    finish()
+    return [(q, a) for q, a in pairs if q and a]
+
+
+class FAQEntry(NamedTuple):
+    question: str
+    answer: str
+    # Synced document the pair was parsed from; None for entries added directly
+    source_id: Optional[str] = None
+
+
+class FAQMatch(NamedTuple):
+    entry: FAQEntry
+    # 1.0 for exact (normalized) matches, otherwise relative BM25 in [0, 1]
+    score: float
+    exact: bool
+
+
+class FAQIndex:
+    """
+    In-process FAQ lookup: a hash table of normalized questions for exact
+    matches plus a BM25 inverted index over question tokens for near matches.
+    Entries are persisted as JSON at `path`; postings are rebuilt on load and
+    updated incrementally as entries are added. Every worker process holds
+    its own copy: writes merge into the file under an exclusive lock, and
+    lookups reload it when another process has rewritten it.
+
+    BM25 scores are unbounded, so a match is scored against the best the
+    query or the FAQ question could reach on their own; a paraphrase with
+    the same terms scores near 1.0, a partial overlap much lower. Near
+    matches that ask a different question word or flip a negation are
+    rejected outright.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.entries: List[FAQEntry] = []
+        self._exact: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: List[int] = []
+        self._total_length = 0
+        # term -> {doc: BM25 weight}; depends on corpus size and average length,
+        # so it is cleared whenever an entry is added and refilled lazily
+        self._weights: Dict[str, Dict[int, float]] = {}
+        self._lock = threading.Lock()
+        # (mtime_ns, size) of the file as last read or written by this process
+        self._file_version: Optional[Tuple[int, int]] = None
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # --- building ---
+
+    def _reset(self) -> None:
+        self.entries = []
+        self._exact = {}
+        self._postings = {}
+        self._lengths = []
+        self._total_length = 0
+        self._weights.clear()
+
+    def _index(self, entry: FAQEntry) -> bool:
+        key = normalize(entry.question)
+        if not key:
+            return False
+        if key in self._exact:
+            # Re-ingested question: keep the newest answer
+            self.entries[self._exact[key]] = entry
+            return False
+        doc_id = len(self.entries)
+        self.entries.append(entry)
+        self._exact[key] = doc_id
+        tokens = tokenize(entry.question)
+        for term, count in Counter(tokens).items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        self._lengths.append(len(tokens))
+        self._total_length += len(tokens)
+        self._weights.clear()
+        return True
+
+    def _drop(self, predicate: Callable[[FAQEntry], bool]) -> int:
+        # Doc ids are list positions, so removal rebuilds the postings
+        kept = [entry for entry in self.entries if not predicate(entry)]
+        removed = len(self.entries) - len(kept)
+        if removed:
+            self._reset()
+            for entry in kept:
+                self._index(entry)
+        return removed
+
+    def add(self, question: str, answer: str) -> bool:
+        """Add one entry and persist; returns False if the question was already indexed (its answer is updated)."""
+        return self.add_pairs([(question.strip(), answer.strip())]) == 1
+
+    def add_document(self, text: str, source_id: Optional[str] = None) -> int:
+        """
+        Index the Q/A pairs found in an ingested document and persist.
+        With `source_id`, the pairs replace those of the document's previous
+        version. Returns new entries.
+        """
+        return self.add_pairs(parse_faq_pairs(text), source_id)
+
+    def add_pairs(self, pairs: List[Tuple[str, str]], source_id: Optional[str] = None) -> int:
+        if not pairs and source_id is None:
+            return 0
+        with self._file_lock():
+            # Merge into whatever other workers wrote since this one last read
+            self.refresh()
+            with self._lock:
+                if source_id is not None:
+                    self._drop(lambda entry: entry.source_id == source_id)
+                added = sum(self._index(FAQEntry(q, a, source_id)) for q, a in pairs)
+            self._write()
+        return added
+
+    def remove_sources(self, source_ids: Iterable[str]) -> int:
+        """Drop the entries parsed from these documents and persist. Returns removed entries."""
+        source_ids = set(source_ids)
+        if not source_ids:
+            return 0
+        with self._file_lock():
+            self.refresh()
+            with self._lock:
+                removed = self._drop(lambda entry: entry.source_id in source_ids)
+            if removed:
+                self._write()
+        return removed
+
+    # --- persistence ---
+
+    @contextmanager
+    def _file_lock(self):
+        """Serializes read-modify-write of the JSON file across worker processes."""
+        if not self.path:
+            yield
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def save(self) -> None:
+        with self._file_lock():
+            self._write()
+
+    def _write(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = [entry._asdict() for entry in self.entries]
+        # Unique temp file, so concurrent writers never share one
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path) or ".", prefix=f"{os.path.basename(self.path)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._file_version = self._stat()
+
+    def load(self) -> None:
+        # Stat before reading: a write in between only causes one more reload
+        version = self._stat()
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            self._reset()
+            for item in data:
+                self._index(FAQEntry(item["question"], item["answer"], item.get("source_id")))
+            self._file_version = version
+        logger.info(f"Loaded {len(self.entries)} FAQ entries from {self.path}")
+
+    def refresh(self) -> bool:
+        """Reload if another process rewrote the file since this one last read it."""
+        if not self.path or self._stat() in (None, self._file_version):
+            return False
+        self.load()
+        return True
+
+    # --- lookup ---
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self.entries) - df + 0.5) / (df + 0.5))
+
+    def _term_score(self, idf: float, tf: int, length: int, avg_length: float) -> float:
+        return idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+
+    def _self_score(self, terms: Counter, avg_length: float) -> float:
+        length = sum(terms.values())
+        return sum(self._term_score(self._idf(t), tf, length, avg_length) for t, tf in terms.items())
+
+    def _term_weights(self, term: str, avg_length: float) -> Dict[int, float]:
+        weights = self._weights.get(term)
+        if weights is None:
+            idf = self._idf(term)
+            weights = {
+                doc: self._term_score(idf, tf, self._lengths[doc], avg_length)
+                for doc, tf in self._postings.get(term, {}).items()
+            }
+            self._weights[term] = weights
+        return weights
+
+    def lookup(self, query: str) -> Optional[FAQMatch]:
+        self.refresh()
+        key = normalize(query)
+        terms = Counter(tokenize(query))
+        # Postings and weights are mutated by add_document in another thread
+        with self._lock:
+            doc_id = self._exact.get(key)
+            if doc_id is not None:
+                return FAQMatch(self.entries[doc_id], 1.0, True)
+            if not self.entries:
+                return None
+
+            avg_length = self._total_length / len(self.entries) or 1.0
+            scores: Dict[int, float] = {}
+            for term in terms:
+                if term not in self._postings:
+                    continue
+                for doc, weight in self._term_weights(term, avg_length).items():
+                    scores[doc] = scores.get(doc, 0.0) + weight
+            if not scores:
+                return None
+
+            best = max(scores, key=scores.get)
+            entry = self.entries[best]
+            question_terms = Counter(tokenize(entry.question))
+            if not same_intent(terms, question_terms):
+                return None
+            ceiling = max(self._self_score(terms, avg_length), self._self_score(question_terms, avg_length))
+            return FAQMatch(entry, min(1.0, scores[best] / ceiling), False)
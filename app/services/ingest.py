@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+if TYPE_CHECKING:
+    from app.services.lightrag import LightRAGClient
+
+logger = logging.getLogger(__name__)
+
+
+def file_key(path: str) -> str:
+    """Identity of a file's current contents: absolute path, size and mtime."""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class UploadJournal:
+    """
+    Append-only JSON-lines record of files LightRAG has accepted, so an
+    interrupted bulk upload resumes with the files it had not finished.
+    A file that changes on disk gets a new key and is uploaded again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._done: Set[str] = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._done.add(json.loads(line)["key"])
+                    except (ValueError, KeyError):
+                        # A line cut short by a crash mid-write
+                        continue
+            logger.info(f"Upload journal {path}: {len(self._done)} files already ingested")
+
+    def is_done(self, key: str) -> bool:
+        return key in self._done
+
+    def record(self, key: str, result: Optional[Dict[str, Any]] = None) -> None:
+        entry = {"key": key, "status": (result or {}).get("status"), "track_id": (result or {}).get("track_id")}
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._done.add(key)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+def lightrag_doc_id(text: str) -> str:
+    """The id LightRAG gives a document inserted from `text` ("doc-" + md5 of the stripped content)."""
+    return "doc-" + hashlib.md5(text.strip().encode("utf-8")).hexdigest()
+
+
+class ManifestEntry(NamedTuple):
+    source_id: str
+    content_hash: str
+    doc_id: str
+
+
+class IngestManifest:
+    """
+    SQLite record of what has been ingested into LightRAG, keyed by the
+    caller's source id: content hash, LightRAG doc id and the last sync run
+    that saw it. Lookups go through the primary key index, so a sync of
+    millions of documents costs one indexed read per document, batched.
+    """
+
+    # Stay under SQLite's bound-parameter limit
+    BATCH = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "source_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL, doc_id TEXT NOT NULL, "
+                "last_run TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS documents_last_run ON documents (last_run)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def lookup(self, source_ids: List[str]) -> Dict[str, ManifestEntry]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(source_ids), self.BATCH):
+                batch = source_ids[start:start + self.BATCH]
+                rows = self._conn.execute(
+                    "SELECT source_id, content_hash, doc_id FROM documents "
+                    f"WHERE source_id IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+                found.update((row[0], ManifestEntry(*row)) for row in rows)
+        return found
+
+    def touch(self, source_ids: List[str], run_id: str) -> None:
+        """Mark unchanged sources as seen by `run_id`."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE documents SET last_run = ? WHERE source_id = ?", ((run_id, s) for s in source_ids)
+            )
+
+    def upsert(self, entries: List[ManifestEntry], run_id: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO documents (source_id, content_hash, doc_id, last_run, updated_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (source_id) DO UPDATE SET "
+                "content_hash = excluded.content_hash, doc_id = excluded.doc_id, "
+                "last_run = excluded.last_run, updated_at = excluded.updated_at",
+                ((e.source_id, e.content_hash, e.doc_id, run_id, now) for e in entries),
+            )
+
+    def missing(self, run_id: str) -> List[ManifestEntry]:
+        """Sources a complete sync run did not see: deleted upstream."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source_id, content_hash, doc_id FROM documents WHERE last_run != ?", (run_id,)
+            ).fetchall()
+        return [ManifestEntry(*row) for row in rows]
+
+    def remove(self, source_ids: List[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM documents WHERE source_id = ?", ((s,) for s in source_ids))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class SyncDocument(NamedTuple):
+    source_id: str
+    text: str
+    description: Optional[str] = None
+
+
+async def sync_documents(
+    client: "LightRAGClient",
+    manifest: IngestManifest,
+    documents: List[SyncDocument],
+    run_id: str,
+    finish: bool = False,
+    delete_missing: bool = False,
+    concurrency: int = 4,
+    on_inserted: Optional[Callable[[SyncDocument], Any]] = None,
+    on_removed: Optional[Callable[[List[str]], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Bring LightRAG in line with `documents`: unchanged sources (same content
+    hash) are skipped, new ones inserted, changed ones deleted from LightRAG
+    and inserted again. A sync may span several calls sharing `run_id`; on
+    the call with `finish`, sources no call of the run saw are reported as
+    deleted upstream and, with `delete_missing`, removed from LightRAG.
+
+    A source that fails to sync still counts as seen by the run. Its
+    manifest row changes only once delete and insert have both succeeded,
+    or is dropped if its old version was deleted but the insert failed, so
+    the next sync inserts it as new.
+
+    `on_inserted` is called with each inserted document and `on_removed`
+    with the source ids whose LightRAG document was deleted (changed or
+    missing), so derived indexes such as the FAQ can follow.
+    """
+    known = await asyncio.to_thread(manifest.lookup, [d.source_id for d in documents])
+    counts = {"new": 0, "changed": 0, "unchanged": 0, "failed": 0}
+    unchanged, pending = [], []
+    for document in documents:
+        entry = known.get(document.source_id)
+        if entry is not None and entry.content_hash == content_hash(document.text):
+            unchanged.append(document.source_id)
+        else:
+            pending.append((document, entry))
+    counts["unchanged"] = len(unchanged)
+    await asyncio.to_thread(manifest.touch, unchanged, run_id)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    failures: List[Dict[str, str]] = []
+
+    async def ingest(document: SyncDocument, previous: Optional[ManifestEntry]) -> None:
+        deleted = False
+        async with semaphore:
+            try:
+                if previous is not None:
+                    await client.delete_documents([previous.doc_id])
+                    deleted = True
+                    if on_removed is not None:
+                        await asyncio.to_thread(on_removed, [document.source_id])
+                await client.insert_text(document.text, description=document.description)
+            except Exception as e:
+                logger.error(f"Sync of {document.source_id} failed: {e}")
+                counts["failed"] += 1
+                failures.append({"source_id": document.source_id, "error": str(e)})
+                if deleted:
+                    # The row would point at a document LightRAG no longer has
+                    await asyncio.to_thread(manifest.remove, [document.source_id])
+                elif previous is not None:
+                    # Still present upstream: not a candidate for `missing`
+                    await asyncio.to_thread(manifest.touch, [document.source_id], run_id)
+                return
+        counts["changed" if previous is not None else "new"] += 1
+        entry = ManifestEntry(document.source_id, content_hash(document.text), lightrag_doc_id(document.text))
+        await asyncio.to_thread(manifest.upsert, [entry], run_id)
+        if on_inserted is not None:
+            await asyncio.to_thread(on_inserted, document)
+
+    await asyncio.gather(*(ingest(document, previous) for document, previous in pending))
+
+    result: Dict[str, Any] = {"run_id": run_id, "counts": counts, "failures": failures}
+    if finish:
+        missing = await asyncio.to_thread(manifest.missing, run_id)
+        result["missing_sources"] = [entry.source_id for entry in missing]
+        if delete_missing:
+            for start in range(0, len(missing), manifest.BATCH):
+                batch = missing[start:start + manifest.BATCH]
+                await client.delete_documents([entry.doc_id for entry in batch])
+                removed = [entry.source_id for entry in batch]
+                await asyncio.to_thread(manifest.remove, removed)
+                if on_removed is not None:
+                    await asyncio.to_thread(on_removed, removed)
+            result["deleted"] = len(missing)
+    return result
@@ -1,32 +1,330 @@
+import asyncio
 import httpx
 import logging
-from typing import Optional, List, Dict, Any
+import mimetypes
+import os
+import secrets
+import threading
+import time
+from typing import Optional, List, Dict, Any, AsyncGenerator, AsyncIterator, BinaryIO, Tuple, Union
 from app.config.settings import settings
+from app.config.workers import per_worker
+from app.services.ingest import UploadJournal, file_key
+from app.services.query_modes import ESCALATION, QueryModeStats, is_empty_result, select_query_mode
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    DeadlineExceeded,
+    LatencyWindow,
+    backoff_delay,
+)
 
 logger = logging.getLogger(__name__)
 
+def format_context(data: Dict[str, Any]) -> str:
+    """Render /query/data results as compact text for the agent's LLM."""
+    sections = []
+    entities = data.get("entities") or []
+    if entities:
+        lines = [
+            f"- {e.get('entity_name', '?')} ({e.get('entity_type', 'unknown')}): {e.get('description', '')}"
+            for e in entities
+        ]
+        sections.append("Entities:\n" + "\n".join(lines))
+    relations = data.get("relationships") or []
+    if relations:
+        lines = [f"- {r.get('src_id', '?')} -> {r.get('tgt_id', '?')}: {r.get('description', '')}" for r in relations]
+        sections.append("Relationships:\n" + "\n".join(lines))
+    chunks = data.get("chunks") or []
+    if chunks:
+        lines = [f"[{c.get('reference_id') or i}] ({c.get('file_path', 'unknown')}) {c.get('content', '')}"
+                 for i, c in enumerate(chunks, 1)]
+        sections.append("Sources:\n" + "\n\n".join(lines))
+    return "\n\n".join(sections)
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    # ~4 characters per token, same estimate as the LLM rate limiter
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit("\n", 1)[0] + "\n[context truncated]"
+
+# Per-attempt timeout (seconds) by endpoint; a caller's deadline can only shorten it
+ENDPOINT_TIMEOUTS = {
+    "/health": 5.0,
+    "/query": 30.0,
+    "/query/data": 15.0,
+    "/insert/text": 120.0,
+    # Applies per read/write of the body, not to the whole upload
+    "/documents/upload": 300.0,
+}
+DEFAULT_TIMEOUT = 120.0
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+class MultipartFileStream(httpx.AsyncByteStream):
+    """
+    multipart/form-data body with a single file field, read from the file
+    `chunk_size` bytes at a time (off the event loop) as it is sent, so
+    memory stays flat whatever the file size. The length is known up front,
+    so the request carries Content-Length rather than chunked encoding.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        filename: str,
+        field: str = "file",
+        content_type: Optional[str] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+    ):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.boundary = secrets.token_hex(16)
+        safe_name = filename.replace("\r", "").replace("\n", "").replace('"', "%22")
+        content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        self.head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{safe_name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode()
+        start = file.tell()
+        self.size = file.seek(0, os.SEEK_END) - start
+        file.seek(start)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(len(self.head) + self.size + len(self.tail)),
+        }
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self.head
+        while chunk := await asyncio.to_thread(self.file.read, self.chunk_size):
+            yield chunk
+        yield self.tail
+
 class LightRAGClient:
-    def __init__(self, base_url: str = "http://lightrag:9621"):
+    def __init__(
+        self,
+        base_url: str = "http://lightrag:9621",
+        max_connections: int = 100,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        connect_timeout: float = 2.0,
+        search_deadline: float = 20.0,
+        max_retries: int = 2,
+        retry_base_delay: float = 0.2,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        breaker: Optional[CircuitBreaker] = None,
+        ingest_breaker: Optional[CircuitBreaker] = None,
+    ):
         self.base_url = base_url.rstrip("/")
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        # Tests pass a transport pointing at a local fake server
+        self.transport = transport
+        self.timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self.connect_timeout = connect_timeout
+        self.search_deadline = search_deadline
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker()
+        # Inserts, uploads and deletes trip their own breaker, so failing bulk
+        # ingestion does not make customer lookups fail fast
+        self.ingest_breaker = ingest_breaker or CircuitBreaker()
+        self.mode_stats = QueryModeStats()
+        self.latency: Dict[str, LatencyWindow] = {}
+        self.counters = {"requests": 0, "retries": 0, "timeouts": 0, "hedged": 0, "hedge_wins": 0}
+        # One pooled client per event loop, with the async generator that closes it
+        self._clients: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, AsyncGenerator]] = {}
+        # Loops on several threads look up, add and drop clients concurrently
+        self._clients_lock = threading.Lock()
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """
+        Pooled client reused across requests. httpx clients are bound to the
+        loop they were first used on, so each event loop gets its own
+        (webhook workers and asyncio.run() in sync tool calls run on their own
+        loops), closed when that loop shuts down.
+        """
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            entry = self._clients.get(loop)
+            if entry is not None and not entry[0].is_closed:
+                return entry[0]
+            # A loop closed without shutting down its async generators can no
+            # longer run its client's close; drop the reference
+            for closed in [other for other in self._clients if other.is_closed()]:
+                del self._clients[closed]
+            client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, limits=self.limits, transport=self.transport)
+            closer = self._close_on_loop_shutdown(loop, client)
+            self._clients[loop] = (client, closer)
+        # Started, the generator is tracked by the loop: asyncio.run() (and
+        # loop.shutdown_asyncgens()) finalizes it before closing the loop
+        await closer.__anext__()
+        return client
+
+    async def _close_on_loop_shutdown(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+        try:
+            yield
+        finally:
+            with self._clients_lock:
+                if self._clients.get(loop, (None,))[0] is client:
+                    del self._clients[loop]
+            await client.aclose()
+
+    def reset(self) -> None:
+        """Forget the pooled clients without closing them (used after fork)."""
+        # Another thread of the parent may have held the lock when it forked
+        self._clients_lock = threading.Lock()
+        self._clients = {}
+
+    async def aclose(self) -> None:
+        """Close the current loop's client now and the clients of other running loops on their own loop."""
+        current = asyncio.get_running_loop()
+        with self._clients_lock:
+            clients = list(self._clients.items())
+        for loop, (client, closer) in clients:
+            if loop is current:
+                await closer.aclose()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(closer.aclose(), loop)
+        with self._clients_lock:
+            self._clients.clear()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            **self.mode_stats.as_dict(),
+            "breaker": self.breaker.status(),
+            "ingest_breaker": self.ingest_breaker.status(),
+            "requests": dict(self.counters),
+            "hedge_delay_ms": {
+                endpoint: round(delay * 1000, 1)
+                for endpoint, window in self.latency.items()
+                if (delay := window.percentile(self.hedge_percentile)) is not None
+            },
+        }
+
+    def _timeout(self, endpoint: str, deadline: Optional[Deadline]) -> httpx.Timeout:
+        seconds = self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+        if deadline is not None:
+            seconds = min(seconds, deadline.remaining())
+        return httpx.Timeout(seconds, connect=min(self.connect_timeout, seconds))
+
+    async def _send(self, method: str, endpoint: str, deadline: Optional[Deadline], **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        client = await self._get_client()
+        response = await client.request(
+            method, f"{self.base_url}{endpoint}", timeout=self._timeout(endpoint, deadline), **kwargs
+        )
+        if response.status_code < 500:
+            self.latency.setdefault(endpoint, LatencyWindow()).observe(time.perf_counter() - started)
+        return response
+
+    async def _send_hedged(self, method: str, endpoint: str, deadline: Optional[Deadline], **kwargs) -> httpx.Response:
+        """
+        Send once; if no response arrives within the endpoint's recent p95
+        latency, send a duplicate and take whichever answers first.
+        """
+        window = self.latency.get(endpoint)
+        delay = window.percentile(self.hedge_percentile) if window else None
+        if delay is None or (deadline is not None and deadline.remaining() <= delay):
+            return await self._send(method, endpoint, deadline, **kwargs)
 
-    async def _request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        primary = asyncio.ensure_future(self._send(method, endpoint, deadline, **kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+        self.counters["hedged"] += 1
+        hedge = asyncio.ensure_future(self._send(method, endpoint, deadline, **kwargs))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        deadline: Optional[Deadline] = None,
+        idempotent: bool = False,
+        breaker: Optional[CircuitBreaker] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Send a request through the circuit breaker (`breaker`, by default the
+        query breaker). Idempotent requests are retried with jittered backoff
+        on transport errors, timeouts and 5xx (and hedged if enabled) until
+        `deadline`. Raises CircuitOpenError without calling LightRAG while the
+        breaker is open.
+        """
         url = f"{self.base_url}{endpoint}"
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        breaker = breaker or self.breaker
+        if not breaker.allow():
+            raise CircuitOpenError(f"LightRAG circuit breaker is open, not calling {endpoint}")
+        self.counters["requests"] += 1
+        attempts = self.max_retries + 1 if idempotent else 1
+        send = self._send_hedged if idempotent and self.hedge else self._send
+        for attempt in range(attempts):
+            if deadline is not None and deadline.expired:
+                self.counters["timeouts"] += 1
+                breaker.record_failure()
+                raise DeadlineExceeded(f"Deadline exceeded before calling {endpoint}")
             try:
-                response = await client.request(method, url, **kwargs)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error requesting {url}: {e.response.text}")
-                raise
-            except Exception as e:
-                logger.error(f"Error communicating with LightRAG: {e}")
-                raise
+                response = await send(method, endpoint, deadline, **kwargs)
+            except httpx.TransportError as e:
+                if isinstance(e, httpx.TimeoutException):
+                    self.counters["timeouts"] += 1
+                failure: Exception = e
+                logger.warning(f"Error communicating with LightRAG ({endpoint}, attempt {attempt + 1}): {e!r}")
+            else:
+                if response.status_code < 500:
+                    # 4xx is LightRAG answering; it says nothing about its health
+                    breaker.record_success()
+                    if response.status_code >= 400:
+                        logger.error(f"HTTP error requesting {url}: {response.text}")
+                    response.raise_for_status()
+                    return response.json()
+                failure = httpx.HTTPStatusError(
+                    f"HTTP {response.status_code} from {url}", request=response.request, response=response
+                )
+                logger.warning(f"HTTP {response.status_code} from LightRAG ({endpoint}, attempt {attempt + 1})")
+            out_of_time = isinstance(failure, httpx.TimeoutException)
+            if attempt + 1 < attempts:
+                delay = backoff_delay(attempt, self.retry_base_delay)
+                if deadline is None or deadline.remaining() > delay:
+                    self.counters["retries"] += 1
+                    await asyncio.sleep(delay)
+                    continue
+                out_of_time = True
+            break
+        breaker.record_failure()
+        logger.error(f"Giving up on LightRAG {endpoint}: {failure!r}")
+        if out_of_time:
+            raise DeadlineExceeded(f"LightRAG {endpoint} did not answer in time") from failure
+        raise failure
 
     async def check_health(self) -> bool:
         try:
             # Assuming a health endpoint exists or root returns 200
-            await self._request("GET", "/health") 
+            await self._request("GET", "/health")
             return True
         except:
             return False
@@ -36,23 +334,74 @@ class LightRAGClient:
         payload = {"text": text}
         if description:
             payload["description"] = description
-        return await self._request("POST", "/insert/text", json=payload)
+        return await self._request("POST", "/insert/text", breaker=self.ingest_breaker, json=payload)
+
+    async def delete_documents(self, doc_ids: List[str]) -> Dict[str, Any]:
+        """Delete documents, with their chunks, entities and relations, from LightRAG."""
+        return await self._request(
+            "DELETE", "/documents/delete_document", breaker=self.ingest_breaker, json={"doc_ids": doc_ids}
+        )
+
+    async def insert_file(
+        self,
+        file: Union[str, BinaryIO],
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload a file (a path or a binary file object) to LightRAG's
+        /documents/upload as a streaming multipart body. LightRAG answers
+        {"status": "success" | "duplicated" | ..., "message", "track_id"}.
+        Uploads are not retried: the body is consumed as it is sent.
+        """
+        if isinstance(file, str):
+            handle = await asyncio.to_thread(open, file, "rb")
+            try:
+                return await self.insert_file(handle, filename or os.path.basename(file), content_type)
+            finally:
+                handle.close()
+        filename = filename or os.path.basename(str(getattr(file, "name", "upload")))
+        stream = MultipartFileStream(file, filename, content_type=content_type)
+        return await self._request(
+            "POST", "/documents/upload", breaker=self.ingest_breaker, headers=stream.headers, content=stream
+        )
 
-    async def insert_file(self, file_path: str) -> Dict[str, Any]:
+    async def insert_files(
+        self,
+        paths: List[str],
+        concurrency: int = 4,
+        journal: Optional[UploadJournal] = None,
+        resume: bool = True,
+    ) -> List[Dict[str, Any]]:
         """
-        Insert a file. 
-        Note: If LightRAG is in Docker and this client is in another Docker, 
-        'file_path' must be accessible to LightRAG or uploaded via multipart.
-        For now, assuming multipart upload if API supports it, or path if shared volume.
-        Standard LightRAG API usually takes text or file paths if local.
-        Since we are in different containers, we should probably upload content as text
-        or rely on shared volume.
-        Let's implement text insertion primarily for now, or check if /insert/file accepts uploads.
+        Upload files with at most `concurrency` in flight. Each file LightRAG
+        accepts is recorded in `journal`; with `resume`, files it already
+        records are skipped, so re-running after an interruption picks up
+        where it left off. Per-file failures are reported in the results,
+        not raised.
         """
-        # Placeholder for file upload logic if API supports it
-        raise NotImplementedError("File upload not fully verified. Use insert_text.")
+        semaphore = asyncio.Semaphore(concurrency)
 
-    async def query(self, query: str, mode: str = "global") -> str:
+        async def upload(path: str) -> Dict[str, Any]:
+            try:
+                key = file_key(path)
+            except OSError as e:
+                return {"file": path, "status": "failure", "error": str(e)}
+            if resume and journal is not None and journal.is_done(key):
+                return {"file": path, "status": "skipped"}
+            async with semaphore:
+                try:
+                    result = await self.insert_file(path)
+                except Exception as e:
+                    return {"file": path, "status": "failure", "error": str(e)}
+            # "duplicated": LightRAG already has a document with this name
+            if journal is not None and result.get("status") in ("success", "duplicated"):
+                await asyncio.to_thread(journal.record, key, result)
+            return {"file": path, **result}
+
+        return await asyncio.gather(*(upload(path) for path in paths))
+
+    async def query(self, query: str, mode: str = "global", deadline: Optional[Deadline] = None) -> str:
         """
         Query LightRAG.
         modes: 'global', 'local', 'hybrid', 'naive'
@@ -61,12 +410,111 @@ class LightRAGClient:
             "query": query,
             "mode": mode
         }
-        response = await self._request("POST", "/query", json=payload)
+        response = await self._request("POST", "/query", deadline=deadline, idempotent=True, json=payload)
         # Response format depends on LightRAG version.
         # usually {"response": "answer..."}
         if isinstance(response, dict) and "response" in response:
             return response["response"]
         return str(response)
 
+    async def query_context(
+        self,
+        query: str,
+        mode: str = "hybrid",
+        top_k: Optional[int] = None,
+        chunk_top_k: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
+        """
+        Retrieve only the context LightRAG would answer from (entities,
+        relations and chunks), without LightRAG generating an answer.
+        The caller's LLM writes the answer, so a lookup costs no extra
+        generation pass.
+        """
+        payload: Dict[str, Any] = {"query": query, "mode": mode}
+        if top_k:
+            payload["top_k"] = top_k
+        if chunk_top_k:
+            payload["chunk_top_k"] = chunk_top_k
+        if max_tokens:
+            payload["max_total_tokens"] = max_tokens
+        try:
+            response = await self._request("POST", "/query/data", deadline=deadline, idempotent=True, json=payload)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            # Older servers: same retrieval through /query
+            response = await self._request(
+                "POST", "/query", deadline=deadline, idempotent=True, json={**payload, "only_need_context": True}
+            )
+            context = str(response.get("response", "")) if isinstance(response, dict) else str(response)
+        else:
+            context = format_context(response.get("data", {}) if isinstance(response, dict) else {})
+        return truncate_to_tokens(context, max_tokens) if max_tokens else context
+
+    async def search(
+        self,
+        query: str,
+        mode: str = "auto",
+        retrieval: str = "context",
+        top_k: Optional[int] = None,
+        chunk_top_k: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """
+        Knowledge-base lookup for the agent. `retrieval` is "context" (see
+        query_context) or "answer" (see query). With mode="auto" the cheapest
+        likely mode is picked per question and escalated (naive -> local ->
+        hybrid, global -> hybrid) while it retrieves nothing.
+        Returns "" when no mode found anything. All attempts share one
+        deadline (`search_deadline` seconds); raises ServiceUnavailable when
+        it runs out or the circuit breaker is open.
+        """
+        deadline = Deadline(self.search_deadline)
+        current = select_query_mode(query) if mode == "auto" else mode
+        path = []
+        result = ""
+        while current:
+            path.append(current)
+            started = time.perf_counter()
+            if retrieval == "context":
+                result = await self.query_context(
+                    query,
+                    mode=current,
+                    top_k=top_k,
+                    chunk_top_k=chunk_top_k,
+                    max_tokens=max_tokens,
+                    deadline=deadline,
+                )
+            else:
+                result = await self.query(query, mode=current, deadline=deadline)
+            empty = is_empty_result(result)
+            self.mode_stats.record(current, time.perf_counter() - started, empty)
+            if not empty:
+                break
+            current = ESCALATION.get(current) if mode == "auto" else None
+            if current and deadline.expired:
+                logger.warning(f"Knowledge base deadline reached, not escalating to {current}")
+                break
+        self.mode_stats.record_selection(path[0], path)
+        logger.info(f"Knowledge base lookup modes: {' -> '.join(path)}")
+        return "" if is_empty_result(result) else result
+
 # Singleton instance
-lightrag_client = LightRAGClient(base_url=getattr(settings, "LIGHTRAG_API_URL", "http://lightrag:9621"))
+lightrag_client = LightRAGClient(
+    base_url=getattr(settings, "LIGHTRAG_API_URL", "http://lightrag:9621"),
+    max_connections=per_worker(settings.LIGHTRAG_MAX_CONNECTIONS),
+    timeouts={"/query": settings.LIGHTRAG_QUERY_TIMEOUT, "/query/data": settings.LIGHTRAG_QUERY_TIMEOUT},
+    search_deadline=settings.LIGHTRAG_SEARCH_DEADLINE,
+    max_retries=settings.LIGHTRAG_MAX_RETRIES,
+    hedge=settings.LIGHTRAG_HEDGE,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.LIGHTRAG_BREAKER_FAILURES,
+        reset_timeout=settings.LIGHTRAG_BREAKER_RESET_TIMEOUT,
+    ),
+    ingest_breaker=CircuitBreaker(
+        failure_threshold=settings.LIGHTRAG_BREAKER_FAILURES,
+        reset_timeout=settings.LIGHTRAG_BREAKER_RESET_TIMEOUT,
+    ),
+)
@@ -0,0 +1,90 @@
+import re
+import threading
+from typing import Dict, List, Optional
+
+from app.services.resilience import LatencyStats
+
+# Cheapest to most expensive. `naive` is vector search over chunks only,
+# `local` walks the graph around matched entities, `global` over matched
+# relations, `hybrid` does both. `mix` (hybrid plus chunks) is never
+# auto-selected but can be configured.
+QUERY_MODES = ("naive", "local", "global", "hybrid", "mix")
+
+# Next mode to try when a mode retrieves nothing
+ESCALATION: Dict[str, Optional[str]] = {
+    "naive": "local",
+    "local": "hybrid",
+    "global": "hybrid",
+    "hybrid": None,
+    "mix": None,
+}
+
+# Broad questions about themes across the corpus
+_GLOBAL_CUES = re.compile(
+    r"\b(overview|summar(y|ise|ize)|in general|main (themes?|topics?|points?)|all (the )?\w+s\b|"
+    r"what kinds? of|types of|trends?|compare|comparison|differences?)\b",
+    re.IGNORECASE,
+)
+# Questions about how things relate to each other
+_RELATION_CUES = re.compile(
+    r"\b(relationship|related|relate|connection|between|affect|impact|depend|why does|how does)\b",
+    re.IGNORECASE,
+)
+# Specific named things: quoted terms, codes/ids, capitalised names after the first word
+_ENTITY_CUES = re.compile(r"\"[^\"]+\"|'[^']+'|\b[A-Z]{2,}\d*\b|\b\w*\d\w*\b|(?<!^)(?<![.?!] )\b[A-Z][a-z]+")
+
+# LightRAG's answer when retrieval found nothing
+_NO_CONTEXT_MARKERS = ("[no-context]", "not able to provide an answer")
+
+
+def select_query_mode(question: str) -> str:
+    """Pick the cheapest LightRAG mode likely to answer `question`."""
+    words = question.split()
+    if _GLOBAL_CUES.search(question):
+        return "global"
+    if _RELATION_CUES.search(question) or len(words) > 25 or question.count("?") > 1:
+        return "hybrid"
+    if _ENTITY_CUES.search(question.strip()):
+        return "local"
+    return "naive"
+
+
+def is_empty_result(text: str) -> bool:
+    stripped = (text or "").strip()
+    if not stripped:
+        return True
+    lowered = stripped.lower()
+    return any(marker in lowered for marker in _NO_CONTEXT_MARKERS) and len(stripped) < 300
+
+
+class QueryModeStats:
+    """Per-mode counts, empty results and latency of knowledge-base lookups."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.selected = {mode: 0 for mode in QUERY_MODES}
+        self.empty = {mode: 0 for mode in QUERY_MODES}
+        self.latency = {mode: LatencyStats() for mode in QUERY_MODES}
+        self.escalations = 0
+
+    def record(self, mode: str, seconds: float, empty: bool) -> None:
+        with self._lock:
+            self.latency[mode].observe(seconds)
+            if empty:
+                self.empty[mode] += 1
+
+    def record_selection(self, mode: str, path: List[str]) -> None:
+        with self._lock:
+            self.selected[mode] += 1
+            self.escalations += len(path) - 1
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "selected": dict(self.selected),
+                "escalations": self.escalations,
+                "modes": {
+                    mode: {**self.latency[mode].as_dict(), "empty": self.empty[mode]}
+                    for mode in QUERY_MODES
+                },
+            }
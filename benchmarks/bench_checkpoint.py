@@ -0,0 +1,108 @@
+"""
+Checkpoint writes per agent turn for each durability mode, with and
+without batching pending writes into the step's checkpoint round trip.
+
+The turn is a graph shaped like the ReAct agent with two tool calls
+(agent -> tools -> agent -> tools -> agent). Without a database the saver
+calls are counted in memory; set BENCH_POSTGRES_URI to also measure
+round trips and Postgres time with PipelinedPostgresSaver.
+
+    python -m benchmarks.bench_checkpoint
+    BENCH_POSTGRES_URI=postgresql://... python -m benchmarks.bench_checkpoint
+"""
+import operator
+import os
+import uuid
+from typing import Annotated, TypedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from app.agent.checkpoint import track_checkpoint_io
+
+MODES = ("sync", "async", "exit")
+TURNS = 20
+
+
+class State(TypedDict):
+    messages: Annotated[list, operator.add]
+
+
+def agent(state: State):
+    return {"messages": ["ai"]}
+
+
+def tools(state: State):
+    return {"messages": ["tool result " * 50]}
+
+
+def route(state: State):
+    return "tools" if sum(m.startswith("tool") for m in state["messages"]) < 2 else END
+
+
+def build(checkpointer):
+    graph = StateGraph(State)
+    graph.add_node("agent", agent)
+    graph.add_node("tools", tools)
+    graph.add_edge(START, "agent")
+    graph.add_conditional_edges("agent", route, ["tools", END])
+    graph.add_edge("tools", "agent")
+    return graph.compile(checkpointer=checkpointer)
+
+
+class CountingSaver(InMemorySaver):
+    def __init__(self):
+        super().__init__()
+        self.puts = 0
+        self.put_writes_calls = 0
+
+    def put(self, *args, **kwargs):
+        self.puts += 1
+        return super().put(*args, **kwargs)
+
+    def put_writes(self, *args, **kwargs):
+        self.put_writes_calls += 1
+        return super().put_writes(*args, **kwargs)
+
+
+def bench_in_memory():
+    print("saver calls per turn (in memory)")
+    for mode in MODES:
+        saver = CountingSaver()
+        build(saver).invoke({"messages": ["user"]}, {"configurable": {"thread_id": "t"}}, durability=mode)
+        # Batched: every put carries the writes that preceded it
+        print(
+            f"  {mode:5}  round trips unbatched {saver.puts + saver.put_writes_calls:3}"
+            f"  batched {saver.puts:3}"
+        )
+
+
+def bench_postgres(uri: str):
+    from psycopg_pool import ConnectionPool
+
+    from app.agent.pipelined_saver import PipelinedPostgresSaver
+
+    print(f"Postgres, mean of {TURNS} turns")
+    with ConnectionPool(uri, max_size=4, kwargs={"autocommit": True}) as pool:
+        for batch in (False, True):
+            saver = PipelinedPostgresSaver(pool, batch_writes=batch)
+            saver.setup()
+            graph = build(saver)
+            for mode in MODES:
+                writes = seconds = 0.0
+                for _ in range(TURNS):
+                    config = {"configurable": {"thread_id": f"bench-{uuid.uuid4()}"}}
+                    with track_checkpoint_io() as stats:
+                        graph.invoke({"messages": ["user"]}, config, durability=mode)
+                    writes += stats.writes
+                    seconds += stats.seconds
+                print(
+                    f"  batch={batch!s:5} {mode:5}  writes/turn {writes / TURNS:5.1f}"
+                    f"  postgres {seconds / TURNS * 1000:7.2f} ms/turn"
+                )
+
+
+if __name__ == "__main__":
+    bench_in_memory()
+    if os.environ.get("BENCH_POSTGRES_URI"):
+        bench_postgres(os.environ["BENCH_POSTGRES_URI"])
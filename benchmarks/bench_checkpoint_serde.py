@@ -0,0 +1,62 @@
+"""
+Bytes per checkpoint and encode/decode time of the messages channel:
+LangGraph's default JsonPlusSerializer vs. CompactSerializer (msgpack + zstd).
+
+    python -m benchmarks.bench_checkpoint_serde
+"""
+import random
+import timeit
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.agent.serializer import CompactSerializer
+
+RUNS = 50
+
+VOCABULARY = (
+    "refund return policy order delivery days items original packaging payment method business "
+    "inspected shipping warranty customer account invoice store exchange damaged receipt support "
+    "carrier tracking address replacement eligible within after before the a of to and for is"
+).split()
+
+
+def lightrag_answer(rng: random.Random, words: int = 600) -> str:
+    """Roughly 4 KB of prose; varied so repeated answers don't compress unrealistically well."""
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def conversation(turns: int) -> list:
+    """A thread where every turn searches the knowledge base once."""
+    rng = random.Random(turns)
+    messages = []
+    for turn in range(turns):
+        call_id = f"call_{turn}"
+        messages += [
+            HumanMessage(content=f"Question {turn}: can I return my order #{1000 + turn}?"),
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "search_knowledge_base", "args": {"query": "refund policy"}, "id": call_id}],
+            ),
+            ToolMessage(content=lightrag_answer(rng), tool_call_id=call_id, name="search_knowledge_base"),
+            AIMessage(content="Yes. Items can be returned within 30 days of delivery. " * 3),
+        ]
+    return messages
+
+
+def bench(label: str, serializer, value) -> None:
+    encoded = serializer.dumps_typed(value)
+    encode = timeit.timeit(lambda: serializer.dumps_typed(value), number=RUNS) / RUNS
+    decode = timeit.timeit(lambda: serializer.loads_typed(encoded), number=RUNS) / RUNS
+    print(
+        f"  {label:10} {encoded[0]:13} {len(encoded[1]):9,d} bytes"
+        f"  encode {encode * 1e3:7.3f} ms  decode {decode * 1e3:7.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    for turns in (5, 20, 100):
+        value = conversation(turns)
+        print(f"{turns} turns ({len(value)} messages)")
+        bench("jsonplus", JsonPlusSerializer(), value)
+        bench("compact", CompactSerializer(), value)
@@ -0,0 +1,48 @@
+"""
+FAQ index lookup latency (exact hash hit, BM25 near match, miss) as the
+number of indexed questions grows. Near-match cost follows the length of
+the matched terms' posting lists; the synthetic questions here share a
+small vocabulary, so it is a worst case for real FAQ sets.
+
+    python -m benchmarks.bench_faq
+"""
+import random
+import timeit
+
+from app.services.faq_index import FAQIndex
+
+RUNS = 2000
+
+TOPICS = (
+    "refund return order delivery shipping warranty invoice account password payment exchange "
+    "receipt tracking address subscription discount coupon gift card store pickup"
+).split()
+TEMPLATES = (
+    "How do I change my {0} {1}?",
+    "What is your {0} policy for {1}?",
+    "Can I get a {0} after {1}?",
+    "Where can I find my {0} {1} number?",
+)
+
+
+def build(size: int) -> FAQIndex:
+    rng = random.Random(size)
+    index = FAQIndex()
+    while len(index) < size:
+        question = rng.choice(TEMPLATES).format(rng.choice(TOPICS), rng.choice(TOPICS)) + f" ({len(index)})"
+        index.add(question, "Answer text.")
+    return index
+
+
+def bench(label: str, index: FAQIndex, query: str) -> None:
+    seconds = timeit.timeit(lambda: index.lookup(query), number=RUNS) / RUNS
+    print(f"  {label:6} {seconds * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    for size in (100, 1000, 10000):
+        index = build(size)
+        print(f"{size} questions")
+        bench("exact", index, index.entries[size // 2].question)
+        bench("near", index, "refund policy for gift card")
+        bench("miss", index, "opening hours on sunday")
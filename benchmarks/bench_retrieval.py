@@ -0,0 +1,78 @@
+"""
+Knowledge-base lookup: LightRAG "answer" mode (LightRAG's LLM answers, the
+agent's LLM rewrites) vs. "context" mode (LightRAG retrieves only, the
+agent's LLM answers once).
+
+For each question it reports end-to-end latency, the size of what the
+agent's LLM reads, and answer quality as the share of expected key facts
+present in the final answer. Needs a running LightRAG (LIGHTRAG_API_URL)
+and a configured LLM provider.
+
+    python -m benchmarks.bench_retrieval [questions.json]
+
+questions.json: [{"question": "...", "expect": ["30 days", "original packaging"]}, ...]
+"""
+import asyncio
+import json
+import sys
+import time
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.api.deps import get_llm_manager
+from app.config.settings import settings
+from app.services.lightrag import LightRAGClient
+
+DEFAULT_QUESTIONS = [
+    {"question": "What is the refund policy?", "expect": ["30 days"]},
+    {"question": "How long does shipping take?", "expect": ["business days"]},
+]
+
+ANSWER_PROMPT = "Answer the customer's question using only the knowledge base result below.\n\n{result}"
+
+
+def recall(answer: str, expected) -> float:
+    if not expected:
+        return 1.0
+    return sum(fact.lower() in answer.lower() for fact in expected) / len(expected)
+
+
+async def run(client: LightRAGClient, llm, mode: str, question: str):
+    started = time.perf_counter()
+    result = await client.search(
+        question,
+        mode=settings.LIGHTRAG_QUERY_MODE,
+        retrieval=mode,
+        top_k=settings.LIGHTRAG_TOP_K,
+        chunk_top_k=settings.LIGHTRAG_CHUNK_TOP_K,
+        max_tokens=settings.LIGHTRAG_CONTEXT_MAX_TOKENS,
+    )
+    retrieved = time.perf_counter()
+    answer = await llm.ainvoke(
+        [SystemMessage(content=ANSWER_PROMPT.format(result=result)), HumanMessage(content=question)]
+    )
+    return answer.content, len(result), retrieved - started, time.perf_counter() - started
+
+
+async def main(path: str = None):
+    questions = json.load(open(path)) if path else DEFAULT_QUESTIONS
+    client = LightRAGClient(base_url=settings.LIGHTRAG_API_URL)
+    llm = get_llm_manager().get_llm(temperature=0)
+
+    totals = {mode: [0.0, 0.0] for mode in ("answer", "context")}
+    for item in questions:
+        print(item["question"])
+        for mode in ("answer", "context"):
+            answer, chars, lookup, total = await run(client, llm, mode, item["question"])
+            score = recall(answer, item.get("expect", []))
+            totals[mode][0] += total
+            totals[mode][1] += score
+            print(f"  {mode:7} lookup {lookup:6.2f}s  total {total:6.2f}s  tool output {chars:6d} chars  recall {score:.2f}")
+    for mode, (seconds, score) in totals.items():
+        print(f"{mode:7} mean total {seconds / len(questions):6.2f}s  mean recall {score / len(questions):.2f}")
+    print(json.dumps(client.mode_stats.as_dict(), indent=2))
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*sys.argv[1:2]))
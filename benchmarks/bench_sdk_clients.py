@@ -0,0 +1,99 @@
+"""
+Per-call overhead of LLM SDK clients during bulk extraction: a new
+AsyncOpenAI client (and connection pool) per call, as LightRAG's
+openai_complete_if_cache does, vs. one long-lived pooled client as handed
+out by the LightRAG server's SDKClientRegistry. Talks to a local stub
+server, so the numbers are client and connection overhead only (no TLS,
+which would widen the gap).
+
+    python -m benchmarks.bench_sdk_clients
+"""
+import asyncio
+import json
+import time
+
+import httpx
+from openai import AsyncOpenAI
+
+CALLS = 300
+CONCURRENCY = 8
+
+COMPLETION = json.dumps(
+    {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "stub",
+        "choices": [
+            {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+).encode()
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Minimal HTTP/1.1 keep-alive server answering every request with COMPLETION."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(COMPLETION)}\r\n\r\n".encode()
+                + COMPLETION
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def complete(client: AsyncOpenAI) -> None:
+    await client.chat.completions.create(model="stub", messages=[{"role": "user", "content": "extract"}])
+
+
+async def run(label: str, call) -> None:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one():
+        async with semaphore:
+            await call()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(CALLS)))
+    elapsed = time.perf_counter() - started
+    print(f"  {label:16} {elapsed / CALLS * 1e3:7.3f} ms/call  {CALLS / elapsed:8.1f} calls/s")
+
+
+async def main() -> None:
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    base_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1"
+
+    async def per_call_client():
+        client = AsyncOpenAI(api_key="stub", base_url=base_url)
+        try:
+            await complete(client)
+        finally:
+            await client.close()
+
+    shared = AsyncOpenAI(
+        api_key="stub",
+        base_url=base_url,
+        http_client=httpx.AsyncClient(limits=httpx.Limits(max_connections=100, max_keepalive_connections=CONCURRENCY)),
+    )
+
+    print(f"{CALLS} chat completions, {CONCURRENCY} in flight")
+    await run("client per call", per_call_client)
+    await run("shared client", lambda: complete(shared))
+    await shared.close()
+    server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
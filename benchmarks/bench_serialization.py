@@ -0,0 +1,65 @@
+"""
+Encode time of the default FastAPI path (jsonable_encoder + JSONResponse)
+vs. returning FastJSONResponse directly.
+
+    python -m benchmarks.bench_serialization
+"""
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.responses import FastJSONResponse, orjson
+from app.channels.core.models import InternalResponse
+from app.channels.web.adapter import WebAdapter
+
+RUNS = 500
+
+
+def chat_payload() -> dict:
+    response = InternalResponse(
+        text="Your order #1234 shipped yesterday and should arrive within 2-3 business days. " * 4,
+        metadata={"agent_name": "CustomerServiceAgent (LangGraph)", "thread_id": "user-42"},
+    )
+    return WebAdapter().to_response(response)
+
+
+def admin_search_payload() -> dict:
+    # LightRAG answers and graph payloads: large text plus many small nodes/edges
+    return {
+        "response": "Refund policy: " + "Items can be returned within 30 days of delivery. " * 400,
+        "graph": {
+            "nodes": [
+                {"id": f"entity-{i}", "labels": ["Product"], "properties": {"description": "x" * 120, "source_id": f"chunk-{i}"}}
+                for i in range(1000)
+            ],
+            "edges": [
+                {"source": f"entity-{i}", "target": f"entity-{i + 1}", "properties": {"weight": 1.0, "keywords": "related"}}
+                for i in range(999)
+            ],
+        },
+    }
+
+
+def default_path(content):
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_path(content):
+    return FastJSONResponse(content).body
+
+
+def bench(name: str, content) -> None:
+    current = min(timeit.repeat(lambda: default_path(content), number=RUNS, repeat=5)) / RUNS
+    fast = min(timeit.repeat(lambda: fast_path(content), number=RUNS, repeat=5)) / RUNS
+    size = len(fast_path(content))
+    print(
+        f"{name:<16} {size:>9} B   default {current * 1e6:9.1f} us   "
+        f"fast {fast * 1e6:8.1f} us   speedup {current / fast:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    print(f"encoder: {'orjson' if orjson else 'stdlib json'}")
+    bench("chat response", chat_payload())
+    bench("admin search", admin_search_payload())
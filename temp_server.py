@@ -10,6 +10,7 @@ from fastapi.openapi.docs import (
     get_swagger_ui_oauth2_redirect_html,
 )
 import os
+import asyncio
 import logging
 import logging.config
 import sys
@@ -33,6 +34,23 @@ from .config import (
     update_uvicorn_mode_config,
     get_default_host,
 )
+from .temp_server_helpers import (
+    INTERACTIVE_PATHS,
+    AdaptiveEmbeddingController,
+    EmbeddingCache,
+    GradientConcurrencyLimiter,
+    ReadinessProbe,
+    RerankCache,
+    SDKClientRegistry,
+    create_adaptive_embedding_function,
+    create_cached_embedding_function,
+    check_storage_ready,
+    create_limited_llm_func,
+    llm_lane,
+    redact_config,
+    run_periodically,
+    vector_prefilter,
+)
 from lightrag.utils import get_env_value
 from lightrag import LightRAG, __version__ as core_version
 from lightrag.api import __api_version__
@@ -342,6 +360,9 @@ def create_app(args):
     # Initialize document manager with workspace support for data isolation
     doc_manager = DocumentManager(args.input_dir, workspace=args.workspace)
 
+    # Startup state and the latest keyed-lock cleanup, shared with the probes
+    server_state = {"initialized": False, "keyed_locks": None}
+
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         """Lifespan context manager for startup and shutdown events"""
@@ -355,15 +376,37 @@ def create_app(args):
 
             # Data migration regardless of storage implementation
             await rag.check_and_migrate_data()
+            server_state["initialized"] = True
+
+            # Expired keyed locks are cleaned up here rather than per /health call
+            server_state["keyed_locks"] = cleanup_keyed_lock()
+            lock_cleanup_task = asyncio.create_task(
+                run_periodically(
+                    cleanup_keyed_lock,
+                    get_env_value("KEYED_LOCK_CLEANUP_INTERVAL", 60.0, float),
+                    lambda result: server_state.update(keyed_locks=result),
+                )
+            )
+            app.state.background_tasks.add(lock_cleanup_task)
+            lock_cleanup_task.add_done_callback(app.state.background_tasks.discard)
 
             ASCIIColors.green("\nServer is ready to accept connections! 🚀\n")
 
             yield
 
         finally:
+            server_state["initialized"] = False
+            for task in list(app.state.background_tasks):
+                task.cancel()
+
             # Clean up database connections
             await rag.finalize_storages()
 
+            if embedding_cache is not None:
+                embedding_cache.close()
+
+            await sdk_clients.aclose()
+
             if "LIGHTRAG_GUNICORN_MODE" not in os.environ:
                 # Only perform cleanup in Uvicorn single-process mode
                 logger.debug("Unvicorn Mode: finalizing shared storage...")
@@ -402,6 +445,17 @@ def create_app(args):
 
     app = FastAPI(**app_kwargs)
 
+    @app.middleware("http")
+    async def mark_interactive_requests(request: Request, call_next):
+        """Route the LLM calls of query requests through the interactive lane"""
+        if not request.url.path.startswith(INTERACTIVE_PATHS):
+            return await call_next(request)
+        token = llm_lane.set("interactive")
+        try:
+            return await call_next(request)
+        finally:
+            llm_lane.reset(token)
+
     # Add custom validation error handler for /query/data endpoint
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(
@@ -455,10 +509,22 @@ def create_app(args):
     # Create working directory if it doesn't exist
     Path(args.working_dir).mkdir(parents=True, exist_ok=True)
 
+    # Pooled SDK clients shared by all LLM and embedding calls
+    sdk_clients = SDKClientRegistry(
+        max_connections=get_env_value("SDK_MAX_CONNECTIONS", 100, int),
+        max_keepalive=get_env_value(
+            "SDK_MAX_KEEPALIVE_CONNECTIONS",
+            max(args.max_async, args.embedding_func_max_async),
+            int,
+        ),
+    )
+    sdk_clients.install()
+
     def create_optimized_openai_llm_func(
         config_cache: LLMConfigCache, args, llm_timeout: int
     ):
         """Create optimized OpenAI LLM function with pre-processed configuration"""
+        from lightrag.llm.openai import openai_complete_if_cache
 
         async def optimized_openai_alike_model_complete(
             prompt,
@@ -467,8 +533,6 @@ def create_app(args):
             keyword_extraction=False,
             **kwargs,
         ) -> str:
-            from lightrag.llm.openai import openai_complete_if_cache
-
             keyword_extraction = kwargs.pop("keyword_extraction", None)
             if keyword_extraction:
                 kwargs["response_format"] = GPTKeywordExtractionFormat
@@ -496,6 +560,7 @@ def create_app(args):
         config_cache: LLMConfigCache, args, llm_timeout: int
     ):
         """Create optimized Azure OpenAI LLM function with pre-processed configuration"""
+        from lightrag.llm.azure_openai import azure_openai_complete_if_cache
 
         async def optimized_azure_openai_model_complete(
             prompt,
@@ -504,8 +569,6 @@ def create_app(args):
             keyword_extraction=False,
             **kwargs,
         ) -> str:
-            from lightrag.llm.azure_openai import azure_openai_complete_if_cache
-
             keyword_extraction = kwargs.pop("keyword_extraction", None)
             if keyword_extraction:
                 kwargs["response_format"] = GPTKeywordExtractionFormat
@@ -777,6 +840,49 @@ def create_app(args):
         f"binding={args.embedding_binding})"
     )
 
+    # Adaptive batch size and concurrency for calls to the embedding binding.
+    # EMBEDDING_BATCH_NUM / EMBEDDING_FUNC_MAX_ASYNC are where it starts; it
+    # may grow up to the *_CEILING values, which LightRAG's own batching and
+    # limiter are given so they do not cap it at the starting values.
+    embedding_batch_ceiling = max(
+        args.embedding_batch_num,
+        get_env_value("EMBEDDING_BATCH_CEILING", args.embedding_batch_num * 4, int),
+    )
+    embedding_concurrency_ceiling = max(
+        args.embedding_func_max_async,
+        get_env_value(
+            "EMBEDDING_MAX_ASYNC_CEILING", args.embedding_func_max_async * 4, int
+        ),
+    )
+    embedding_controller = AdaptiveEmbeddingController(
+        max_batch_size=embedding_batch_ceiling,
+        max_concurrency=embedding_concurrency_ceiling,
+        target_latency=get_env_value(
+            "EMBEDDING_TARGET_LATENCY", embedding_timeout / 4, float
+        ),
+        initial_batch_size=args.embedding_batch_num,
+        initial_concurrency=args.embedding_func_max_async,
+    )
+    optimized_embedding_func = create_adaptive_embedding_function(
+        optimized_embedding_func, embedding_controller
+    )
+
+    # Persistent embedding cache: only cache misses reach the binding
+    embedding_cache = None
+    if get_env_value("EMBEDDING_CACHE", True, bool):
+        embedding_cache = EmbeddingCache(
+            os.path.join(args.working_dir, "embedding_cache.sqlite3")
+        )
+        optimized_embedding_func = create_cached_embedding_function(
+            optimized_embedding_func,
+            embedding_cache,
+            binding=args.embedding_binding,
+            host=args.embedding_binding_host,
+            model=args.embedding_model,
+            dim=args.embedding_dim,
+        )
+        logger.info(f"Embedding cache enabled: {embedding_cache.path}")
+
     # Create EmbeddingFunc with send_dimensions attribute
     embedding_func = EmbeddingFunc(
         embedding_dim=args.embedding_dim,
@@ -786,6 +892,14 @@ def create_app(args):
 
     # Configure rerank function based on args.rerank_bindingparameter
     rerank_model_func = None
+    rerank_cache = None
+    rerank_stats = {
+        "requests": 0,
+        "cache_hits": 0,
+        "prefiltered": 0,
+        "provider_calls": 0,
+        "below_min_score": 0,
+    }
     if args.rerank_binding != "null":
         from lightrag.rerank import cohere_rerank, jina_rerank, ali_rerank
 
@@ -818,11 +932,80 @@ def create_app(args):
                 if default_base_url != inspect.Parameter.empty:
                     args.rerank_binding_host = default_base_url
 
+        rerank_cache = RerankCache(get_env_value("RERANK_CACHE_SIZE", 1024, int))
+        # Minimum cosine gap at the top_n cut for skipping the reranker (0 = off)
+        rerank_prefilter_margin = get_env_value("RERANK_PREFILTER_MARGIN", 0.0, float)
+
+        def cached_vectors(query: str, documents: list):
+            """Query and document vectors from the embedding cache, if all present"""
+            if embedding_cache is None or not all(
+                isinstance(d, str) for d in documents
+            ):
+                return None
+            texts = [query] + documents
+            keys = [
+                EmbeddingCache.make_key(
+                    args.embedding_binding,
+                    args.embedding_binding_host,
+                    args.embedding_model,
+                    args.embedding_dim,
+                    t,
+                )
+                for t in texts
+            ]
+            found = embedding_cache.get_many(keys)
+            if len(found) < len(set(keys)):
+                return None
+            return found[keys[0]], [found[key] for key in keys[1:]]
+
+        def above_min_score(results: list) -> list:
+            kept = [
+                r for r in results if r["relevance_score"] >= args.min_rerank_score
+            ]
+            rerank_stats["below_min_score"] += len(results) - len(kept)
+            return kept
+
         async def server_rerank_func(
             query: str, documents: list, top_n: int = None, extra_body: dict = None
         ):
-            """Server rerank function with configuration from environment variables"""
-            return await selected_rerank_func(
+            """Server rerank function with configuration from environment variables
+
+            Results are cached per (query, documents, top_n, model, extra_body);
+            with RERANK_PREFILTER_MARGIN set, cached embeddings rank the
+            documents instead when the cut is clear. Reranker scores under
+            min_rerank_score are dropped here rather than after the chunks are
+            processed further; prefiltered results carry cosine similarities,
+            which are on another scale, so the floor does not apply to them.
+            """
+            rerank_stats["requests"] += 1
+            key = RerankCache.make_key(
+                query,
+                documents,
+                top_n,
+                {
+                    "binding": args.rerank_binding,
+                    "model": args.rerank_model,
+                    "extra_body": extra_body,
+                },
+            )
+            cached = rerank_cache.get(key)
+            if cached is not None:
+                rerank_stats["cache_hits"] += 1
+                return above_min_score(cached)
+
+            if rerank_prefilter_margin > 0:
+                vectors = await asyncio.to_thread(cached_vectors, query, documents)
+                results = (
+                    vector_prefilter(*vectors, top_n, rerank_prefilter_margin)
+                    if vectors
+                    else None
+                )
+                if results is not None:
+                    rerank_stats["prefiltered"] += 1
+                    return results
+
+            rerank_stats["provider_calls"] += 1
+            results = await selected_rerank_func(
                 query=query,
                 documents=documents,
                 top_n=top_n,
@@ -831,6 +1014,8 @@ def create_app(args):
                 base_url=args.rerank_binding_host,
                 extra_body=extra_body,
             )
+            rerank_cache.put(key, results)
+            return above_min_score(results)
 
         rerank_model_func = server_rerank_func
         logger.info(
@@ -846,6 +1031,13 @@ def create_app(args):
         name=args.simulated_model_name, tag=args.simulated_model_tag
     )
 
+    # MAX_ASYNC is where the LLM concurrency limit starts; it may grow up to
+    # LLM_MAX_ASYNC_CEILING against a fast provider
+    llm_max_async_ceiling = max(
+        args.max_async,
+        get_env_value("LLM_MAX_ASYNC_CEILING", args.max_async * 4, int),
+    )
+
     # Initialize RAG with unified configuration
     try:
         rag = LightRAG(
@@ -853,7 +1045,8 @@ def create_app(args):
             workspace=args.workspace,
             llm_model_func=create_llm_model_func(args.llm_binding),
             llm_model_name=args.llm_model,
-            llm_model_max_async=args.max_async,
+            # The gradient limiter below enforces the effective limit
+            llm_model_max_async=llm_max_async_ceiling,
             summary_max_tokens=args.summary_max_tokens,
             summary_context_size=args.summary_context_size,
             chunk_token_size=int(args.chunk_size),
@@ -862,6 +1055,9 @@ def create_app(args):
                 args.llm_binding, args, llm_timeout
             ),
             embedding_func=embedding_func,
+            # The adaptive controller enforces the effective limits
+            embedding_batch_num=embedding_batch_ceiling,
+            embedding_func_max_async=embedding_concurrency_ceiling,
             default_llm_timeout=llm_timeout,
             default_embedding_timeout=embedding_timeout,
             kv_storage=args.kv_storage,
@@ -886,6 +1082,12 @@ def create_app(args):
         logger.error(f"Failed to initialize LightRAG: {e}")
         raise
 
+    # Adaptive limit on in-flight LLM calls
+    llm_limiter = GradientConcurrencyLimiter(
+        max_limit=llm_max_async_ceiling, initial_limit=args.max_async
+    )
+    rag.llm_model_func = create_limited_llm_func(rag.llm_model_func, llm_limiter)
+
     # Add routes
     app.include_router(
         create_document_routes(
@@ -990,6 +1192,66 @@ def create_app(args):
             "webui_description": webui_description,
         }
 
+    def get_configuration() -> dict:
+        """Server configuration reported by /health and /admin/config"""
+        return redact_config(
+            {
+                # LLM configuration binding/host address (if applicable)/model (if applicable)
+                "llm_binding": args.llm_binding,
+                "llm_binding_host": args.llm_binding_host,
+                "llm_model": args.llm_model,
+                # embedding model configuration binding/host address (if applicable)/model (if applicable)
+                "embedding_binding": args.embedding_binding,
+                "embedding_binding_host": args.embedding_binding_host,
+                "embedding_model": args.embedding_model,
+                "summary_max_tokens": args.summary_max_tokens,
+                "summary_context_size": args.summary_context_size,
+                "kv_storage": args.kv_storage,
+                "doc_status_storage": args.doc_status_storage,
+                "graph_storage": args.graph_storage,
+                "vector_storage": args.vector_storage,
+                "enable_llm_cache_for_extract": args.enable_llm_cache_for_extract,
+                "enable_llm_cache": args.enable_llm_cache,
+                "workspace": args.workspace,
+                "max_graph_nodes": args.max_graph_nodes,
+                # Rerank configuration
+                "enable_rerank": rerank_model_func is not None,
+                "rerank_binding": args.rerank_binding,
+                "rerank_model": args.rerank_model if rerank_model_func else None,
+                "rerank_binding_host": args.rerank_binding_host
+                if rerank_model_func
+                else None,
+                # Environment variable status (requested configuration)
+                "summary_language": args.summary_language,
+                "force_llm_summary_on_merge": args.force_llm_summary_on_merge,
+                "max_parallel_insert": args.max_parallel_insert,
+                "cosine_threshold": args.cosine_threshold,
+                "min_rerank_score": args.min_rerank_score,
+                "related_chunk_number": args.related_chunk_number,
+                "max_async": args.max_async,
+                "embedding_func_max_async": args.embedding_func_max_async,
+                "embedding_batch_num": args.embedding_batch_num,
+            }
+        )
+
+    def get_runtime_stats() -> dict:
+        return {
+            "embedding_cache": embedding_cache.stats()
+            if embedding_cache is not None
+            else None,
+            "embedding_controller": embedding_controller.status(),
+            "llm_limiter": llm_limiter.status(),
+            "sdk_clients": sdk_clients.status(),
+            "rerank": {
+                **rerank_stats,
+                "calls_avoided": rerank_stats["cache_hits"]
+                + rerank_stats["prefiltered"],
+                "cache_entries": (
+                    len(rerank_cache) if rerank_cache is not None else 0
+                ),
+            },
+        }
+
     @app.get("/health", dependencies=[Depends(combined_auth)])
     async def get_status():
         """Get current system status"""
@@ -1001,53 +1263,16 @@ def create_app(args):
             else:
                 auth_mode = "enabled"
 
-            # Cleanup expired keyed locks and get status
-            keyed_lock_info = cleanup_keyed_lock()
-
             return {
                 "status": "healthy",
                 "working_directory": str(args.working_dir),
                 "input_directory": str(args.input_dir),
-                "configuration": {
-                    # LLM configuration binding/host address (if applicable)/model (if applicable)
-                    "llm_binding": args.llm_binding,
-                    "llm_binding_host": args.llm_binding_host,
-                    "llm_model": args.llm_model,
-                    # embedding model configuration binding/host address (if applicable)/model (if applicable)
-                    "embedding_binding": args.embedding_binding,
-                    "embedding_binding_host": args.embedding_binding_host,
-                    "embedding_model": args.embedding_model,
-                    "summary_max_tokens": args.summary_max_tokens,
-                    "summary_context_size": args.summary_context_size,
-                    "kv_storage": args.kv_storage,
-                    "doc_status_storage": args.doc_status_storage,
-                    "graph_storage": args.graph_storage,
-                    "vector_storage": args.vector_storage,
-                    "enable_llm_cache_for_extract": args.enable_llm_cache_for_extract,
-                    "enable_llm_cache": args.enable_llm_cache,
-                    "workspace": args.workspace,
-                    "max_graph_nodes": args.max_graph_nodes,
-                    # Rerank configuration
-                    "enable_rerank": rerank_model_func is not None,
-                    "rerank_binding": args.rerank_binding,
-                    "rerank_model": args.rerank_model if rerank_model_func else None,
-                    "rerank_binding_host": args.rerank_binding_host
-                    if rerank_model_func
-                    else None,
-                    # Environment variable status (requested configuration)
-                    "summary_language": args.summary_language,
-                    "force_llm_summary_on_merge": args.force_llm_summary_on_merge,
-                    "max_parallel_insert": args.max_parallel_insert,
-                    "cosine_threshold": args.cosine_threshold,
-                    "min_rerank_score": args.min_rerank_score,
-                    "related_chunk_number": args.related_chunk_number,
-                    "max_async": args.max_async,
-                    "embedding_func_max_async": args.embedding_func_max_async,
-                    "embedding_batch_num": args.embedding_batch_num,
-                },
+                "configuration": get_configuration(),
                 "auth_mode": auth_mode,
                 "pipeline_busy": pipeline_status.get("busy", False),
-                "keyed_locks": keyed_lock_info,
+                # From the periodic cleanup task
+                "keyed_locks": server_state["keyed_locks"],
+                **get_runtime_stats(),
                 "core_version": core_version,
                 "api_version": api_version_display,
                 "webui_title": webui_title,
@@ -1057,6 +1282,48 @@ def create_app(args):
             logger.error(f"Error getting health status: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @app.get("/health/live")
+    async def get_liveness():
+        """Liveness probe: the process is serving requests (constant time)"""
+        return {"status": "alive"}
+
+    readiness_timeout = get_env_value("READINESS_TIMEOUT", 3.0, float)
+
+    async def check_readiness() -> dict:
+        # A point read from document status storage proves it answers
+        return await check_storage_ready(
+            server_state["initialized"],
+            lambda: rag.doc_status.get_by_id("__readiness_probe__"),
+            readiness_timeout,
+        )
+
+    readiness = ReadinessProbe(
+        check_readiness, get_env_value("READINESS_CACHE_TTL", 5.0, float)
+    )
+
+    @app.get("/health/ready")
+    async def get_readiness():
+        """Readiness probe: storages are initialized and answering
+
+        The storage check runs at most once per READINESS_CACHE_TTL seconds;
+        concurrent probes share it.
+        """
+        status_code, content = await readiness.response()
+        return JSONResponse(status_code=status_code, content=content)
+
+    @app.get("/admin/config", dependencies=[Depends(combined_auth)])
+    async def get_config():
+        """Full server configuration and runtime statistics"""
+        return {
+            "working_directory": str(args.working_dir),
+            "input_directory": str(args.input_dir),
+            "configuration": get_configuration(),
+            "keyed_locks": server_state["keyed_locks"],
+            **get_runtime_stats(),
+            "core_version": core_version,
+            "api_version": api_version_display,
+        }
+
     # Custom StaticFiles class for smart caching
     class SmartStaticFiles(StaticFiles):  # Renamed from NoCacheStaticFiles
         async def get_response(self, path: str, scope):
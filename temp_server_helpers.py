@@ -0,0 +1,727 @@
+"""
+Helpers for the LightRAG server (temp_server.py) that do not depend on
+LightRAG itself, so they can be imported and tested on their own
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit
+
+import numpy as np
+
+# Same logger as the rest of the LightRAG server
+logger = logging.getLogger("lightrag")
+
+
+class EmbeddingCache:
+    """Disk-backed, content-addressed cache of embedding vectors
+
+    Keys are a SHA-256 of (binding, host, model, dimension, text), so a
+    cached vector is only reused for the exact text, provider, model and
+    dimension it was computed with. Vectors are stored as raw float32 blobs
+    in SQLite (WAL mode).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key BLOB PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID"
+            )
+            # Counted once here and kept up to date by put_many, so stats()
+            # never scans the table
+            self.entries = self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings"
+            ).fetchone()[0]
+        self.lookups = 0
+        self.hits = 0
+        self.text_bytes_saved = 0
+        self.vector_bytes_saved = 0
+
+    @staticmethod
+    def make_key(binding: str, host: str, model: str, dim: int, text: str) -> bytes:
+        key = f"{binding}\0{host}\0{model}\0{dim}\0{text}"
+        return hashlib.sha256(key.encode("utf-8")).digest()
+
+    def get_many(self, keys: list) -> dict:
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                rows = self._conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN "
+                    f"({','.join('?' * len(batch))})",
+                    batch,
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: list) -> None:
+        with self._lock, self._conn:
+            # A key fixes the vector, so rows already present are left as is
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                [
+                    (key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in items
+                ],
+            )
+            self.entries += cursor.rowcount
+
+    def record(self, lookups: int, hit_texts: list, hit_vector_bytes: int) -> None:
+        with self._lock:
+            self.lookups += lookups
+            self.hits += len(hit_texts)
+            self.text_bytes_saved += sum(len(t.encode("utf-8")) for t in hit_texts)
+            self.vector_bytes_saved += hit_vector_bytes
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "entries": self.entries,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "text_bytes_saved": self.text_bytes_saved,
+            "vector_bytes_saved": self.vector_bytes_saved,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_cached_embedding_function(
+    embed_func, cache: EmbeddingCache, binding, host, model, dim
+):
+    """Wrap an embedding function so only texts missing from `cache` are sent"""
+
+    async def cached_embedding_function(texts, embedding_dim=None):
+        effective_dim = embedding_dim or dim
+        keys = [
+            cache.make_key(binding, host, model, effective_dim, text)
+            for text in texts
+        ]
+        found = await asyncio.to_thread(cache.get_many, list(set(keys)))
+
+        # Unique texts not in the cache, in first-seen order
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = await embed_func(
+                list(missing.values()), embedding_dim=embedding_dim
+            )
+            fresh = list(zip(missing.keys(), np.asarray(vectors, dtype=np.float32)))
+            await asyncio.to_thread(cache.put_many, fresh)
+            found.update(fresh)
+
+        hit_texts = [text for key, text in zip(keys, texts) if key not in missing]
+        cache.record(len(texts), hit_texts, len(hit_texts) * effective_dim * 4)
+        if not keys:
+            return np.zeros((0, effective_dim), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    return cached_embedding_function
+
+
+class RerankCache:
+    """Bounded LRU of rerank results keyed by query, document set and options"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def make_key(query: str, documents: list, top_n, options: dict = None) -> tuple:
+        """`options` (model, extra_body, ...) must be JSON-serializable or str()-able"""
+        docs = hashlib.sha256()
+        for document in documents:
+            docs.update(str(document).encode("utf-8"))
+            docs.update(b"\0")
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        options_hash = hashlib.sha256(
+            json.dumps(options or {}, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        return query_hash, docs.hexdigest(), top_n, options_hash
+
+    def get(self, key):
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+        return result
+
+    def put(self, key, result) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def vector_prefilter(query_vector, doc_vectors, top_n, margin: float):
+    """Rank documents by cosine similarity if the top_n cut is clear-cut
+
+    Returns rerank-style results when some documents are cut and the
+    top_n-th and next best scores differ by at least `margin` (the reranker
+    would not change which documents are kept), otherwise None. Without a
+    cut the reranker's scores, not the set of documents, are what matters,
+    so those requests always go to the reranker.
+    """
+    if not top_n or top_n >= len(doc_vectors):
+        return None
+    matrix = np.stack(doc_vectors)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+    scores = matrix @ query_vector / np.where(norms == 0, 1.0, norms)
+    order = np.argsort(-scores)
+    if scores[order[top_n - 1]] - scores[order[top_n]] < margin:
+        return None
+    return [
+        {"index": int(i), "relevance_score": float(scores[i])} for i in order[:top_n]
+    ]
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """True for rate limiting (HTTP 429) and timeouts, the signals to back off on"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    if status == 429:
+        return True
+    name = type(error).__name__.lower()
+    return "ratelimit" in name or "timeout" in name
+
+
+def retry_after_seconds(error: BaseException):
+    """Delay asked for by the provider's Retry-After header, or None"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    error: BaseException, attempt: int, base_delay: float, max_delay: float
+) -> float:
+    """Retry-After if the provider sent one, else exponential backoff with jitter"""
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        return min(retry_after, max_delay)
+    delay = min(max_delay, base_delay * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class AdaptiveEmbeddingController:
+    """AIMD control of embedding batch size and in-flight requests
+
+    Both limits grow additively once per window of successful calls that
+    finish under `target_latency`, and are halved on a 429, a timeout or a
+    slow call (at most once per window, so one burst of failures counts as
+    one signal). They start at the initial values (by default half the
+    ceilings) and never exceed `max_batch_size` / `max_concurrency`.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int,
+        max_concurrency: int,
+        target_latency: float,
+        min_batch_size: int = 1,
+        initial_batch_size: int = None,
+        initial_concurrency: int = None,
+        clock=time.monotonic,
+    ):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_batch_size = min(min_batch_size, self.max_batch_size)
+        self.target_latency = target_latency
+        self.clock = clock
+        # Let the feedback find the level from there
+        self.batch_size = max(
+            self.min_batch_size,
+            min(self.max_batch_size, initial_batch_size or self.max_batch_size // 2),
+        )
+        self.concurrency = max(
+            1,
+            min(self.max_concurrency, initial_concurrency or self.max_concurrency // 2),
+        )
+        self.batch_step = max(1, self.max_batch_size // 16)
+        self.in_flight = 0
+        self._successes = 0
+        self._last_decrease = float("-inf")
+        self._condition = None
+        self.stats = {"calls": 0, "increases": 0, "decreases": 0, "overloads": 0}
+        self.last_latency = 0.0
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self.concurrency)
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        self.stats["calls"] += 1
+        self.last_latency = latency
+        if latency > self.target_latency:
+            self._decrease()
+            return
+        self._successes += 1
+        if self._successes >= self.concurrency:
+            self._successes = 0
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            self.batch_size = min(
+                self.max_batch_size, self.batch_size + self.batch_step
+            )
+            self.stats["increases"] += 1
+
+    def on_overload(self) -> None:
+        self.stats["calls"] += 1
+        self.stats["overloads"] += 1
+        self._decrease()
+
+    def _decrease(self) -> None:
+        now = self.clock()
+        # Calls already in flight report the same congestion; count it once
+        if now - self._last_decrease < self.target_latency:
+            return
+        self._last_decrease = now
+        self._successes = 0
+        self.concurrency = max(1, self.concurrency // 2)
+        self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        self.stats["decreases"] += 1
+        logger.info(
+            f"Embedding limits reduced: batch_size={self.batch_size}, "
+            f"concurrency={self.concurrency}"
+        )
+
+    def status(self) -> dict:
+        return {
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "max_batch_size": self.max_batch_size,
+            "max_concurrency": self.max_concurrency,
+            "target_latency_s": self.target_latency,
+            "last_latency_s": round(self.last_latency, 3),
+            **self.stats,
+        }
+
+
+def create_adaptive_embedding_function(
+    embed_func,
+    controller: AdaptiveEmbeddingController,
+    max_retries: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    sleep=asyncio.sleep,
+):
+    """Split batches to the controller's batch size and run them within its limits
+
+    A batch that hits a 429 or a timeout waits (Retry-After, or exponential
+    backoff with jitter) without holding a slot, then is retried under the
+    reduced limits.
+    """
+
+    async def embed_batch(texts, embedding_dim, attempt=0):
+        await controller.acquire()
+        started = time.monotonic()
+        try:
+            vectors = await embed_func(texts, embedding_dim=embedding_dim)
+        except Exception as e:
+            if not is_overload_error(e):
+                raise
+            controller.on_overload()
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(e, attempt, base_delay, max_delay)
+        else:
+            controller.on_success(time.monotonic() - started)
+            return np.asarray(vectors)
+        finally:
+            await controller.release()
+        await sleep(delay)
+        # Re-split if the batch size shrank
+        return await embed_texts(texts, embedding_dim, attempt + 1)
+
+    async def embed_texts(texts, embedding_dim, attempt=0):
+        size = controller.batch_size
+        batches = [texts[i : i + size] for i in range(0, len(texts), size)]
+        results = await asyncio.gather(
+            *(embed_batch(batch, embedding_dim, attempt) for batch in batches)
+        )
+        return np.concatenate(results) if results else np.asarray(results)
+
+    async def adaptive_embedding_function(texts, embedding_dim=None):
+        return await embed_texts(list(texts), embedding_dim)
+
+    return adaptive_embedding_function
+
+
+# Lane of the LLM calls made while serving the current request
+llm_lane: ContextVar[str] = ContextVar("llm_lane", default="background")
+
+# Requests whose LLM calls a customer is waiting on
+INTERACTIVE_PATHS = ("/query", "/api/chat", "/api/generate")
+
+
+class GradientConcurrencyLimiter:
+    """Adaptive limit on in-flight LLM calls with an interactive priority lane
+
+    The limit follows the latency gradient: while recent latency stays near
+    the long-term baseline it grows (by about sqrt(limit) per call), and as
+    latency rises above the baseline it shrinks proportionally (never by
+    more than half per call). Rate limiting and timeouts halve it.
+
+    Interactive calls may use every slot and are admitted before waiting
+    background calls; background calls (ingestion) may not use the slots
+    reserved for interactive traffic.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: int = None,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        interactive_reserve: float = 0.2,
+    ):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(initial_limit or max(self.min_limit, self.max_limit // 2))
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.interactive_reserve = interactive_reserve
+        self.long_rtt = 0.0
+        self.short_rtt = 0.0
+        self.in_flight = {"interactive": 0, "background": 0}
+        self.waiting = {"interactive": 0, "background": 0}
+        self.stats = {"calls": 0, "errors": 0, "overloads": 0}
+        self._condition = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _can_start(self, lane: str) -> bool:
+        total = sum(self.in_flight.values())
+        limit = int(self.limit)
+        if lane == "interactive":
+            return total < limit
+        reserved = max(1, math.ceil(limit * self.interactive_reserve))
+        if limit <= reserved:
+            reserved = limit - 1
+        return total < limit - reserved and not self.waiting["interactive"]
+
+    async def acquire(self, lane: str) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self.waiting[lane] += 1
+            try:
+                await condition.wait_for(lambda: self._can_start(lane))
+            finally:
+                self.waiting[lane] -= 1
+            self.in_flight[lane] += 1
+
+    async def release(self, lane: str) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight[lane] -= 1
+            condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        self.stats["calls"] += 1
+        self.short_rtt = latency
+        if not self.long_rtt:
+            self.long_rtt = latency
+        # Slow-moving baseline; let it fall quickly when the backend recovers
+        alpha = 0.05 if latency >= self.long_rtt else 0.2
+        self.long_rtt += alpha * (latency - self.long_rtt)
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / latency))
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self._set_limit(self.limit * (1 - self.smoothing) + target * self.smoothing)
+
+    def on_error(self, overload: bool) -> None:
+        self.stats["calls"] += 1
+        self.stats["errors"] += 1
+        if overload:
+            self.stats["overloads"] += 1
+            self._set_limit(self.limit / 2)
+
+    def _set_limit(self, limit: float) -> None:
+        self.limit = max(float(self.min_limit), min(float(self.max_limit), limit))
+
+    def status(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "max_limit": self.max_limit,
+            "in_flight": dict(self.in_flight),
+            "waiting": dict(self.waiting),
+            "long_rtt_s": round(self.long_rtt, 3),
+            "last_rtt_s": round(self.short_rtt, 3),
+            **self.stats,
+        }
+
+
+def create_limited_llm_func(llm_func, limiter: GradientConcurrencyLimiter):
+    """Run `llm_func` within the limiter, in the lane of the current request
+
+    LightRAG marks query-time calls with a `_priority` below its default of
+    10; those (and any call made while serving an interactive path) use
+    the interactive lane.
+    """
+
+    async def limited_llm_func(*args, **kwargs):
+        priority = kwargs.get("_priority")
+        lane = llm_lane.get()
+        if priority is not None and priority < 10:
+            lane = "interactive"
+        await limiter.acquire(lane)
+        started = time.monotonic()
+        try:
+            result = await llm_func(*args, **kwargs)
+        except Exception as e:
+            limiter.on_error(is_overload_error(e))
+            raise
+        else:
+            limiter.on_success(time.monotonic() - started)
+            return result
+        finally:
+            await limiter.release(lane)
+
+    return limited_llm_func
+
+
+class SDKClientRegistry:
+    """Long-lived async SDK clients shared by the LLM and embedding bindings
+
+    LightRAG's OpenAI and Azure OpenAI helpers build a new SDK client (and
+    with it a new connection pool) for every call and close it afterwards.
+    `install()` points them at this registry instead: one client per
+    (binding, host, API key, options), backed by a pooled httpx client, whose
+    close() is a no-op until the registry itself is closed in the lifespan.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive: int = 20):
+        self.limits = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive,
+        }
+        self._clients = {}
+        self._patched = []
+        self.created = 0
+        self.reused = 0
+
+    def _shared(self, sdk_class, **kwargs):
+        import httpx
+
+        class SharedClient(sdk_class):
+            # Owned by the registry: callers' close() / "async with" keep it open
+            async def close(self):
+                pass
+
+            async def __aexit__(self, *exc_info):
+                pass
+
+            async def close_shared(self):
+                await sdk_class.close(self)
+
+        # The SDK sets its own per-request timeout (600s by default) over the
+        # http client's, so `timeout` stays with the SDK; httpx only pools
+        http_client = httpx.AsyncClient(limits=httpx.Limits(**self.limits))
+        return SharedClient(http_client=http_client, **kwargs)
+
+    def get(self, binding: str, sdk_class, **kwargs):
+        key = (binding, tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = self._shared(sdk_class, **kwargs)
+            self.created += 1
+            logger.info(f"Created shared {binding} client for {kwargs.get('base_url')}")
+        else:
+            self.reused += 1
+        return client
+
+    def patch(self, module, name: str, replacement) -> None:
+        """Replace `module.name`; aclose() puts the original back"""
+        self._patched.append((module, name, getattr(module, name)))
+        setattr(module, name, replacement)
+
+    def install(self) -> None:
+        """Route LightRAG's per-call SDK client construction to this registry"""
+        try:
+            import lightrag.llm.openai as openai_binding
+            from openai import AsyncOpenAI
+
+            original = openai_binding.create_openai_async_client
+
+            def create_openai_async_client(
+                api_key=None, base_url=None, client_configs=None
+            ):
+                if client_configs:
+                    return original(api_key, base_url, client_configs)
+                return self.get(
+                    "openai",
+                    AsyncOpenAI,
+                    api_key=api_key or os.environ.get("OPENAI_API_KEY"),
+                    base_url=base_url or os.environ.get("OPENAI_API_BASE"),
+                )
+
+            self.patch(
+                openai_binding, "create_openai_async_client", create_openai_async_client
+            )
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"Shared OpenAI clients not available: {e}")
+
+        try:
+            import lightrag.llm.azure_openai as azure_binding
+            from openai import AsyncAzureOpenAI
+
+            def shared_azure_client(**kwargs):
+                return self.get("azure_openai", AsyncAzureOpenAI, **kwargs)
+
+            self.patch(azure_binding, "AsyncAzureOpenAI", shared_azure_client)
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"Shared Azure OpenAI clients not available: {e}")
+
+    def status(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "created": self.created,
+            "reused": self.reused,
+            **self.limits,
+        }
+
+    async def aclose(self) -> None:
+        for module, name, original in self._patched:
+            setattr(module, name, original)
+        self._patched.clear()
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                await client.close_shared()
+            except Exception as e:
+                logger.warning(f"Error closing shared SDK client: {e}")
+
+
+async def run_periodically(func, interval: float, on_result, sleep=asyncio.sleep):
+    """Call `func` every `interval` seconds and pass its result to `on_result`
+
+    Failures are logged and the loop carries on; it ends only when cancelled.
+    """
+    while True:
+        await sleep(interval)
+        try:
+            on_result(func())
+        except Exception as e:
+            logger.warning(f"Periodic {getattr(func, '__name__', 'task')} failed: {e}")
+
+
+class ReadinessProbe:
+    """Cached readiness check shared by concurrent probes
+
+    `check` (a coroutine function returning {"ready": bool, ...}) runs at
+    most once per `ttl` seconds; probes arriving while it runs wait for
+    that result instead of starting their own.
+    """
+
+    def __init__(self, check, ttl: float, clock=time.monotonic):
+        self.check = check
+        self.ttl = ttl
+        self.clock = clock
+        self.result = None
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def response(self):
+        """(HTTP status, body): 200 when ready, 503 otherwise"""
+        async with self._lock:
+            if self.result is None or self.clock() - self.checked_at >= self.ttl:
+                self.result = await self.check()
+                self.checked_at = self.clock()
+            result = self.result
+        body = {**result, "checked_s_ago": round(self.clock() - self.checked_at, 1)}
+        return (200 if result["ready"] else 503), body
+
+
+async def check_storage_ready(initialized: bool, probe, timeout: float) -> dict:
+    """Ready once storages are initialized and `probe()` answers within `timeout`"""
+    if not initialized:
+        return {"ready": False, "reason": "storages not initialized"}
+    try:
+        await asyncio.wait_for(probe(), timeout)
+        return {"ready": True}
+    except Exception as e:
+        return {"ready": False, "reason": f"storage check failed: {e!r}"}
+
+
+# Configuration keys whose values are never reported
+SECRET_KEY_SUFFIXES = ("api_key", "password", "secret", "_token")
+
+
+def redact_url(value):
+    """Drop credentials and the query string from a URL; other values pass through"""
+    if not isinstance(value, str) or "://" not in value:
+        return value
+    parts = urlsplit(value)
+    host = parts.hostname or ""
+    if parts.port:
+        host = f"{host}:{parts.port}"
+    return urlunsplit((parts.scheme, host, parts.path, "", ""))
+
+
+def redact_config(config: dict) -> dict:
+    """Configuration safe to report: secrets masked, URLs without credentials"""
+    return {
+        key: (
+            "***"
+            if value and key.lower().endswith(SECRET_KEY_SUFFIXES)
+            else redact_url(value)
+        )
+        for key, value in config.items()
+    }
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+
+from app.api.admission import AdmissionController, AdmissionRejected
+from app.channels.core.models import ChannelType
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_queue():
+    controller = AdmissionController(max_concurrency=1, max_queue=1, max_wait=1.0)
+
+    await controller.acquire(ChannelType.WEB)
+    waiter = asyncio.create_task(controller.acquire(ChannelType.WEB))
+    await asyncio.sleep(0)
+
+    assert controller.status()["in_flight"] == 1
+    assert controller.status()["queued"] == 1
+
+    # Queue is full, the third request is rejected immediately
+    with pytest.raises(AdmissionRejected) as exc:
+        await controller.acquire(ChannelType.WEB)
+    assert exc.value.retry_after == 1
+
+    controller.release(ChannelType.WEB)
+    await waiter
+    assert controller.status()["queued"] == 0
+    assert controller.status()["in_flight"] == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout_rejects():
+    controller = AdmissionController(max_concurrency=1, max_queue=5, max_wait=0.01, retry_after=3)
+    await controller.acquire(ChannelType.WEB)
+
+    with pytest.raises(AdmissionRejected):
+        await controller.acquire(ChannelType.WEB)
+
+    assert controller.status()["queued"] == 0
+    assert controller.status()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_priority_order():
+    controller = AdmissionController(
+        max_concurrency=1,
+        max_queue=5,
+        max_wait=1.0,
+        priorities={ChannelType.WHATSAPP: 0, ChannelType.WEB: 5},
+    )
+    await controller.acquire(ChannelType.TELEGRAM)
+
+    order = []
+
+    async def request(channel):
+        await controller.acquire(channel)
+        order.append(channel)
+
+    web = asyncio.create_task(request(ChannelType.WEB))
+    await asyncio.sleep(0)
+    whatsapp = asyncio.create_task(request(ChannelType.WHATSAPP))
+    await asyncio.sleep(0)
+
+    controller.release(ChannelType.TELEGRAM)
+    await whatsapp
+    controller.release(ChannelType.WHATSAPP)
+    await web
+
+    assert order == [ChannelType.WHATSAPP, ChannelType.WEB]
+
+
+@pytest.mark.asyncio
+async def test_channel_quota():
+    controller = AdmissionController(
+        max_concurrency=4,
+        max_queue=5,
+        max_wait=1.0,
+        quotas={ChannelType.TELEGRAM: 1},
+    )
+    await controller.acquire(ChannelType.TELEGRAM)
+
+    telegram = asyncio.create_task(controller.acquire(ChannelType.TELEGRAM))
+    await asyncio.sleep(0)
+    # Other channels are not held back by the Telegram quota
+    await controller.acquire(ChannelType.WEB)
+
+    assert not telegram.done()
+    assert controller.status()["in_flight_by_channel"] == {"telegram": 1, "web": 1}
+
+    controller.release(ChannelType.TELEGRAM)
+    await telegram
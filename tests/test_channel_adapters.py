@@ -17,3 +17,99 @@ def test_web_adapter():
     final_resp = adapter.to_response(resp)
     assert final_resp["text"] == "hi"
     assert final_resp["metadata"]["latency"] == "1ms"
+
+def test_fast_decode_matches_dict_path():
+    import json
+    from app.channels.core.models import RawPayload
+    from app.channels.telegram.adapter import TelegramAdapter
+
+    update = {
+        "update_id": 10,
+        "message": {
+            "message_id": 5,
+            "from": {"id": 99, "first_name": "Ann"},
+            "chat": {"id": 99, "type": "private"},
+            "text": "hello",
+            "photo": [{"file_id": "x" * 100}] * 20,
+        },
+    }
+    body = json.dumps(update).encode()
+    adapter = TelegramAdapter()
+
+    slow = adapter.from_request(update)
+    fast = adapter.from_bytes(body)
+
+    assert (fast.user_id, fast.text) == (slow.user_id, slow.text)
+    assert fast.metadata["delivery_id"] == adapter.message_id(update)
+    assert fast.metadata["chat_id"] == 99
+    # The webhook is kept as an unparsed reference, decoded only on demand
+    assert isinstance(fast.metadata["raw"], RawPayload)
+    assert fast.metadata["raw"].json() == update
+
+def test_fast_decode_whatsapp_and_web():
+    import json
+    from app.channels.whatsapp.adapter import WhatsAppAdapter
+
+    meta = {
+        "object": "whatsapp_business_account",
+        "entry": [{"changes": [{"value": {
+            "contacts": [{"wa_id": "15550001"}],
+            "messages": [{"from": "15550001", "id": "wamid.1", "type": "text", "text": {"body": "hi"}}],
+        }}]}],
+    }
+    adapter = WhatsAppAdapter()
+    wa = adapter.from_bytes(json.dumps(meta).encode())
+    assert (wa.user_id, wa.text, wa.metadata["delivery_id"]) == ("15550001", "hi", "wamid.1")
+    slow = adapter.from_request(meta)
+    assert (slow.user_id, slow.text) == (wa.user_id, wa.text)
+    assert adapter.message_id(meta) == "wamid.1"
+
+    web = WebAdapter().from_bytes(b'{"user_id": "u1", "text": "hello", "message_id": "m1"}')
+    assert (web.user_id, web.text, web.metadata["delivery_id"]) == ("u1", "hello", "m1")
+
+def test_webhooks_without_a_message_are_dropped():
+    import json
+    from app.channels.telegram.adapter import TelegramAdapter
+    from app.channels.whatsapp.adapter import WhatsAppAdapter
+
+    status = {"entry": [{"changes": [{"value": {"statuses": [{"id": "wamid.1", "status": "delivered"}]}}]}]}
+    edited = {"update_id": 11, "edited_message": {"message_id": 5, "from": {"id": 99}, "text": "hi!"}}
+    callback = {"update_id": 12, "callback_query": {"id": "c1", "from": {"id": 99}, "data": "yes"}}
+    image = {"entry": [{"changes": [{"value": {"messages": [{"from": "1555", "id": "wamid.2", "type": "image"}]}}]}]}
+
+    for adapter, payload in [
+        (WhatsAppAdapter(), status),
+        (WhatsAppAdapter(), image),
+        (TelegramAdapter(), edited),
+        (TelegramAdapter(), callback),
+    ]:
+        assert adapter.from_request(payload) is None
+        assert adapter.from_bytes(json.dumps(payload).encode()) is None
+
+def test_webhook_endpoint_acknowledges_status_callbacks():
+    from fastapi.testclient import TestClient
+    from app.api import deps
+    from app.api.main import app
+
+    submitted = []
+
+    class Dispatcher:
+        def submit(self, message, dedup_key=None):
+            submitted.append(message)
+            return True
+
+    app.dependency_overrides[deps.get_webhook_dispatcher] = lambda: Dispatcher()
+    app.dependency_overrides[deps.get_dedup_store] = lambda: None
+    try:
+        client = TestClient(app)
+        status = {"entry": [{"changes": [{"value": {"statuses": [{"id": "wamid.1", "status": "read"}]}}]}]}
+        response = client.post("/v1/webhook/whatsapp", json=status)
+        assert response.status_code == 200 and response.json() == {"status": "ignored"}
+        assert submitted == []
+
+        update = {"update_id": 1, "message": {"from": {"id": 7}, "chat": {"id": 7}, "text": "hello"}}
+        response = client.post("/v1/webhook/telegram", json=update)
+        assert response.json() == {"status": "accepted"}
+        assert [m.text for m in submitted] == ["hello"]
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.postgres import PostgresSaver
+
+from app.agent.checkpoint import track_checkpoint_io
+from app.agent.pipelined_saver import PipelinedPostgresSaver
+from app.agent.runner import run_agent
+from app.channels.core.models import ChannelType, InternalMessage
+
+CONFIG = {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+# Writes belong to the checkpoint the step started from
+WRITE_CONFIG = {"configurable": {"thread_id": "t1", "checkpoint_ns": "", "checkpoint_id": "c0"}}
+
+
+@pytest.fixture
+def round_trips(monkeypatch):
+    """Replace the database cursor; each entry is one round trip."""
+    trips = []
+
+    @contextmanager
+    def fake_cursor(self, *, pipeline=False):
+        cursor = MagicMock()
+        trips.append((pipeline, cursor))
+        yield cursor
+
+    monkeypatch.setattr(PostgresSaver, "_cursor", fake_cursor)
+    return trips
+
+
+def test_pending_writes_ride_along_with_checkpoint(round_trips):
+    saver = PipelinedPostgresSaver(MagicMock())
+    with track_checkpoint_io() as stats:
+        saver.put_writes(WRITE_CONFIG, [("messages", "a")], "task-1")
+        saver.put_writes(WRITE_CONFIG, [("messages", "b")], "task-2")
+        assert round_trips == []
+        saver.put(CONFIG, empty_checkpoint(), {}, {})
+
+    assert len(round_trips) == 1
+    pipelined, cursor = round_trips[0]
+    assert pipelined
+    # Two writes batches plus the checkpoint row, on one cursor
+    assert cursor.executemany.call_count == 2
+    assert cursor.execute.call_count == 1
+    assert stats.writes == 1
+
+
+def test_unbatched_and_flush(round_trips):
+    saver = PipelinedPostgresSaver(MagicMock(), batch_writes=False)
+    saver.put_writes(WRITE_CONFIG, [("messages", "a")], "task-1")
+    assert len(round_trips) == 1
+
+    batched = PipelinedPostgresSaver(MagicMock())
+    batched.put_writes(WRITE_CONFIG, [("messages", "a")], "task-1")
+    batched.flush("other-thread")
+    assert len(round_trips) == 1
+    batched.flush("t1")
+    assert len(round_trips) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_agent_passes_durability_and_reports_io():
+    graph = MagicMock()
+    graph.invoke.return_value = {"messages": [MagicMock(content="ok")]}
+    msg = InternalMessage(user_id="u1", channel=ChannelType.WEB, text="hi")
+
+    response = await run_agent(graph, msg, durability="exit")
+
+    assert graph.invoke.call_args.kwargs["durability"] == "exit"
+    graph.checkpointer.flush.assert_called_once_with("u1")
+    assert response.metadata["checkpoint"]["durability"] == "exit"
+    assert response.metadata["checkpoint"]["writes"] == 0
@@ -0,0 +1,104 @@
+import operator
+from contextlib import contextmanager
+from typing import Annotated, TypedDict
+from unittest.mock import MagicMock
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from app.agent.checkpoint_cache import CachedCheckpointSaver
+
+
+class State(TypedDict):
+    messages: Annotated[list, operator.add]
+
+
+def build(checkpointer):
+    graph = StateGraph(State)
+    graph.add_node("agent", lambda state: {"messages": ["ai"]})
+    graph.add_edge(START, "agent")
+    graph.add_edge("agent", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def config(thread_id: str):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_turns_are_served_from_cache():
+    inner = InMemorySaver()
+    cache = CachedCheckpointSaver(inner, verify=False)
+    graph = build(cache)
+
+    graph.invoke({"messages": ["hi"]}, config("t1"))
+    graph.invoke({"messages": ["again"]}, config("t1"))
+
+    assert cache.hits >= 1
+    cached = cache.get_tuple(config("t1"))
+    stored = inner.get_tuple(config("t1"))
+    assert cached.config == stored.config
+    assert cached.checkpoint["channel_values"] == stored.checkpoint["channel_values"]
+    assert cached.metadata == stored.metadata
+    assert graph.get_state(config("t1")).values["messages"] == ["hi", "ai", "again", "ai"]
+
+
+def test_byte_bounded_lru_eviction():
+    cache = CachedCheckpointSaver(InMemorySaver(), max_bytes=1, verify=False)
+    graph = build(cache)
+    graph.invoke({"messages": ["hi"]}, config("t1"))
+    # Nothing fits in one byte
+    assert cache.status()["threads"] == 0
+
+    cache.max_bytes = 10_000
+    graph.invoke({"messages": ["x" * 3000]}, config("t1"))
+    graph.invoke({"messages": ["y" * 3000]}, config("t2"))
+    graph.invoke({"messages": ["z" * 3000]}, config("t3"))
+    status = cache.status()
+    assert status["bytes"] <= 10_000
+    assert status["evictions"] >= 1
+    assert ("t3", "") in cache._entries
+
+
+def test_stale_entry_falls_back_to_postgres():
+    inner = InMemorySaver()
+    graph = build(inner)
+    graph.invoke({"messages": ["hi"]}, config("t1"))
+    latest = inner.get_tuple(config("t1"))
+
+    # Another replica wrote a newer checkpoint than the one we hold
+    rows = [{"checkpoint_id": "newer", "writes": 0}]
+
+    @contextmanager
+    def fake_cursor():
+        cursor = MagicMock()
+        cursor.fetchone.return_value = rows[0]
+        yield cursor
+
+    inner._cursor = fake_cursor
+    cache = CachedCheckpointSaver(inner, verify=True)
+    cache._store(("t1", ""), latest)
+
+    assert cache.get_tuple(config("t1")) is not latest
+    assert cache.stale == 1
+
+    rows[0] = {"checkpoint_id": latest.config["configurable"]["checkpoint_id"], "writes": 0}
+    cache._store(("t1", ""), latest)
+    hit = cache.get_tuple(config("t1"))
+    assert hit.checkpoint["channel_values"] == latest.checkpoint["channel_values"]
+    assert hit.config == latest.config
+    assert cache.hits == 1
+
+
+def test_hits_are_isolated_copies():
+    cache = CachedCheckpointSaver(InMemorySaver(), verify=False)
+    graph = build(cache)
+    graph.invoke({"messages": ["hi"]}, config("t1"))
+
+    first = cache.get_tuple(config("t1"))
+    first.checkpoint["channel_versions"]["messages"] = "mutated"
+    first.checkpoint["versions_seen"].setdefault("agent", {})["messages"] = "mutated"
+
+    second = cache.get_tuple(config("t1"))
+    assert second.checkpoint["channel_versions"]["messages"] != "mutated"
+    assert second.checkpoint["versions_seen"].get("agent", {}).get("messages") != "mutated"
+    assert graph.get_state(config("t1")).values["messages"] == ["hi", "ai"]
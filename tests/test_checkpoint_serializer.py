@@ -0,0 +1,55 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.agent import serializer as serializer_module
+from app.agent.serializer import CompactSerializer
+
+
+def long_history():
+    messages = []
+    for i in range(10):
+        messages += [HumanMessage(content=f"question {i}"), AIMessage(content="answer " * 200)]
+    return messages
+
+
+def test_large_values_are_compressed_and_round_trip():
+    serde = CompactSerializer(threshold=1024)
+    value = long_history()
+
+    type_, data = serde.dumps_typed(value)
+
+    assert type_ == "msgpack+zstd"
+    assert len(data) < len(JsonPlusSerializer().dumps_typed(value)[1])
+    assert serde.loads_typed((type_, data)) == value
+
+
+def test_small_values_stay_plain():
+    serde = CompactSerializer(threshold=1024)
+    assert serde.dumps_typed({"step": 1})[0] == "msgpack"
+    assert serde.dumps_typed(None) == ("null", b"")
+
+
+def test_reads_rows_written_by_default_serializer():
+    value = long_history()
+    legacy = JsonPlusSerializer().dumps_typed(value)
+    assert CompactSerializer().loads_typed(legacy) == value
+
+
+def test_compressed_rows_need_zstandard(monkeypatch):
+    data = CompactSerializer(threshold=1).dumps_typed(long_history())
+    monkeypatch.setattr(serializer_module, "zstandard", None)
+
+    assert CompactSerializer(threshold=1).dumps_typed({"a": 1})[0] == "msgpack"
+    with pytest.raises(RuntimeError):
+        CompactSerializer().loads_typed(data)
+
+
+def test_missing_zstandard_is_reported_at_startup(monkeypatch, caplog):
+    from app.api import deps
+
+    monkeypatch.setattr(serializer_module, "zstandard", None)
+    monkeypatch.setattr(deps.settings, "CHECKPOINT_SERIALIZER", "compact")
+    with caplog.at_level("WARNING", logger="app.api.deps"):
+        assert not deps.get_checkpoint_serializer().enabled
+    assert "zstandard is not installed" in caplog.text
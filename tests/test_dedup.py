@@ -0,0 +1,66 @@
+import pytest
+
+from app.channels.core.dedup import InMemoryDedupStore, dedup_key
+from app.channels.core.models import ChannelType
+from app.channels.telegram.adapter import TelegramAdapter
+from app.channels.whatsapp.adapter import WhatsAppAdapter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_in_memory_claim_and_stored_response():
+    store = InMemoryDedupStore(ttl_seconds=60)
+
+    first = await store.claim("telegram:1")
+    assert not first.is_duplicate
+
+    # Re-delivery while the first turn is still running
+    second = await store.claim("telegram:1")
+    assert second.is_duplicate
+    assert second.response is None
+
+    await store.complete("telegram:1", {"text": "hi"})
+    third = await store.claim("telegram:1")
+    assert third.is_duplicate
+    assert third.response == {"text": "hi"}
+
+
+@pytest.mark.asyncio
+async def test_in_memory_release_and_ttl():
+    clock = FakeClock()
+    store = InMemoryDedupStore(ttl_seconds=60, clock=clock)
+
+    await store.claim("k")
+    await store.release("k")
+    assert not (await store.claim("k")).is_duplicate
+
+    await store.complete("k", {"text": "ok"})
+    clock.now += 61
+    assert not (await store.claim("k")).is_duplicate
+
+
+@pytest.mark.asyncio
+async def test_in_memory_max_entries():
+    store = InMemoryDedupStore(ttl_seconds=60, max_entries=2)
+    for key in ("a", "b", "c"):
+        await store.claim(key)
+    # Oldest key was evicted before "c" went in
+    assert len(store._entries) == 2
+    assert (await store.claim("b")).is_duplicate
+    assert not (await store.claim("a")).is_duplicate
+    assert len(store._entries) == 2
+
+
+def test_adapter_message_ids():
+    assert TelegramAdapter().message_id({"update_id": 991, "message": {}}) == "991"
+    meta_payload = {"entry": [{"changes": [{"value": {"messages": [{"id": "wamid.1"}]}}]}]}
+    assert WhatsAppAdapter().message_id(meta_payload) == "wamid.1"
+    assert WhatsAppAdapter().message_id({"entry": [{"changes": [{"value": {"statuses": []}}]}]}) is None
+    assert dedup_key(ChannelType.TELEGRAM, "991") == "telegram:991"
@@ -0,0 +1,139 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.agent.runner import run_agent
+from app.channels.core.models import ChannelType, InternalMessage
+from app.services.faq_index import FAQIndex, normalize, parse_faq_pairs
+
+FAQ_DOC = """# Store FAQ
+
+Q: What is your refund policy?
+A: Items can be returned within 30 days of delivery.
+
+Q: How long does shipping take?
+A: Orders arrive in 3-5 business days.
+
+## Do you ship internationally?
+Yes, to over 40 countries.
+Customs fees are paid by the customer.
+"""
+
+
+def message(text: str) -> InternalMessage:
+    return InternalMessage(user_id="u1", channel=ChannelType.WEB, text=text)
+
+
+def test_parse_faq_pairs():
+    pairs = parse_faq_pairs(FAQ_DOC)
+    assert pairs[0] == ("What is your refund policy?", "Items can be returned within 30 days of delivery.")
+    assert pairs[2] == ("Do you ship internationally?", "Yes, to over 40 countries.\nCustoms fees are paid by the customer.")
+    assert parse_faq_pairs("Plain prose without any questions.") == []
+
+
+def test_exact_and_near_matches():
+    index = FAQIndex()
+    index.add_document(FAQ_DOC)
+
+    exact = index.lookup("  what is your REFUND policy ")
+    assert exact.exact and exact.score == 1.0
+    assert normalize("What's up?") == "what s up"
+
+    near = index.lookup("what is the refund policy")
+    assert not near.exact
+    assert near.entry.question == "What is your refund policy?"
+    assert near.score > 0.85
+    # Question words count as terms, so a bare keyword query scores lower
+    assert index.lookup("refund policy?").score < near.score
+
+    # Shares a term but asks something else
+    partial = index.lookup("shipping a damaged item back for a refund of the payment")
+    assert partial is None or partial.score < 0.85
+    assert index.lookup("opening hours") is None
+
+
+def test_near_matches_must_ask_the_same_question():
+    index = FAQIndex()
+    index.add("When will my order arrive?", "Within 3-5 business days.")
+    index.add("How do I reset my password?", "Use the 'Forgot password' link.")
+    index.add("Can I cancel my order?", "Yes, before it ships.")
+
+    assert index.lookup("Where will my order arrive?") is None
+    assert index.lookup("Who reset my password?") is None
+    assert index.lookup("Why can't I cancel my order?") is None
+    assert index.lookup("how can I reset my password").entry.answer == "Use the 'Forgot password' link."
+
+
+def test_incremental_add_and_persistence(tmp_path):
+    path = str(tmp_path / "faq" / "index.json")
+    index = FAQIndex(path)
+    assert index.add_document(FAQ_DOC) == 3
+    # Re-ingesting replaces answers instead of duplicating entries
+    assert index.add_document("Q: What is your refund policy?\nA: 60 days.") == 0
+    assert len(index) == 3
+
+    reloaded = FAQIndex(path)
+    assert len(reloaded) == 3
+    assert reloaded.lookup("What is your refund policy?").entry.answer == "60 days."
+    assert reloaded.lookup("shipping take how long").entry.answer == "Orders arrive in 3-5 business days."
+
+
+def test_workers_share_the_index_file(tmp_path):
+    path = str(tmp_path / "index.json")
+    first, second = FAQIndex(path), FAQIndex(path)
+
+    first.add("When will my order arrive?", "Within 3-5 business days.")
+    # The other worker picks up the rewritten file on its next lookup
+    assert second.lookup("When will my order arrive?").entry.answer == "Within 3-5 business days."
+
+    # Each write merges into the file instead of overwriting it with one worker's entries
+    second.add("Can I cancel my order?", "Yes, before it ships.")
+    first.add("How do I reset my password?", "Use the 'Forgot password' link.")
+    assert len(FAQIndex(path)) == 3
+    assert second.lookup("How do I reset my password?") is not None
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_run_agent_answers_from_faq_without_invoking_graph():
+    index = FAQIndex()
+    index.add_document(FAQ_DOC)
+    graph = MagicMock()
+
+    response = await run_agent(graph, message("What is your refund policy?"), faq_index=index, faq_threshold=0.9)
+
+    assert response.text == "Items can be returned within 30 days of delivery."
+    assert response.metadata["faq_match"]["exact"] is True
+    graph.invoke.assert_not_called()
+    # The exchange is still recorded in the thread
+    config, values = graph.update_state.call_args.args
+    assert config["configurable"]["thread_id"] == "u1"
+    assert values["messages"][1] == ("assistant", "Items can be returned within 30 days of delivery.")
+
+
+@pytest.mark.asyncio
+async def test_run_agent_falls_through_below_threshold():
+    index = FAQIndex()
+    index.add_document(FAQ_DOC)
+    graph = MagicMock()
+    graph.invoke.return_value = {"messages": [MagicMock(content="From the LLM")]}
+
+    response = await run_agent(graph, message("Tell me about refund timing for gifts"), faq_index=index, faq_threshold=0.99)
+
+    assert response.text == "From the LLM"
+    assert "faq_match" not in response.metadata
+    graph.invoke.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_default_threshold_answers_exact_matches_only():
+    index = FAQIndex()
+    index.add_document(FAQ_DOC)
+    assert index.lookup("what is the refund policy").score == 1.0
+    graph = MagicMock()
+    graph.invoke.return_value = {"messages": [MagicMock(content="From the LLM")]}
+
+    response = await run_agent(graph, message("what is the refund policy"), faq_index=index)
+
+    assert response.text == "From the LLM"
+    graph.invoke.assert_called_once()
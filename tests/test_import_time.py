@@ -0,0 +1,65 @@
+"""
+Cold-start guard: importing the API must not pull in the agent/LLM/storage
+stacks, and must stay within a time budget. Run with `-s` to see the
+per-module breakdown:
+
+    python -m pytest tests/test_import_time.py -s
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time of app.api.main, best of RUNS, in milliseconds
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500"))
+RUNS = 3
+
+# Only needed once a request actually runs the agent
+LAZY_MODULES = [
+    "langgraph",
+    "psycopg_pool",
+    "mem0",
+    "langchain_openai",
+    "langchain_groq",
+    "langchain_community",
+    "langchain_core.language_models",
+]
+
+
+def measure_import(module: str) -> Tuple[float, Dict[str, float], set]:
+    """Import `module` in a fresh interpreter; return (cumulative ms, self ms per module, loaded modules)."""
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    self_ms, total_ms = {}, 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        self_ms[name.strip()] = int(self_us) / 1000
+        if name.strip() == module:
+            total_ms = int(cumulative_us) / 1000
+    return total_ms, self_ms, set(result.stdout.split())
+
+
+def breakdown(self_ms: Dict[str, float], top: int = 15) -> str:
+    rows = sorted(self_ms.items(), key=lambda item: item[1], reverse=True)[:top]
+    return "\n".join(f"{ms:8.1f} ms  {name}" for name, ms in rows)
+
+
+def test_app_import_is_lazy_and_within_budget():
+    runs = [measure_import("app.api.main") for _ in range(RUNS)]
+    total_ms, self_ms, loaded = min(runs, key=lambda run: run[0])
+    print(f"\napp.api.main: {total_ms:.1f} ms (budget {BUDGET_MS:.0f} ms)\n{breakdown(self_ms)}")
+
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    assert not eager, f"Imported at startup, should be lazy: {eager}"
+    assert total_ms <= BUDGET_MS, f"Import took {total_ms:.1f} ms > {BUDGET_MS:.0f} ms\n{breakdown(self_ms)}"
@@ -0,0 +1,154 @@
+import json
+
+import httpx
+import pytest
+
+from app.services.faq_index import FAQIndex
+from app.services.ingest import IngestManifest, SyncDocument, lightrag_doc_id, sync_documents
+from app.services.lightrag import LightRAGClient
+
+
+@pytest.fixture
+def lightrag():
+    calls = []
+
+    def handler(request: httpx.Request):
+        body = json.loads(request.content)
+        calls.append((request.method, request.url.path, body))
+        return httpx.Response(200, json={"status": "success"})
+
+    client = LightRAGClient(base_url="http://lightrag", transport=httpx.MockTransport(handler))
+    return client, calls
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_unchanged_replaces_changed_reports_missing(tmp_path, lightrag):
+    client, calls = lightrag
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite3"))
+    docs = [SyncDocument("a", "Refunds within 30 days."), SyncDocument("b", "Shipping 3-5 days."), SyncDocument("c", "Hours 9-5.")]
+
+    first = await sync_documents(client, manifest, docs, run_id="r1")
+    assert first["counts"] == {"new": 3, "changed": 0, "unchanged": 0, "failed": 0}
+    assert len(calls) == 3 and len(manifest) == 3
+
+    calls.clear()
+    second = await sync_documents(
+        client,
+        manifest,
+        [SyncDocument("a", "  Refunds within 30 days.\n"), SyncDocument("b", "Shipping 2-4 days.")],
+        run_id="r2",
+        finish=True,
+    )
+    assert second["counts"] == {"new": 0, "changed": 1, "unchanged": 1, "failed": 0}
+    assert second["missing_sources"] == ["c"]
+    # The old version of "b" is deleted before the new one is inserted
+    assert calls == [
+        ("DELETE", "/documents/delete_document", {"doc_ids": [lightrag_doc_id("Shipping 3-5 days.")]}),
+        ("POST", "/insert/text", {"text": "Shipping 2-4 days."}),
+    ]
+    assert len(manifest) == 3
+
+
+@pytest.mark.asyncio
+async def test_sync_run_spans_batches_and_deletes_missing(tmp_path, lightrag):
+    client, calls = lightrag
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite3"))
+    await sync_documents(client, manifest, [SyncDocument(s, f"text {s}") for s in "abc"], run_id="r1")
+
+    calls.clear()
+    await sync_documents(client, manifest, [SyncDocument("a", "text a")], run_id="r2", finish=False)
+    result = await sync_documents(
+        client, manifest, [SyncDocument("b", "text b")], run_id="r2", finish=True, delete_missing=True
+    )
+
+    assert result["missing_sources"] == ["c"] and result["deleted"] == 1
+    assert calls == [("DELETE", "/documents/delete_document", {"doc_ids": [lightrag_doc_id("text c")]})]
+    assert set(manifest.lookup(["a", "b", "c"])) == {"a", "b"}
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_is_retried_next_sync(tmp_path):
+    fail = {"on": True}
+
+    def handler(request: httpx.Request):
+        return httpx.Response(500 if fail["on"] else 200, json={"status": "success"})
+
+    client = LightRAGClient(base_url="http://lightrag", transport=httpx.MockTransport(handler))
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite3"))
+    docs = [SyncDocument("a", "text a")]
+
+    result = await sync_documents(client, manifest, docs, run_id="r1", finish=False)
+    assert result["counts"]["failed"] == 1 and len(manifest) == 0
+
+    fail["on"] = False
+    result = await sync_documents(client, manifest, docs, run_id="r2", finish=False)
+    assert result["counts"]["new"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_changed_source_is_not_reported_missing(tmp_path):
+    fail = set()
+
+    def handler(request: httpx.Request):
+        return httpx.Response(500 if request.method in fail else 200, json={"status": "success"})
+
+    client = LightRAGClient(base_url="http://lightrag", transport=httpx.MockTransport(handler), max_retries=0)
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite3"))
+    await sync_documents(client, manifest, [SyncDocument("a", "v1 a")], run_id="r1")
+
+    # Deleting the old version fails: the row still describes what LightRAG holds
+    fail.add("DELETE")
+    result = await sync_documents(
+        client, manifest, [SyncDocument("a", "v2 a")], run_id="r2", finish=True, delete_missing=True
+    )
+    assert result["counts"]["failed"] == 1
+    assert result["missing_sources"] == []
+    assert manifest.lookup(["a"])["a"].doc_id == lightrag_doc_id("v1 a")
+
+    # The old version is deleted but the insert fails: the row is dropped so the next sync re-inserts
+    fail.clear()
+    fail.add("POST")
+    result = await sync_documents(
+        client, manifest, [SyncDocument("a", "v2 a")], run_id="r3", finish=True, delete_missing=True
+    )
+    assert result["missing_sources"] == [] and "a" not in manifest.lookup(["a"])
+
+    fail.clear()
+    result = await sync_documents(client, manifest, [SyncDocument("a", "v2 a")], run_id="r4")
+    assert result["counts"]["new"] == 1
+    assert manifest.lookup(["a"])["a"].doc_id == lightrag_doc_id("v2 a")
+
+
+@pytest.mark.asyncio
+async def test_sync_keeps_faq_entries_in_step_with_sources(tmp_path, lightrag):
+    client, _ = lightrag
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite3"))
+    faq = FAQIndex(str(tmp_path / "faq.json"))
+    hooks = {
+        "on_inserted": lambda document: faq.add_document(document.text, source_id=document.source_id),
+        "on_removed": faq.remove_sources,
+    }
+    docs = [
+        SyncDocument("refunds", "Q: What is your refund policy?\nA: 30 days."),
+        SyncDocument("hours", "Q: When are you open?\nA: 9 to 5."),
+    ]
+    await sync_documents(client, manifest, docs, run_id="r1", **hooks)
+    assert faq.lookup("What is your refund policy?").entry.answer == "30 days."
+
+    # Changed: the old answer is replaced. Missing: its pairs are removed.
+    await sync_documents(
+        client,
+        manifest,
+        [SyncDocument("refunds", "Q: What is your refund policy?\nA: 60 days.")],
+        run_id="r2",
+        finish=True,
+        delete_missing=True,
+        **hooks,
+    )
+    assert faq.lookup("What is your refund policy?").entry.answer == "60 days."
+    assert faq.lookup("When are you open?") is None
+    assert len(FAQIndex(str(tmp_path / "faq.json"))) == 1
+
+    # A changed source without Q/A pairs any more leaves nothing behind
+    await sync_documents(client, manifest, [SyncDocument("refunds", "Refunds are handled by email.")], run_id="r3", **hooks)
+    assert len(faq) == 0
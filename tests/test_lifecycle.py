@@ -0,0 +1,103 @@
+from functools import lru_cache
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.api import deps
+from app.api.lifecycle import Lifecycle
+from app.channels.core.outbound import StubOutboundClient
+
+
+@pytest.fixture
+def fake_deps(monkeypatch):
+    dispatcher = MagicMock()
+    dispatcher.stop = AsyncMock()
+    rag = MagicMock()
+    rag.check_health = AsyncMock(return_value=True)
+    rag.aclose = AsyncMock()
+    outbound = StubOutboundClient()
+    outbound.close = AsyncMock()
+
+    monkeypatch.setattr(deps, "get_postgres_pool", MagicMock())
+    monkeypatch.setattr(deps, "close_postgres_pool", MagicMock())
+    monkeypatch.setattr(deps, "get_checkpointer", MagicMock())
+    monkeypatch.setattr(deps, "get_memory_controller", MagicMock(side_effect=RuntimeError("qdrant down")))
+    monkeypatch.setattr(deps, "get_llm_manager", MagicMock())
+    monkeypatch.setattr(deps, "get_lightrag_client", lambda: rag)
+    monkeypatch.setattr(deps, "get_faq_index", MagicMock(return_value=None))
+    monkeypatch.setattr(deps, "get_agent_graph", MagicMock())
+    monkeypatch.setattr(deps, "get_dedup_store", MagicMock(return_value=None))
+    monkeypatch.setattr(deps, "get_webhook_dispatcher", lru_cache()(lambda: dispatcher))
+    monkeypatch.setattr(deps, "get_outbound_client", lru_cache()(lambda: outbound))
+    return dispatcher, rag, outbound
+
+
+@pytest.mark.asyncio
+async def test_warm_up_initializes_dependencies(fake_deps):
+    dispatcher, rag, _ = fake_deps
+    lifecycle = Lifecycle()
+
+    await lifecycle.warm_up()
+
+    # Optional dependencies may fail without blocking readiness
+    assert lifecycle.ready
+    assert lifecycle.steps["memory"]["ok"] is False
+    assert lifecycle.steps["graph"]["ok"] is True
+    deps.get_checkpointer.assert_called_once()
+    deps.get_agent_graph.assert_called_once()
+    dispatcher.start.assert_called_once()
+    rag.check_health.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_required_failure_blocks_readiness(fake_deps, monkeypatch):
+    monkeypatch.setattr(deps, "get_checkpointer", MagicMock(side_effect=RuntimeError("no postgres")))
+    lifecycle = Lifecycle()
+
+    await lifecycle.warm_up()
+
+    assert not lifecycle.ready
+    assert lifecycle.steps["checkpointer"]["error"] == "no postgres"
+
+
+@pytest.mark.asyncio
+async def test_shut_down_closes_resources(fake_deps):
+    dispatcher, rag, outbound = fake_deps
+    lifecycle = Lifecycle()
+    await lifecycle.warm_up()
+    deps.get_outbound_client()
+
+    await lifecycle.shut_down()
+
+    assert not lifecycle.ready
+    dispatcher.stop.assert_awaited_once()
+    outbound.close.assert_awaited_once()
+    rag.aclose.assert_awaited_once()
+    deps.close_postgres_pool.assert_called_once()
+
+
+def test_graph_builds_without_profile_tools_when_memory_is_down(fake_deps, monkeypatch):
+    from app.agent import builder
+
+    built = {}
+    monkeypatch.setattr(builder, "build_graph_agent", lambda llm, tools, config, checkpointer: built.setdefault("tools", tools))
+
+    deps.build_agent_graph()
+
+    assert [tool.name for tool in built["tools"]] == ["search_knowledge_base"]
+
+
+@pytest.mark.asyncio
+async def test_dry_run_uses_a_fresh_thread_and_deletes_it(fake_deps, monkeypatch):
+    graph = MagicMock()
+    graph.invoke.return_value = {"messages": [MagicMock(content="hi")]}
+    monkeypatch.setattr(deps, "get_agent_graph", MagicMock(return_value=graph))
+    monkeypatch.setattr(deps, "get_agent_config", MagicMock(return_value=MagicMock(checkpoint_durability=None)))
+    lifecycle = Lifecycle()
+
+    await lifecycle._dry_run()
+    await lifecycle._dry_run()
+
+    threads = [call.args[1]["configurable"]["thread_id"] for call in graph.invoke.call_args_list]
+    assert len(set(threads)) == 2 and all(t.startswith("__warmup__:") for t in threads)
+    assert [call.args[0] for call in graph.checkpointer.delete_thread.call_args_list] == threads
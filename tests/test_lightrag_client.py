@@ -0,0 +1,302 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.agent.tools import KNOWLEDGE_BASE_UNAVAILABLE, SearchInput, ToolWrapper, create_search_tool
+from app.services.ingest import UploadJournal
+from app.services.lightrag import LightRAGClient, MultipartFileStream, format_context
+from app.services.query_modes import select_query_mode
+from app.services.resilience import CircuitBreaker, LatencyWindow, ServiceUnavailable
+
+QUERY_DATA = {
+    "status": "success",
+    "data": {
+        "entities": [{"entity_name": "Refund Policy", "entity_type": "policy", "description": "30 day returns"}],
+        "relationships": [{"src_id": "Refund Policy", "tgt_id": "Store Credit", "description": "may be issued as"}],
+        "chunks": [{"reference_id": "1", "file_path": "faq.md", "content": "Items can be returned within 30 days."}],
+    },
+}
+
+
+def client_for(handler) -> LightRAGClient:
+    return LightRAGClient(base_url="http://lightrag", transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_query_context_uses_query_data():
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        return httpx.Response(200, json=QUERY_DATA)
+
+    context = await client_for(handler).query_context("refunds?", top_k=5, chunk_top_k=3, max_tokens=1000)
+
+    assert requests[0].url.path == "/query/data"
+    body = httpx.Response(200, content=requests[0].content).json()
+    assert body == {"query": "refunds?", "mode": "hybrid", "top_k": 5, "chunk_top_k": 3, "max_total_tokens": 1000}
+    assert "Refund Policy (policy): 30 day returns" in context
+    assert "(faq.md) Items can be returned within 30 days." in context
+
+
+@pytest.mark.asyncio
+async def test_query_context_falls_back_to_only_need_context():
+    def handler(request: httpx.Request):
+        if request.url.path == "/query/data":
+            return httpx.Response(404, json={"detail": "Not Found"})
+        assert b'"only_need_context":true' in request.content.replace(b" ", b"")
+        return httpx.Response(200, json={"response": "raw context"})
+
+    assert await client_for(handler).query_context("refunds?") == "raw context"
+
+
+@pytest.mark.asyncio
+async def test_search_tool_modes():
+    def handler(request: httpx.Request):
+        if request.url.path == "/query/data":
+            return httpx.Response(200, json=QUERY_DATA)
+        return httpx.Response(200, json={"response": "LightRAG answer"})
+
+    client = client_for(handler)
+    assert await create_search_tool(client, retrieval_mode="answer")("q") == "LightRAG answer"
+    context = await create_search_tool(client, retrieval_mode="context", max_tokens=10)("q")
+    assert context.endswith("[context truncated]")
+
+
+def test_format_context_empty():
+    assert format_context({}) == ""
+
+
+@pytest.mark.parametrize(
+    "question, mode",
+    [
+        ("How do I reset my password?", "naive"),
+        ("What is the warranty on the Model X200?", "local"),
+        ("Give me an overview of all the shipping options", "global"),
+        ("How does the loyalty program affect refund eligibility?", "hybrid"),
+    ],
+)
+def test_select_query_mode(question, mode):
+    assert select_query_mode(question) == mode
+
+
+@pytest.mark.asyncio
+async def test_search_escalates_on_empty_result():
+    modes = []
+
+    def handler(request: httpx.Request):
+        body = json.loads(request.content)
+        modes.append(body["mode"])
+        data = QUERY_DATA["data"] if body["mode"] == "hybrid" else {}
+        return httpx.Response(200, json={"status": "success", "data": data})
+
+    client = client_for(handler)
+    result = await client.search("Where is my order 123?")
+
+    assert modes == ["local", "hybrid"]
+    assert "Refund Policy" in result
+    stats = client.mode_stats.as_dict()
+    assert stats["selected"]["local"] == 1
+    assert stats["escalations"] == 1
+    assert stats["modes"]["local"]["empty"] == 1
+    assert stats["modes"]["hybrid"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_search_fixed_mode_does_not_escalate():
+    def handler(request: httpx.Request):
+        return httpx.Response(200, json={"response": "Sorry, I'm not able to provide an answer to that question.[no-context]"})
+
+    assert await client_for(handler).search("q", mode="naive", retrieval="answer") == ""
+
+
+@pytest.mark.asyncio
+async def test_idempotent_queries_retry_on_server_errors():
+    statuses = [503, 502, 200]
+
+    def handler(request: httpx.Request):
+        return httpx.Response(statuses.pop(0), json={"response": "answer"})
+
+    client = LightRAGClient(
+        base_url="http://lightrag", transport=httpx.MockTransport(handler), max_retries=2, retry_base_delay=0
+    )
+    assert await client.query("q") == "answer"
+    assert client.counters["retries"] == 2
+    assert client.breaker.state == "closed"
+
+    # Inserts are not idempotent: no retry
+    statuses[:] = [503, 200]
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.insert_text("doc")
+    assert statuses == [200]
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_tool_degrades():
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = LightRAGClient(
+        base_url="http://lightrag",
+        transport=httpx.MockTransport(handler),
+        max_retries=0,
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+    tool = create_search_tool(client, retrieval_mode="answer", query_mode="hybrid")
+    assert await tool("q") == "Error accessing knowledge base."
+    assert await tool("q") == "Error accessing knowledge base."
+    assert client.breaker.state == "open"
+
+    # Open: fails fast without calling LightRAG
+    assert await tool("q") == KNOWLEDGE_BASE_UNAVAILABLE
+    assert len(calls) == 2
+    status = client.status()["breaker"]
+    assert status["times_opened"] == 1 and status["rejected"] == 1
+
+
+def test_breaker_half_open_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 11
+    assert breaker.allow()  # the probe
+    assert not breaker.allow()  # only one at a time
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.times_opened == 2
+
+    now[0] = 22
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_search_deadline_bounds_slow_lightrag():
+    async def handler(request: httpx.Request):
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    client = LightRAGClient(
+        base_url="http://lightrag", transport=httpx.MockTransport(handler), search_deadline=0.05, retry_base_delay=0.03
+    )
+    with pytest.raises(ServiceUnavailable):
+        await client.search("q", mode="naive")
+    assert client.counters["timeouts"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_slow_query_is_hedged():
+    calls = []
+
+    async def handler(request: httpx.Request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"response": f"answer {len(calls)}"})
+
+    client = LightRAGClient(base_url="http://lightrag", transport=httpx.MockTransport(handler), hedge=True)
+    client.latency["/query"] = window = LatencyWindow(min_samples=1)
+    window.observe(0.01)
+
+    assert await client.query("q") == "answer 2"
+    assert client.counters["hedged"] == 1 and client.counters["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_insert_file_streams_multipart_in_chunks(tmp_path):
+    path = tmp_path / "manual.pdf"
+    path.write_bytes(b"%PDF" + bytes(range(256)) * 40)
+
+    with open(path, "rb") as f:
+        stream = MultipartFileStream(f, "manual.pdf", chunk_size=1000)
+        chunks = [chunk async for chunk in stream]
+    body = b"".join(chunks)
+    assert max(len(c) for c in chunks[1:-1]) == 1000
+    assert int(stream.headers["Content-Length"]) == len(body)
+    assert b'filename="manual.pdf"\r\nContent-Type: application/pdf' in body
+    assert path.read_bytes() in body
+
+    seen = {}
+
+    async def handler(request: httpx.Request):
+        seen["type"] = request.headers["content-type"]
+        seen["body"] = await request.aread()
+        return httpx.Response(200, json={"status": "success", "track_id": "t1"})
+
+    result = await client_for(handler).insert_file(str(path))
+    assert result["track_id"] == "t1"
+    assert seen["type"].startswith("multipart/form-data; boundary=")
+    assert path.read_bytes() in seen["body"]
+
+
+@pytest.mark.asyncio
+async def test_insert_files_resumes_from_journal(tmp_path):
+    paths = []
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text(name)
+        paths.append(str(tmp_path / name))
+    uploaded = []
+
+    async def handler(request: httpx.Request):
+        body = await request.aread()
+        name = body.split(b'filename="')[1].split(b'"')[0].decode()
+        uploaded.append(name)
+        if name == "b.txt" and uploaded.count("b.txt") == 1:
+            return httpx.Response(500, json={"detail": "embedding failed"})
+        return httpx.Response(200, json={"status": "success"})
+
+    client = client_for(handler)
+    journal_path = str(tmp_path / "journal.jsonl")
+    results = await client.insert_files(paths, concurrency=2, journal=UploadJournal(journal_path))
+    assert [r["status"] for r in results] == ["success", "failure", "success"]
+
+    # A fresh process picks up the journal and only uploads what failed
+    results = await client.insert_files(paths + [str(tmp_path / "gone.txt")], journal=UploadJournal(journal_path))
+    assert [r["status"] for r in results] == ["skipped", "success", "skipped", "failure"]
+    assert sorted(uploaded) == ["a.txt", "b.txt", "b.txt", "c.txt"]
+
+
+@pytest.mark.asyncio
+async def test_failing_ingestion_does_not_open_the_query_breaker():
+    def handler(request: httpx.Request):
+        if request.url.path == "/insert/text":
+            return httpx.Response(500, json={"detail": "embedding failed"})
+        return httpx.Response(200, json={"response": "answer"})
+
+    client = LightRAGClient(
+        base_url="http://lightrag",
+        transport=httpx.MockTransport(handler),
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        ingest_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.insert_text("doc")
+    with pytest.raises(ServiceUnavailable):
+        await client.insert_text("doc")
+
+    assert client.ingest_breaker.state == "open"
+    assert client.breaker.state == "closed"
+    assert await client.query("q") == "answer"
+
+
+def test_search_tool_runs_through_sync_invoke():
+    # run_agent calls graph.invoke in a worker thread, so tools are invoked synchronously
+    def handler(request: httpx.Request):
+        return httpx.Response(200, json={"response": "LightRAG answer"})
+
+    tool = ToolWrapper(
+        name="search_knowledge_base",
+        description="Search",
+        func=create_search_tool(client_for(handler), retrieval_mode="answer", query_mode="hybrid"),
+        args_schema=SearchInput,
+    ).wrap_tool()
+
+    assert tool.invoke({"query": "q"}) == "LightRAG answer"
+    assert asyncio.run(tool.ainvoke({"query": "q"})) == "LightRAG answer"
@@ -14,3 +14,17 @@ def test_groq_provider_initialization():
     provider = GroqProvider()
     assert provider.name == "groq"
     assert provider.priority == 2
+
+def test_registry_selects_configured_providers(monkeypatch):
+    from app.llm import registry
+
+    monkeypatch.setattr(registry.settings, "LLM_PROVIDERS", None)
+    monkeypatch.setattr(registry.settings, "LLM_MODE", "auto")
+    monkeypatch.setattr(registry.settings, "OPENAI_API_KEY", None)
+    monkeypatch.setattr(registry.settings, "GROQ_API_KEY", "gsk_test")
+    assert registry.configured_provider_names() == ["groq", "ollama"]
+
+    monkeypatch.setattr(registry.settings, "LLM_PROVIDERS", ["groq"])
+    providers = registry.load_providers()
+    assert [p.name for p in providers] == ["groq"]
+    assert providers[0].priority == 2
@@ -0,0 +1,125 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from app.llm.rate_limiter import (
+    ProviderRateLimiter,
+    RateLimitedChatModel,
+    RateLimitExceeded,
+    parse_reset_duration,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    limiter = ProviderRateLimiter("openai", requests_per_minute=2, clock=clock)
+
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0)
+
+    # 2 RPM refills one request every 30 seconds
+    clock.now += 30
+    assert limiter.acquire(timeout=0)
+
+
+def test_token_budget_and_reconcile():
+    clock = FakeClock()
+    limiter = ProviderRateLimiter("groq", tokens_per_minute=1000, clock=clock)
+
+    assert limiter.acquire(tokens=800, timeout=0)
+    assert not limiter.acquire(tokens=800, timeout=0)
+
+    # Provider reported far fewer tokens than we reserved
+    limiter.reconcile(estimated_tokens=800, actual_tokens=100)
+    assert limiter.acquire(tokens=800, timeout=0)
+
+
+def test_queue_full_raises():
+    limiter = ProviderRateLimiter("openai", requests_per_minute=1, max_queue_size=0)
+    assert limiter.acquire(timeout=0)
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(timeout=1)
+
+
+def test_headers_block_until_reset():
+    clock = FakeClock()
+    limiter = ProviderRateLimiter("openai", requests_per_minute=100, clock=clock)
+
+    limiter.update_from_headers({
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "1m0.5s",
+    })
+    assert not limiter.acquire(timeout=0)
+
+    clock.now += 61
+    assert limiter.acquire(timeout=0)
+
+
+def test_parse_reset_duration():
+    assert parse_reset_duration("6ms") == pytest.approx(0.006)
+    assert parse_reset_duration("1m30s") == 90
+    assert parse_reset_duration("12") == 12
+    assert parse_reset_duration(None) is None
+
+
+def test_spillover_to_next_provider():
+    clock = FakeClock()
+    primary = ProviderRateLimiter("openai", requests_per_minute=1, clock=clock)
+    secondary = ProviderRateLimiter("groq", requests_per_minute=10, clock=clock)
+
+    model = RateLimitedChatModel(
+        routes=[
+            ("openai", FakeListChatModel(responses=["from openai"] * 3), primary),
+            ("groq", FakeListChatModel(responses=["from groq"] * 3), secondary),
+        ],
+        max_wait=0.01,
+    )
+
+    first = model.invoke([HumanMessage(content="hi")])
+    second = model.invoke([HumanMessage(content="hi")])
+
+    assert first.content == "from openai"
+    assert second.content == "from groq"
+
+
+def test_manager_skips_unhealthy_and_broken_spillover_providers(monkeypatch):
+    from app.config.settings import settings
+    from app.llm.base import BaseLLMProvider
+    from app.llm.manager import LLMManager
+
+    class FakeProvider(BaseLLMProvider):
+        def __init__(self, name, priority, healthy=True, broken=False):
+            super().__init__(name=name, priority=priority)
+            self.healthy = healthy
+            self.broken = broken
+
+        def get_llm(self, **kwargs):
+            if self.broken:
+                raise ValueError("missing API key")
+            return FakeListChatModel(responses=[f"from {self.name}"])
+
+        def check_health(self, timeout: float = 2.0) -> bool:
+            return self.healthy
+
+    monkeypatch.setattr(settings, "LLM_MODE", "auto")
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_SPILLOVER", True)
+    providers = [
+        FakeProvider("openai", 1),
+        FakeProvider("groq", 2, broken=True),
+        FakeProvider("ollama", 3, healthy=False),
+        FakeProvider("backup", 4),
+    ]
+    limiters = {p.name: ProviderRateLimiter(p.name, requests_per_minute=10) for p in providers}
+
+    model = LLMManager(providers, rate_limiters=limiters).get_llm()
+
+    assert [name for name, _, _ in model.routes] == ["openai", "backup"]
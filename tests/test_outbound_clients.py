@@ -0,0 +1,127 @@
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.channels.core.delivery import SendRateLimiter, SharedHTTPClient, split_message
+from app.channels.core.models import ChannelType, InternalMessage, InternalResponse
+from app.channels.telegram.client import TelegramOutboundClient
+from app.channels.whatsapp.client import WhatsAppOutboundClient
+
+
+def make_fake_api(fail_first: int = 0):
+    """Local fake of the Telegram Bot API and WhatsApp Cloud API."""
+    api = FastAPI()
+    api.state.calls = []
+    api.state.failures_left = fail_first
+
+    @api.post("/bot{token}/sendMessage")
+    async def send_message(token: str, request: Request):
+        body = await request.json()
+        if body.get("parse_mode") and body["text"].count("*") % 2:
+            return JSONResponse(
+                status_code=400,
+                content={"ok": False, "error_code": 400, "description": "Bad Request: can't parse entities"},
+            )
+        if api.state.failures_left:
+            api.state.failures_left -= 1
+            return JSONResponse(
+                status_code=429,
+                content={"ok": False, "error_code": 429, "parameters": {"retry_after": 0}},
+            )
+        api.state.calls.append(("telegram", token, body))
+        return {"ok": True, "result": {"message_id": len(api.state.calls)}}
+
+    @api.post("/{phone_number_id}/messages")
+    async def whatsapp_messages(phone_number_id: str, request: Request):
+        api.state.calls.append(("whatsapp", request.headers["authorization"], await request.json()))
+        return {"messages": [{"id": "wamid.x"}]}
+
+    return api
+
+
+def make_http(api):
+    return SharedHTTPClient(transport=httpx.ASGITransport(app=api))
+
+
+@pytest.mark.asyncio
+async def test_telegram_client_retries_429_and_chunks():
+    api = make_fake_api(fail_first=1)
+    http = make_http(api)
+    client = TelegramOutboundClient(
+        bot_token="T0KEN", http=http, api_url="http://fake-telegram", global_rate=1000, per_chat_rate=1000
+    )
+    message = InternalMessage(
+        user_id="7",
+        channel=ChannelType.TELEGRAM,
+        text="hi",
+        metadata={"message": {"chat": {"id": -100}}},
+    )
+
+    await client.send(message, InternalResponse(text="word " * 1000))
+    await http.aclose()
+
+    assert len(api.state.calls) == 2
+    channel, token, payload = api.state.calls[0]
+    assert token == "T0KEN"
+    assert payload["chat_id"] == "-100"
+    assert all(len(call[2]["text"]) <= 4096 for call in api.state.calls)
+
+
+@pytest.mark.asyncio
+async def test_telegram_client_resends_plain_text_when_markup_is_split():
+    api = make_fake_api()
+    http = make_http(api)
+    client = TelegramOutboundClient(
+        bot_token="T0KEN", http=http, api_url="http://fake-telegram", global_rate=1000, per_chat_rate=1000,
+        parse_mode="Markdown",
+    )
+    message = InternalMessage(user_id="7", channel=ChannelType.TELEGRAM, text="hi")
+
+    # The bold span is cut in half by the 4096 character split
+    await client.send(message, InternalResponse(text="word " * 818 + "*bold text*"))
+    await http.aclose()
+
+    # Both halves were rejected as Markdown and delivered as plain text
+    payloads = [call[2] for call in api.state.calls]
+    assert len(payloads) == 2
+    assert all("parse_mode" not in payload for payload in payloads)
+    assert payloads[1]["text"].endswith("text*")
+
+
+@pytest.mark.asyncio
+async def test_whatsapp_client_sends_cloud_api_payload():
+    api = make_fake_api()
+    http = make_http(api)
+    client = WhatsAppOutboundClient(
+        access_token="secret", phone_number_id="123", http=http, api_url="http://fake-graph"
+    )
+    message = InternalMessage(user_id="15550001", channel=ChannelType.WHATSAPP, text="hi")
+
+    await client.send(message, InternalResponse(text="hello"))
+    await http.aclose()
+
+    channel, auth, payload = api.state.calls[0]
+    assert auth == "Bearer secret"
+    assert payload["to"] == "15550001"
+    assert payload["text"]["body"] == "hello"
+
+
+def test_send_rate_limiter_spacing():
+    now = [0.0]
+    limiter = SendRateLimiter(global_rate=30, per_chat_rate=1, clock=lambda: now[0])
+
+    assert limiter.reserve_chat("a") == 0
+    assert limiter.reserve_global("a") == 0
+    # Same chat must wait a full second
+    assert limiter.reserve_chat("a") == pytest.approx(1.0)
+    # Another chat only waits for the global interval
+    assert limiter.reserve_chat("b") == 0
+    assert limiter.reserve_global("b") == pytest.approx(1 / 30)
+
+
+def test_split_message():
+    assert split_message("short", 10) == ["short"]
+    chunks = split_message("aaaa bbbb cccc", 10)
+    assert chunks == ["aaaa bbbb", "cccc"]
+    assert split_message("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
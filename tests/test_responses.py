@@ -0,0 +1,16 @@
+import json
+
+from app.api.responses import FastJSONResponse
+from app.channels.core.models import ChannelType, InternalResponse
+
+
+def test_fast_json_response_renders_models_and_enums():
+    response = FastJSONResponse({
+        "response": InternalResponse(text="hi", metadata={"channel": ChannelType.WEB}),
+        "tags": {"a"},
+    })
+    body = json.loads(response.body)
+    assert body["response"]["text"] == "hi"
+    assert body["response"]["metadata"]["channel"] == "web"
+    assert body["tags"] == ["a"]
+    assert response.media_type == "application/json"
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+
+from app.channels.core.dedup import InMemoryDedupStore
+from app.channels.core.dispatcher import WebhookDispatcher
+from app.channels.core.outbound import StubOutboundClient
+from app.channels.core.models import ChannelType, InternalMessage, InternalResponse
+
+
+def make_message(text="hi"):
+    return InternalMessage(user_id="42", channel=ChannelType.TELEGRAM, text=text)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_delivers_reply_through_outbound_client():
+    outbound = StubOutboundClient()
+
+    async def run_turn(message):
+        return InternalResponse(text=f"echo: {message.text}")
+
+    dispatcher = WebhookDispatcher(run_turn, outbound, workers=2, max_queue=10)
+    assert dispatcher.submit(make_message("hello"))
+
+    await dispatcher.stop()
+
+    assert len(outbound.sent) == 1
+    message, response = outbound.sent[0]
+    assert message.user_id == "42"
+    assert response.text == "echo: hello"
+
+    metrics = dispatcher.metrics()
+    assert metrics["processed"] == 1
+    assert metrics["queue_lag"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_rejects_when_queue_full():
+    release = asyncio.Event()
+
+    async def run_turn(message):
+        await release.wait()
+        return InternalResponse(text="done")
+
+    dispatcher = WebhookDispatcher(run_turn, StubOutboundClient(), workers=1, max_queue=1)
+    assert dispatcher.submit(make_message())
+    await asyncio.sleep(0)  # worker picks up the first message
+    assert dispatcher.submit(make_message())
+    assert not dispatcher.submit(make_message())
+    assert dispatcher.metrics()["dropped"] == 1
+
+    release.set()
+    await dispatcher.stop()
+    assert dispatcher.metrics()["processed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_counts_failures():
+    async def run_turn(message):
+        raise RuntimeError("boom")
+
+    outbound = StubOutboundClient()
+    dispatcher = WebhookDispatcher(run_turn, outbound, workers=1)
+    dispatcher.submit(make_message())
+    await dispatcher.stop()
+
+    assert dispatcher.metrics()["failed"] == 1
+    assert not outbound.sent
+
+
+@pytest.mark.asyncio
+async def test_stop_releases_claims_of_unfinished_turns():
+    dedup = InMemoryDedupStore(ttl_seconds=60)
+    started = asyncio.Event()
+
+    async def run_turn(message):
+        started.set()
+        await asyncio.Event().wait()
+
+    dispatcher = WebhookDispatcher(run_turn, StubOutboundClient(), workers=1, max_queue=10, dedup=dedup)
+    for key in ("telegram:1", "telegram:2"):
+        assert not (await dedup.claim(key)).is_duplicate
+        dispatcher.submit(make_message(), dedup_key=key)
+    await started.wait()
+
+    # Cancels the running turn and abandons the queued one
+    await dispatcher.stop(drain_timeout=0.01)
+
+    assert not (await dedup.claim("telegram:1")).is_duplicate
+    assert not (await dedup.claim("telegram:2")).is_duplicate
@@ -0,0 +1,78 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from app.config import workers
+from app.config.workers import WORKERS_ENV, per_worker, worker_count, worker_status
+from app.services.lightrag import LightRAGClient
+
+
+def test_budgets_split_across_workers(monkeypatch):
+    monkeypatch.setenv(WORKERS_ENV, "4")
+    assert worker_count() == 4
+    assert per_worker(20) == 5
+    # Never starve a worker completely
+    assert per_worker(3) == 1
+    assert worker_status()["workers"] == 4
+
+
+def test_single_worker_without_env(monkeypatch):
+    monkeypatch.delenv(WORKERS_ENV, raising=False)
+    monkeypatch.setattr(workers.settings, "WORKERS", None)
+    assert worker_count() == 1
+    assert per_worker(20) == 20
+
+
+def test_available_cpus_is_positive():
+    assert workers.available_cpus() >= 1
+
+
+def test_lightrag_client_reuses_pool_per_loop():
+    client = LightRAGClient(base_url="http://lightrag", max_connections=5)
+
+    async def grab():
+        return await client._get_client()
+
+    async def grab_twice():
+        return await client._get_client(), await client._get_client()
+
+    first, second = asyncio.run(grab_twice())
+    assert first is second
+    assert isinstance(first, httpx.AsyncClient)
+    # The client was closed when its loop shut down
+    assert first.is_closed and not client._clients
+    # A different event loop gets its own client
+    third = asyncio.run(grab())
+    assert third is not first and third.is_closed
+
+
+def test_lightrag_client_drops_clients_of_closed_loops():
+    client = LightRAGClient(base_url="http://lightrag")
+    loop = asyncio.new_event_loop()
+    # Closed without shutting down async generators
+    stale = loop.run_until_complete(client._get_client())
+    loop.close()
+
+    async def grab():
+        current = await client._get_client()
+        assert list(client._clients) == [asyncio.get_running_loop()]
+        return current
+
+    assert asyncio.run(grab()) is not stale
+
+
+def test_lightrag_client_pools_are_safe_across_threads():
+    client = LightRAGClient(base_url="http://lightrag")
+
+    async def grab():
+        first = await client._get_client()
+        await asyncio.sleep(0)
+        return first is await client._get_client()
+
+    # Every thread runs its own loop, as sync tool calls do
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: asyncio.run(grab()), range(64)))
+
+    assert all(results)
+    assert not client._clients